@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+from app.database import Database
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_REFRESH_SECONDS = int(os.getenv("REVOCATION_FILTER_REFRESH_SECONDS", "300"))
+
+# Session families revoked by logout or token reuse. A hit rejects the refresh
+# without asking Mongo; the rare false positive just means signing in again.
+# Revocations made by other workers are still enforced by the rotation query.
+revoked_families = BloomFilter(REVOCATION_FILTER_CAPACITY)
+
+
+class RefreshTokenInvalid(Exception):
+    """Unknown, expired, reused or revoked refresh token"""
+
+
+async def get_refresh_tokens_collection():
+    db = await Database.get_instance()
+    return db.get_refresh_tokens_collection()
+
+def hash_token(token: str) -> str:
+    # Tokens are 256-bit random values, so a fast hash is enough to make a
+    # leaked collection useless without the bcrypt cost
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def token_family(token: str) -> Optional[str]:
+    family_id, dot, secret = token.partition(".")
+    return family_id if dot and family_id and secret else None
+
+def _new_token(family_id: str) -> str:
+    return f"{family_id}.{secrets.token_urlsafe(32)}"
+
+def _token_document(token: str, family_id: str, user_id, email: str, now: datetime) -> dict:
+    return {
+        "_id": hash_token(token),
+        "family_id": family_id,
+        "user_id": user_id,
+        "email": email,
+        "created_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "revoked_at": None,
+    }
+
+async def issue_refresh_token(user: dict) -> str:
+    """Start a new session family for a user who just proved their password"""
+    collection = await get_refresh_tokens_collection()
+    family_id = secrets.token_urlsafe(12)
+    token = _new_token(family_id)
+    await collection.insert_one(_token_document(token, family_id, user["_id"], user["email"], datetime.utcnow()))
+    return token
+
+async def rotate_refresh_token(token: str) -> Tuple[dict, str]:
+    """Spend a refresh token, returning its session record and the replacement token.
+
+    Each token works once. Presenting an already-rotated token means it
+    leaked, so the whole family is revoked.
+    """
+    family_id = token_family(token)
+    if not family_id or family_id in revoked_families:
+        raise RefreshTokenInvalid()
+
+    collection = await get_refresh_tokens_collection()
+    now = datetime.utcnow()
+    new_token = _new_token(family_id)
+    session = await collection.find_one_and_update(
+        {
+            "_id": hash_token(token),
+            "revoked_at": None,
+            "family_revoked": {"$ne": True},
+            "expires_at": {"$gt": now},
+        },
+        {"$set": {"revoked_at": now, "replaced_by": hash_token(new_token)}}
+    )
+    if session is None:
+        reused = await collection.find_one({"_id": hash_token(token), "revoked_at": {"$ne": None}}, {"_id": 1})
+        if reused:
+            logger.warning(f"⚠️ Refresh token reuse detected, revoking session family {family_id}")
+            await revoke_family(family_id)
+        raise RefreshTokenInvalid()
+
+    await collection.insert_one(_token_document(new_token, family_id, session["user_id"], session["email"], now))
+    return session, new_token
+
+async def revoke_family(family_id: str):
+    collection = await get_refresh_tokens_collection()
+    await collection.update_many({"family_id": family_id}, {"$set": {"family_revoked": True}})
+    revoked_families.add(family_id)
+
+async def revoke_user_sessions(user_id) -> int:
+    """Revoke every session family of a user, e.g. once the account is deleted"""
+    collection = await get_refresh_tokens_collection()
+    families = await collection.distinct("family_id", {"user_id": user_id, "family_revoked": {"$ne": True}})
+    if families:
+        await collection.update_many({"user_id": user_id}, {"$set": {"family_revoked": True}})
+        for family_id in families:
+            revoked_families.add(family_id)
+    return len(families)
+
+async def revoke_refresh_token(token: str) -> bool:
+    """Log a session out everywhere its refresh tokens have reached"""
+    family_id = token_family(token)
+    if not family_id:
+        return False
+    collection = await get_refresh_tokens_collection()
+    if not await collection.find_one({"_id": hash_token(token)}, {"_id": 1}):
+        return False
+    await revoke_family(family_id)
+    return True
+
+async def load_revocation_filter():
+    """Rebuild the filter from the revoked families still on record (expired ones age out by TTL)"""
+    global revoked_families
+    collection = await get_refresh_tokens_collection()
+    families = await collection.distinct("family_id", {"family_revoked": True})
+    revoked_families = BloomFilter.from_items(families, max(REVOCATION_FILTER_CAPACITY, len(families) * 2))
+    logger.info(f"✅ Refresh-token revocation filter loaded with {len(families)} families")
+
+async def run_revocation_filter_refresher(interval: int = REVOCATION_FILTER_REFRESH_SECONDS):
+    """Background task that picks up other workers' revocations and drops expired ones"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_revocation_filter()
+        except Exception as e:
+            logger.error(f"Revocation filter refresh failed: {e}")
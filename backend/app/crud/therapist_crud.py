@@ -1,9 +1,27 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from app.database import Database  
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import re
+from app.database import (
+    Database, therapist_derived_fields, geo_point, collection_versions,
+    THERAPIST_FACET_KEYS, THERAPIST_COORDINATE_FIELDS
+)
 from app.models.therapist_model import TherapistModel, UpdateTherapistModel
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.text_search import tokenize
+from app.utils.therapist_directory import TherapistDirectoryIndex
+from app.utils.geo_index import GeoGridIndex
+from app.utils.therapist_matcher import TherapistMatcher
+
+logger = logging.getLogger(__name__)
 
 def therapist_helper(therapist) -> dict:
+    longitude, latitude = (therapist.get("geo") or {}).get("coordinates") or (None, None)
     return {
         "id": str(therapist["_id"]),
         "name": therapist["name"],
@@ -20,9 +38,79 @@ def therapist_helper(therapist) -> dict:
         "social_links": therapist.get("social_links"),
         "years_of_experience": therapist.get("years_of_experience"),
         "availability": therapist.get("availability"),
+        "latitude": latitude,
+        "longitude": longitude,
     }
 
 
+# Only the fields therapist_helper reads are fetched for listings
+THERAPIST_PROJECTION = {field: 1 for field in (
+    "name", "credentials", "specialties", "location", "languages", "insurance",
+    "telehealth", "photo", "bio", "phone_number", "website", "social_links",
+    "years_of_experience", "availability", "geo",
+)}
+FACET_LIMIT = 20
+
+# Optional in-memory faceted directory serving /api/therapists/search
+THERAPIST_DIRECTORY_ENABLED = os.getenv("THERAPIST_DIRECTORY_ENABLED", "false").lower() in ("1", "true", "yes")
+THERAPIST_DIRECTORY_REFRESH_SECONDS = int(os.getenv("THERAPIST_DIRECTORY_REFRESH_SECONDS", "300"))
+
+therapist_directory = TherapistDirectoryIndex(THERAPIST_FACET_KEYS, facet_limit=FACET_LIMIT)
+
+# "mongo" serves /api/therapists/nearby with $geoNear; "memory" uses an in-process
+# grid, which is also the fallback when the server cannot run $geoNear
+GEO_BACKEND = os.getenv("GEO_BACKEND", "mongo").lower()
+
+therapist_geo_index = GeoGridIndex()
+
+# Intent -> ranked therapists, suggested inline by the chat response generator
+THERAPIST_MATCHER_REFRESH_SECONDS = int(os.getenv("THERAPIST_MATCHER_REFRESH_SECONDS", "600"))
+
+therapist_matcher = TherapistMatcher()
+
+# In-process views of the directory, told about every write as
+# listener(therapist_id, therapist) with therapist=None on delete
+_change_listeners: List[Callable[[str, Optional[dict]], None]] = []
+
+def add_change_listener(listener: Callable[[str, Optional[dict]], None]):
+    _change_listeners.append(listener)
+
+def _notify_change(therapist_id: str, therapist: Optional[dict] = None):
+    for listener in _change_listeners:
+        try:
+            listener(therapist_id, therapist)
+        except Exception as e:
+            logger.error(f"Therapist change listener failed: {e}")
+
+def _update_directory(therapist_id: str, therapist: Optional[dict]):
+    if not therapist_directory.ready:
+        return
+    if therapist is None:
+        therapist_directory.remove(therapist_id)
+    else:
+        therapist_directory.upsert(therapist)
+
+def _update_geo_index(therapist_id: str, therapist: Optional[dict]):
+    if not therapist_geo_index.ready:
+        return
+    if therapist is None:
+        therapist_geo_index.remove(therapist_id)
+    else:
+        therapist_geo_index.upsert(therapist_id, therapist["latitude"], therapist["longitude"], therapist)
+
+def _update_matcher(therapist_id: str, therapist: Optional[dict]):
+    if not therapist_matcher.ready:
+        return
+    if therapist is None:
+        therapist_matcher.remove(therapist_id)
+    else:
+        therapist_matcher.upsert(therapist)
+
+add_change_listener(_update_directory)
+add_change_listener(_update_geo_index)
+add_change_listener(_update_matcher)
+
+
 #Utility to get the therapist collection
 async def get_therapist_collection():
     db = await Database.get_instance()  
@@ -45,18 +133,209 @@ async def get_therapist_by_id(id: str):
 # CREATE
 async def add_therapist(data: TherapistModel):
     collection = await get_therapist_collection()
-    therapist = await collection.insert_one(data.dict())
-    new_therapist = await collection.find_one({"_id": therapist.inserted_id})
-    return therapist_helper(new_therapist)
+    new_therapist = data.dict()
+    new_therapist.update(therapist_derived_fields(new_therapist))
+    for field in THERAPIST_COORDINATE_FIELDS:
+        new_therapist.pop(field)
+    await collection.insert_one(new_therapist)  # sets new_therapist["_id"]
+    await collection_versions.bump("therapists")
+    therapist = therapist_helper(new_therapist)
+    _notify_change(therapist["id"], therapist)
+    return therapist
 
 # READ
 async def list_therapists():
     collection = await get_therapist_collection()
     therapists = []
-    async for therapist in collection.find():
+    async for therapist in collection.find({}, THERAPIST_PROJECTION):
         therapists.append(therapist_helper(therapist))
     return therapists
 
+# SEARCH
+def _facet_values(values: Optional[List[str]]) -> List[str]:
+    """Lowercased filter values; each parameter may also hold a comma-separated list"""
+    keys = set()
+    for value in values or []:
+        keys.update(part.strip().lower() for part in value.split(",") if part.strip())
+    return sorted(keys)
+
+def build_therapist_filter(location: Optional[str] = None,
+                           specialties: Optional[List[str]] = None,
+                           languages: Optional[List[str]] = None,
+                           insurance: Optional[List[str]] = None,
+                           telehealth: Optional[bool] = None) -> Dict:
+    """Mongo filter over the derived, indexed search keys.
+
+    Values within one facet are OR'd, facets are AND'd, and every location
+    word must prefix-match a word of the therapist's location.
+    """
+    query = {}
+    for source, values in (("specialties", specialties), ("languages", languages), ("insurance", insurance)):
+        keys = _facet_values(values)
+        if keys:
+            query[THERAPIST_FACET_KEYS[source]] = {"$in": keys}
+    location_words = tokenize(location) if location else []
+    if location_words:
+        query["location_terms"] = {"$all": [re.compile(f"^{re.escape(word)}") for word in location_words]}
+    if telehealth is not None:
+        query["telehealth"] = telehealth
+    return query
+
+def _facet_pipeline(match: Dict) -> List[Dict]:
+    facets = {"total": [{"$count": "count"}]}
+    for key in [*THERAPIST_FACET_KEYS.values(), "telehealth"]:
+        stages = [{"$unwind": f"${key}"}] if key != "telehealth" else []
+        facets[key] = stages + [
+            {"$group": {"_id": f"${key}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": FACET_LIMIT},
+        ]
+    return [{"$match": match}, {"$facet": facets}]
+
+async def search_therapists(location: Optional[str] = None,
+                            specialties: Optional[List[str]] = None,
+                            languages: Optional[List[str]] = None,
+                            insurance: Optional[List[str]] = None,
+                            telehealth: Optional[bool] = None,
+                            limit: int = 20,
+                            cursor: Optional[str] = None,
+                            with_facets: bool = True) -> Dict:
+    """One keyset page of matching therapists ordered by (name, _id), plus facet counts.
+
+    Served from the in-memory directory when it is loaded, otherwise from Mongo.
+    """
+    after = decode_cursor(cursor, 2) if cursor else None
+
+    if THERAPIST_DIRECTORY_ENABLED and therapist_directory.ready:
+        facets = {
+            THERAPIST_FACET_KEYS["specialties"]: _facet_values(specialties),
+            THERAPIST_FACET_KEYS["languages"]: _facet_values(languages),
+            THERAPIST_FACET_KEYS["insurance"]: _facet_values(insurance),
+            "telehealth": [] if telehealth is None else [telehealth],
+        }
+        result = therapist_directory.search(
+            facets, location, limit,
+            after=(after[0], str(after[1])) if after else None,
+            with_facets=with_facets
+        )
+        page = result["therapists"]
+        if len(page) == limit:
+            result["next_cursor"] = encode_cursor(page[-1]["name"], ObjectId(page[-1]["id"]))
+        return result
+
+    collection = await get_therapist_collection()
+    filters = build_therapist_filter(location, specialties, languages, insurance, telehealth)
+    query = dict(filters)
+    if after:
+        query["$and"] = [keyset_filter("name", after[0], after[1], descending=False)]
+
+    page = collection.find(query, THERAPIST_PROJECTION).sort([("name", 1), ("_id", 1)]).limit(limit)
+    if with_facets:
+        therapists, facet_rows = await asyncio.gather(
+            page.to_list(limit),
+            collection.aggregate(_facet_pipeline(filters)).to_list(1)
+        )
+    else:
+        therapists, facet_rows = await page.to_list(limit), []
+
+    result = {
+        "therapists": [therapist_helper(t) for t in therapists],
+        "next_cursor": None,
+    }
+    if len(therapists) == limit:
+        last = therapists[-1]
+        result["next_cursor"] = encode_cursor(last["name"], last["_id"])
+    if facet_rows:
+        row = facet_rows[0]
+        result["total"] = row["total"][0]["count"] if row["total"] else 0
+        result["facets"] = {
+            key: {str(bucket["_id"]).lower(): bucket["count"] for bucket in row[key]}
+            for key in row if key != "total"
+        }
+    return result
+
+async def load_therapist_directory():
+    """Build the in-memory directory from list_therapists"""
+    therapist_directory.build(await list_therapists())
+    logger.info(f"✅ Therapist directory loaded with {len(therapist_directory)} therapists")
+
+async def run_therapist_directory_refresher(interval: int = THERAPIST_DIRECTORY_REFRESH_SECONDS):
+    """Background task that periodically rebuilds the directory to pick up other workers' writes"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_therapist_directory()
+        except Exception as e:
+            logger.error(f"Therapist directory refresh failed: {e}")
+
+# NEAR ME
+async def nearby_therapists(latitude: float, longitude: float, radius_km: float = 25,
+                            limit: int = 20, specialties: Optional[List[str]] = None) -> List[dict]:
+    """Therapists within ``radius_km`` of a point, nearest first, each with ``distance_km``"""
+    if GEO_BACKEND != "memory":
+        try:
+            return await _geo_near(latitude, longitude, radius_km, limit, specialties)
+        except OperationFailure as e:
+            logger.warning(f"⚠️ $geoNear unavailable, using the in-memory geo index: {e}")
+
+    if not therapist_geo_index.ready:
+        await load_therapist_geo_index()
+    wanted = set(_facet_values(specialties))
+    matches = None
+    if wanted:
+        matches = lambda t: not wanted.isdisjoint(value.strip().lower() for value in t["specialties"])
+    return [
+        {**therapist, "distance_km": distance}
+        for therapist, distance in therapist_geo_index.nearby(
+            latitude, longitude, radius_km, limit, predicate=matches
+        )
+    ]
+
+async def _geo_near(latitude: float, longitude: float, radius_km: float,
+                    limit: int, specialties: Optional[List[str]]) -> List[dict]:
+    collection = await get_therapist_collection()
+    query = build_therapist_filter(specialties=specialties)
+    pipeline = [
+        {"$geoNear": {
+            "near": geo_point(latitude, longitude),
+            "key": "geo",
+            "distanceField": "distance_m",
+            "maxDistance": radius_km * 1000,
+            "spherical": True,
+            "query": query,
+        }},
+        {"$limit": limit},
+        {"$project": {**THERAPIST_PROJECTION, "distance_m": 1}},
+    ]
+    therapists = await collection.aggregate(pipeline).to_list(limit)
+    return [
+        {**therapist_helper(t), "distance_km": round(t["distance_m"] / 1000, 3)}
+        for t in therapists
+    ]
+
+async def load_therapist_geo_index():
+    """Build the in-memory geo grid from list_therapists"""
+    therapist_geo_index.clear()
+    for therapist in await list_therapists():
+        therapist_geo_index.upsert(therapist["id"], therapist["latitude"], therapist["longitude"], therapist)
+    therapist_geo_index.ready = True
+    logger.info(f"✅ Therapist geo index loaded with {len(therapist_geo_index)} located therapists")
+
+# CHAT MATCHING
+async def load_therapist_matcher():
+    """Precompute the intent rankings from list_therapists"""
+    therapist_matcher.build(await list_therapists())
+    logger.info(f"✅ Therapist matcher ranked {len(therapist_matcher)} therapists")
+
+async def run_therapist_matcher_refresher(interval: int = THERAPIST_MATCHER_REFRESH_SECONDS):
+    """Background task that periodically re-ranks to pick up other workers' writes"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_therapist_matcher()
+        except Exception as e:
+            logger.error(f"Therapist matcher refresh failed: {e}")
+
 # UPDATE
 async def update_therapist(id: str, data: UpdateTherapistModel):
     if not is_valid_object_id(id):
@@ -65,9 +344,19 @@ async def update_therapist(id: str, data: UpdateTherapistModel):
     collection = await get_therapist_collection()
     updated_data = {k: v for k, v in data.dict().items() if v is not None}
     if updated_data:
-        await collection.update_one({"_id": ObjectId(id)}, {"$set": updated_data})
-        therapist = await collection.find_one({"_id": ObjectId(id)})
-        return therapist_helper(therapist)
+        updated_data.update(therapist_derived_fields(updated_data))
+        for field in THERAPIST_COORDINATE_FIELDS:
+            updated_data.pop(field, None)
+        therapist = await collection.find_one_and_update(
+            {"_id": ObjectId(id)},
+            {"$set": updated_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if therapist:
+            await collection_versions.bump("therapists")
+            therapist = therapist_helper(therapist)
+            _notify_change(id, therapist)
+            return therapist
     return None
 
 # DELETE
@@ -77,4 +366,7 @@ async def delete_therapist(id: str):
     
     collection = await get_therapist_collection()
     result = await collection.delete_one({"_id": ObjectId(id)})
+    if result.deleted_count > 0:
+        await collection_versions.bump("therapists")
+        _notify_change(id)
     return result.deleted_count > 0
@@ -1,32 +1,65 @@
 from bson import ObjectId
 from typing import List
+import os
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.database import Database
 from app.models.user_models import UserModel, UpdateUserModel, UserOutModel, UserCreate, user_helper
+from app.utils.ttl_cache import AsyncTTLCache
+from app.utils.security import password_hasher, HasherOverloaded
+from app.crud.refresh_token_crud import revoke_user_sessions
 from fastapi import HTTPException, status
 
+# Authenticated principals keyed by token subject (email), so authenticated
+# requests skip the users lookup. Writes below invalidate their entries; the
+# TTL bounds staleness for writes made by other workers.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+
+principal_cache = AsyncTTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(id: str):
+    """Drop a user's cached principal, whatever email it was cached under"""
+    principal_cache.invalidate_where(lambda email, user: str(user["_id"]) == id)
+
+def email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already registered"
+    )
+
 async def add_user(user: UserCreate) -> UserOutModel:
     db = await Database.get_instance()
     users_collection = db.get_users_collection()
     
-    if await users_collection.find_one({"email": user.email}):
+    user_dict = user.model_dump(exclude={"confirm_password"})
+    try:
+        user_dict["password"] = await password_hasher.hash(user.password)
+    except HasherOverloaded:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry shortly",
+            headers={"Retry-After": "1"},
         )
+    try:
+        # The unique email index rejects duplicates; insert_one sets user_dict["_id"]
+        await users_collection.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise email_taken()
     
-    user_dict = user.model_dump(exclude={"confirm_password"})
-    result = await users_collection.insert_one(user_dict)
-    
-    created_user = await users_collection.find_one({"_id": result.inserted_id})
-    return UserOutModel(**user_helper(created_user))
+    return UserOutModel(**user_helper(user_dict))
+
+# Only the fields user_helper reads; password hashes never leave the database
+USER_LIST_PROJECTION = {"name": 1, "email": 1, "status": 1, "role": 1}
 
-async def list_users() -> List[UserOutModel]:
+async def list_users() -> List[dict]:
+    """All users as ``user_helper`` dicts, already in the ``UserOutModel`` JSON shape"""
     db = await Database.get_instance()
     users_collection = db.get_users_collection()
     
     users = []
-    async for user in users_collection.find():
-        users.append(UserOutModel(**user_helper(user)))
+    async for user in users_collection.find({}, USER_LIST_PROJECTION):
+        users.append(user_helper(user))
     return users
 
 async def get_user_by_id(id: str) -> UserOutModel:
@@ -58,28 +91,26 @@ async def update_user(id: str, data: UpdateUserModel) -> UserOutModel:
     db = await Database.get_instance()
     users_collection = db.get_users_collection()
     
-    existing_user = await users_collection.find_one({"_id": ObjectId(id)})
-    if not existing_user:
+    update_data = data.model_dump(exclude_unset=True)
+    try:
+        if update_data:
+            updated_user = await users_collection.find_one_and_update(
+                {"_id": ObjectId(id)},
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
+            )
+        else:
+            updated_user = await users_collection.find_one({"_id": ObjectId(id)})
+    except DuplicateKeyError:
+        raise email_taken()
+    finally:
+        invalidate_cached_user(id)
+    
+    if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    update_data = data.model_dump(exclude_unset=True)
-    if "email" in update_data:
-        user_with_email = await users_collection.find_one({"email": update_data["email"]})
-        if user_with_email and str(user_with_email["_id"]) != id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    await users_collection.update_one(
-        {"_id": ObjectId(id)},
-        {"$set": update_data}
-    )
-    
-    updated_user = await users_collection.find_one({"_id": ObjectId(id)})
     return UserOutModel(**user_helper(updated_user))
 
 async def delete_user(id: str) -> bool:
@@ -92,5 +123,9 @@ async def delete_user(id: str) -> bool:
     db = await Database.get_instance()
     users_collection = db.get_users_collection()
     
-    result = await users_collection.delete_one({"_id": ObjectId(id)})
-    return result.deleted_count > 0
\ No newline at end of file
+    deleted = await users_collection.find_one_and_delete({"_id": ObjectId(id)}, {"email": 1})
+    if deleted:
+        principal_cache.invalidate(deleted["email"])
+        # Refresh tokens would otherwise keep minting access tokens for the deleted account
+        await revoke_user_sessions(deleted["_id"])
+    return deleted is not None
\ No newline at end of file
@@ -1,13 +1,35 @@
 import os
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
+from pymongo import UpdateOne
+from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure, OperationFailure
+from app.utils.text_search import (
+    build_search_ngrams, tokenize, RESOURCE_TEXT_INDEX_NAME, RESOURCE_TEXT_WEIGHTS
+)
+from app.utils.urls import normalize_url
+from app.utils.geocoder import geocode
+from app.utils.collection_versions import CollectionVersions
+from app.utils.conversation_store import FORMAT_VERSION, InMemoryConversationStore, MongoConversationStore
 
 logger = logging.getLogger(__name__)
 
 # Load from environment or fallback to defaults
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "mental_health_db")
+# How often each worker picks up other workers' collection version bumps
+VERSION_SYNC_SECONDS = float(os.getenv("VERSION_SYNC_SECONDS", "2"))
+# "mongo" lets any worker continue a conversation; "memory" keeps it in one process
+CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "mongo").lower()
+CONVERSATION_TTL_DAYS = int(os.getenv("CONVERSATION_TTL_DAYS", "30"))
+
+# Therapist list fields and the lowercased key field derived from each
+THERAPIST_FACET_KEYS = {
+    "specialties": "specialty_keys",
+    "languages": "language_keys",
+    "insurance": "insurance_keys",
+}
+# Coordinates accepted on therapist writes; stored only as the GeoJSON "geo" point
+THERAPIST_COORDINATE_FIELDS = ("latitude", "longitude")
 
 
 class Database:
@@ -63,6 +85,49 @@ class Database:
     def get_resources_collection(self):
         return self.get_collection("resources")
 
+    def get_mood_collection(self):
+        return self.get_collection("mood_entries")
+
+    def get_refresh_tokens_collection(self):
+        return self.get_collection("refresh_tokens")
+
+    def get_rate_limits_collection(self):
+        return self.get_collection("rate_limits")
+
+    def get_versions_collection(self):
+        return self.get_collection("collection_versions")
+
+    def get_conversations_collection(self):
+        return self.get_collection("conversations")
+
+
+async def get_versions_collection():
+    db = await Database.get_instance()
+    return db.get_versions_collection()
+
+# Change counters behind the ETags of read-mostly endpoints
+collection_versions = CollectionVersions(get_versions_collection)
+
+async def get_conversations_collection():
+    db = await Database.get_instance()
+    return db.get_conversations_collection()
+
+# Chat state per user, read by whichever worker the next message lands on
+conversation_store = (
+    MongoConversationStore(get_conversations_collection, expire_days=CONVERSATION_TTL_DAYS)
+    if CONVERSATION_STORE == "mongo" else InMemoryConversationStore()
+)
+
+async def ping_db():
+    db = await Database.get_instance()
+    await db.client.admin.command("ping")
+    return True, {}
+
+async def close_db():
+    """Close the MongoDB client, if one was opened"""
+    if Database._instance is not None:
+        instance, Database._instance = Database._instance, None
+        await instance.close()
 
 async def init_db():
     """Initialize the database connection and indexes"""
@@ -73,10 +138,52 @@ async def init_db():
         await db.get_users_collection().create_index("email", unique=True)
         await db.get_messages_collection().create_index("user_id")
         await db.get_therapists_collection().create_index("specialization")
+        await backfill_derived_fields(
+            db.get_therapists_collection(),
+            {"$or": [{"location_terms": {"$exists": False}}, {"geo": {"$exists": False}}]},
+            {"location": 1, **{source: 1 for source in THERAPIST_FACET_KEYS}},
+            therapist_derived_fields
+        )
+        await report_ungeocoded_therapists(db.get_therapists_collection())
+        await ensure_therapist_search_indexes(db.get_therapists_collection())
         
         # Create indexes for resources
-        await db.get_resources_collection().create_index([("title", "text"), ("description", "text")])
+        await ensure_resource_text_index(db.get_resources_collection())
         await db.get_resources_collection().create_index("category")
+        await backfill_derived_fields(
+            db.get_resources_collection(),
+            {"$or": [{"search_ngrams": {"$exists": False}}, {"url_key": {"$exists": False}}]},
+            {"title": 1, "url": 1},
+            resource_derived_fields
+        )
+        await ensure_resource_url_index(db.get_resources_collection())
+
+        # Entries logged before mood entries were keyed by user id embed the whole user document
+        await backfill_derived_fields(
+            db.get_mood_collection(),
+            {"user_id": {"$type": "object"}},
+            {"user_id._id": 1},
+            mood_owner_fields
+        )
+        # Idempotency keys let offline clients safely retry batch mood syncs
+        await db.get_mood_collection().create_index(
+            [("user_id", 1), ("idempotency_key", 1)],
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}}
+        )
+        # Serves keyset pagination of a user's entries (and exports, walking it backwards)
+        await db.get_mood_collection().create_index(
+            [("user_id", 1), ("timestamp", -1), ("_id", -1)]
+        )
+
+        # Refresh-token sessions: Mongo deletes them once expired
+        await db.get_refresh_tokens_collection().create_index("expires_at", expireAfterSeconds=0)
+        await db.get_refresh_tokens_collection().create_index("family_id")
+        # Shared rate-limit buckets (RATE_LIMIT_BACKEND=mongo), dropped once refilled
+        await db.get_rate_limits_collection().create_index("expires_at", expireAfterSeconds=0)
+        # Conversations idle for CONVERSATION_TTL_DAYS are forgotten
+        await purge_old_conversation_formats(db.get_conversations_collection())
+        await db.get_conversations_collection().create_index("expires_at", expireAfterSeconds=0)
         
         logger.info("✅ Database initialized successfully with indexes")
         return True
@@ -84,9 +191,124 @@ async def init_db():
         logger.critical(f"❌ Database initialization failed: {e}")
         raise
 
-# Add this method to your Database class
-def get_mood_collection(self):
-    return self.get_collection("mood_entries")
+async def ensure_resource_text_index(collection):
+    """Create the weighted resource text index, replacing any older text index.
+
+    MongoDB allows a single text index per collection, so an index created
+    with different fields or weights has to be dropped first.
+    """
+    async for index in collection.list_indexes():
+        if "weights" in index and index["name"] != RESOURCE_TEXT_INDEX_NAME:
+            logger.info(f"🔁 Replacing text index {index['name']}")
+            await collection.drop_index(index["name"])
+    await collection.create_index(
+        [(field, "text") for field in RESOURCE_TEXT_WEIGHTS],
+        name=RESOURCE_TEXT_INDEX_NAME,
+        weights=RESOURCE_TEXT_WEIGHTS,
+        default_language="english"
+    )
+
+def resource_derived_fields(resource: dict) -> dict:
+    """Fields computed from a resource's content and stored alongside it.
+
+    Writes validate URLs first, but resources stored before that may hold
+    one that cannot be normalized (e.g. a port out of range). Those get no
+    ``url_key``, which the partial unique index skips, rather than failing
+    the startup backfill.
+    """
+    try:
+        url_key = normalize_url(resource.get("url", ""))
+    except ValueError as e:
+        logger.warning(f"⚠️ Resource {resource.get('_id')} has an unusable URL and is not de-duplicated: {e}")
+        url_key = None
+    return {
+        "search_ngrams": build_search_ngrams([resource.get("title", "")]),
+        "url_key": url_key,
+    }
+
+async def purge_old_conversation_formats(collection):
+    """Drop conversation states saved in an older format (format 1 kept users' messages)"""
+    result = await collection.delete_many({"format": {"$ne": FORMAT_VERSION}})
+    if result.deleted_count:
+        logger.info(f"🧹 Removed {result.deleted_count} conversations stored in an old format")
+
+def mood_owner_fields(entry: dict) -> dict:
+    """``user_id`` as the owner's id string, for entries that stored the whole user document"""
+    return {"user_id": str(entry["user_id"]["_id"])}
+
+def therapist_derived_fields(therapist: dict) -> dict:
+    """Lowercased facet keys stored on therapists for indexed, case-insensitive search.
+
+    Only fields present in ``therapist`` are derived, so partial updates
+    refresh just the keys they touch.
+    """
+    derived = {}
+    for source, key in THERAPIST_FACET_KEYS.items():
+        if therapist.get(source) is not None:
+            derived[key] = sorted({value.strip().lower() for value in therapist[source] if value and value.strip()})
+    if therapist.get("location") is not None:
+        derived["location_terms"] = sorted(set(tokenize(therapist["location"])))
+
+    latitude, longitude = (therapist.get(field) for field in THERAPIST_COORDINATE_FIELDS)
+    if latitude is not None and longitude is not None:
+        derived["geo"] = geo_point(latitude, longitude)
+    elif therapist.get("location") is not None:
+        # Stored as null when the location is unknown to the geocoder, so the
+        # backfill does not retry it and the sparse 2dsphere index skips it
+        coordinates = geocode(therapist["location"])
+        derived["geo"] = geo_point(*coordinates) if coordinates else None
+    return derived
+
+async def report_ungeocoded_therapists(collection) -> int:
+    """Warn about therapists without coordinates; nearby search cannot return them"""
+    missing = await collection.count_documents({"geo": None})
+    if missing:
+        logger.warning(f"⚠️ {missing} therapists have no coordinates and are left out of nearby search; "
+                       "give them latitude/longitude or set GEO_CENTROIDS_PATH to a full ZIP centroid table")
+    return missing
+
+def geo_point(latitude: float, longitude: float) -> dict:
+    """GeoJSON point; note GeoJSON orders coordinates longitude first"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+async def backfill_derived_fields(collection, missing: dict, projection: dict, derive, batch_size: int = 500):
+    """Populate derived fields on documents written before they existed"""
+    updates = []
+    updated = 0
+    async for document in collection.find(missing, projection):
+        updates.append(UpdateOne({"_id": document["_id"]}, {"$set": derive(document)}))
+        if len(updates) >= batch_size:
+            await collection.bulk_write(updates, ordered=False)
+            updated += len(updates)
+            updates = []
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+        updated += len(updates)
+    if updated:
+        logger.info(f"✅ Backfilled derived fields on {updated} {collection.name}")
+
+async def ensure_therapist_search_indexes(collection):
+    """Indexes behind /api/therapists/search: one per filter, each ending in the (name, _id) sort key"""
+    await collection.create_index([("name", 1), ("_id", 1)])
+    await collection.create_index([("telehealth", 1), ("name", 1), ("_id", 1)])
+    for key in [*THERAPIST_FACET_KEYS.values(), "location_terms"]:
+        await collection.create_index([(key, 1), ("name", 1), ("_id", 1)])
+    # Behind $geoNear for /api/therapists/nearby
+    await collection.create_index([("geo", "2dsphere")])
+
+async def ensure_resource_url_index(collection):
+    """Unique index on the normalized URL, used to de-duplicate resources"""
+    try:
+        await collection.create_index(
+            "url_key",
+            unique=True,
+            partialFilterExpression={"url_key": {"$type": "string"}}
+        )
+    except OperationFailure as e:
+        # Existing duplicate URLs block the unique index; imports still
+        # upsert on url_key, but duplicates must be cleaned up by hand
+        logger.warning(f"⚠️ Could not create unique resource URL index: {e}")
+
 async def check_db_connection():
     """Check if database is responsive"""
     try:
@@ -0,0 +1,327 @@
+"""Production entry point: a preforking master supervising uvicorn workers.
+
+The master imports the app and loads the NLP models and response library
+once, freezes the garbage collector so those objects stay in shared
+copy-on-write pages, then forks workers that all serve one listening
+socket. Workers that die are replaced. ``SIGHUP`` replaces the workers one
+at a time, each new worker ready before its predecessor is stopped;
+``SIGTERM``/``SIGINT`` stop them gracefully::
+
+    python -m app.launcher --workers 4 --host 0.0.0.0 --port 8000
+
+Code changes need a restart of the master, since workers are forked from
+the code it loaded.
+"""
+import argparse
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.append(str(Path(__file__).parent.parent))  # backend directory
+
+import uvicorn
+
+from app.utils.logging_config import stop_logging
+
+logger = logging.getLogger("app.launcher")
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+WORKER_READY_TIMEOUT = float(os.getenv("WORKER_READY_TIMEOUT", "120"))
+WORKER_GRACEFUL_TIMEOUT = float(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+MEMORY_REPORT_SECONDS = float(os.getenv("MEMORY_REPORT_SECONDS", "300"))
+# A worker exiting this soon after starting is treated as a crash loop and backed off
+MIN_WORKER_LIFETIME = 5.0
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, float]]:
+    """RSS, PSS and private memory of a process in MB, from /proc (Linux only).
+
+    PSS splits shared pages between the processes mapping them, so the
+    gap between RSS and private memory is what copy-on-write sharing saves.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def describe_memory(pid: int) -> str:
+    usage = memory_usage(pid)
+    if usage is None:
+        return "memory n/a"
+    return f"RSS {usage['rss']:.1f} MB, PSS {usage['pss']:.1f} MB, private {usage['private']:.1f} MB"
+
+
+class ReadyServer(uvicorn.Server):
+    """uvicorn server that tells the master once lifespan startup has finished"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+            os.close(self.ready_fd)
+
+
+class Worker:
+    __slots__ = ("slot", "pid", "started_at", "ready_fd", "ready_at", "retiring")
+
+    def __init__(self, slot: int, pid: int, ready_fd: int):
+        self.slot = slot
+        self.pid = pid
+        self.started_at = time.monotonic()
+        self.ready_fd = ready_fd
+        self.ready_at: Optional[float] = None
+        self.retiring = False
+
+
+class Launcher:
+    def __init__(self, host: str, port: int, workers: int, backlog: int = 2048,
+                 ready_timeout: float = WORKER_READY_TIMEOUT, graceful_timeout: float = WORKER_GRACEFUL_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.worker_count = max(1, workers)
+        self.backlog = backlog
+        self.ready_timeout = ready_timeout
+        self.graceful_timeout = graceful_timeout
+        self.app = None
+        self.socket: Optional[socket.socket] = None
+        self.workers: Dict[int, Worker] = {}
+        self.crashes: Dict[int, int] = {}
+        self.respawn_at: Dict[int, float] = {}
+        self.stopping = False
+        self.reload_requested = False
+        self._wakeup_r, self._wakeup_w = os.pipe()
+
+    # Master
+    def preload(self):
+        started = time.perf_counter()
+        from app.main import app, app_state, load_nlp_components
+        load_nlp_components()
+        app_state.nlp_preloaded = True
+        self.app = app
+        # Objects that survive from here on are never collected, so the
+        # collector does not touch (and un-share) their pages in the workers
+        gc.collect()
+        gc.freeze()
+        logger.info(
+            f"📦 Preloaded app and models in {time.perf_counter() - started:.2f}s "
+            f"({describe_memory(os.getpid())}, {gc.get_freeze_count()} objects frozen)"
+        )
+
+    def bind(self):
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(self.backlog)
+        self.socket.set_inheritable(True)
+        logger.info(f"🔌 Listening on {self.host}:{self.port} with {self.worker_count} workers")
+
+    def run(self):
+        self.preload()
+        self.bind()
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(sig, self._on_signal)
+        os.set_blocking(self._wakeup_w, False)
+        signal.set_wakeup_fd(self._wakeup_w)
+        for slot in range(self.worker_count):
+            self.spawn(slot)
+
+        next_report = time.monotonic() + MEMORY_REPORT_SECONDS
+        while not self.stopping:
+            self._poll(1.0)
+            if self.reload_requested:
+                self.reload_requested = False
+                self.rolling_restart()
+            if time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = time.monotonic() + MEMORY_REPORT_SECONDS
+        self.shutdown()
+
+    def _on_signal(self, sig, frame):
+        if sig in (signal.SIGTERM, signal.SIGINT):
+            self.stopping = True
+        elif sig == signal.SIGHUP:
+            self.reload_requested = True
+        # SIGCHLD only needs to wake the loop, which the wakeup fd does
+
+    def spawn(self, slot: int) -> Worker:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 1
+            try:
+                self._serve(ready_w)
+                code = 0
+            except BaseException:
+                logger.exception(f"💥 Worker {slot} failed")
+            finally:
+                stop_logging()
+                os._exit(code)
+        os.close(ready_w)
+        worker = Worker(slot, pid, ready_r)
+        self.workers[pid] = worker
+        return worker
+
+    def _poll(self, timeout: float):
+        """Wait for a signal or a worker becoming ready, then reap and respawn"""
+        pending = {worker.ready_fd: worker for worker in self.workers.values() if worker.ready_fd >= 0}
+        readable, _, _ = select.select([self._wakeup_r, *pending], [], [], timeout)
+        for fd in readable:
+            if fd == self._wakeup_r:
+                os.read(self._wakeup_r, 512)
+            else:
+                self._mark_ready(pending[fd])
+        self._reap()
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            if worker.ready_at is None and now - worker.started_at > self.ready_timeout:
+                logger.error(f"⏱️ Worker {worker.slot} (pid {worker.pid}) not ready after {self.ready_timeout:.0f}s")
+                self._kill(worker.pid, signal.SIGKILL)
+        for slot, when in list(self.respawn_at.items()):
+            if now >= when and not self.stopping:
+                del self.respawn_at[slot]
+                self.spawn(slot)
+
+    def _mark_ready(self, worker: Worker):
+        try:
+            signalled = os.read(worker.ready_fd, 1)
+        finally:
+            os.close(worker.ready_fd)
+            worker.ready_fd = -1
+        if not signalled:
+            return  # the worker exited during startup; _reap deals with it
+        worker.ready_at = time.monotonic()
+        self.crashes.pop(worker.slot, None)
+        logger.info(
+            f"👷 Worker {worker.slot} (pid {worker.pid}) ready in {worker.ready_at - worker.started_at:.2f}s | "
+            f"{describe_memory(worker.pid)}"
+        )
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker.ready_fd >= 0:
+                os.close(worker.ready_fd)
+            if worker.retiring or self.stopping:
+                continue
+            lifetime = time.monotonic() - worker.started_at
+            crashes = self.crashes.get(worker.slot, 0) + 1 if lifetime < MIN_WORKER_LIFETIME else 0
+            self.crashes[worker.slot] = crashes
+            delay = min(2 ** crashes, 60) if crashes else 0
+            logger.warning(
+                f"⚠️ Worker {worker.slot} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}, "
+                f"restarting in {delay}s"
+            )
+            self.respawn_at[worker.slot] = time.monotonic() + delay
+
+    def _kill(self, pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _wait_for(self, condition, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._poll(min(remaining, 0.5))
+        return True
+
+    def rolling_restart(self):
+        """Replace each worker in turn, starting the new one before stopping the old"""
+        logger.info("🔄 Rolling restart of workers")
+        for old in sorted(self.workers.values(), key=lambda worker: worker.slot):
+            if self.stopping or old.pid not in self.workers:
+                continue
+            new = self.spawn(old.slot)
+            if not self._wait_for(lambda: new.ready_at is not None or new.pid not in self.workers, self.ready_timeout) \
+                    or new.pid not in self.workers:
+                logger.error(f"🚨 Replacement for worker {old.slot} did not start; keeping the old workers")
+                new.retiring = True
+                self._kill(new.pid, signal.SIGKILL)
+                return
+            old.retiring = True
+            self._kill(old.pid, signal.SIGTERM)
+            if not self._wait_for(lambda: old.pid not in self.workers, self.graceful_timeout):
+                self._kill(old.pid, signal.SIGKILL)
+        logger.info("✅ Rolling restart complete")
+
+    def report_memory(self):
+        for worker in sorted(self.workers.values(), key=lambda worker: worker.slot):
+            logger.info(f"📊 Worker {worker.slot} (pid {worker.pid}): {describe_memory(worker.pid)}")
+
+    def shutdown(self):
+        logger.info("🛑 Stopping workers...")
+        for pid in list(self.workers):
+            self._kill(pid, signal.SIGTERM)
+        if not self._wait_for(lambda: not self.workers, self.graceful_timeout):
+            for pid in list(self.workers):
+                self._kill(pid, signal.SIGKILL)
+            self._wait_for(lambda: not self.workers, 5)
+        self.socket.close()
+        logger.info("👋 Launcher stopped")
+
+    # Worker
+    def _serve(self, ready_fd: int):
+        signal.set_wakeup_fd(-1)
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+        for worker in self.workers.values():
+            if worker.ready_fd >= 0:
+                os.close(worker.ready_fd)
+        # uvicorn handles SIGTERM/SIGINT while serving and re-raises them on exit
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_IGN)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        config = uvicorn.Config(
+            self.app, lifespan="on", log_config=None, proxy_headers=True,
+            timeout_graceful_shutdown=int(self.graceful_timeout),
+        )
+        ReadyServer(config, ready_fd).run(sockets=[self.socket])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    args = parser.parse_args()
+    Launcher(args.host, args.port, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,25 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import Optional
 import logging
-import traceback
 import asyncio
 from contextlib import asynccontextmanager
-
-# Logging config
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
+from app.middleware.rate_limit import (
+    RateLimitMiddleware, MongoBucketStore, RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND
 )
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.errors import UnhandledErrorMiddleware
+from app.middleware.draining import DrainingMiddleware
+from app.utils.json_response import FastJSONResponse
+from app.utils.logging_config import configure_logging
+from app.utils.shutdown import shutdown_coordinator
+from app.utils.health import InstrumentedExecutor, executor_check, health_prober
+
+# Logging config: records are queued and written by a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # App state
@@ -26,18 +30,78 @@ class AppState:
         self.nlp_model = None
         self.ready = False
         self.db_initialized = False
+        self.nlp_preloaded = False
+        self.background_tasks = []
 
 app_state = AppState()
 
+def load_nlp_components():
+    """Load the chat model, NLP model and response library into app_state.
+
+    Runs in the launcher's master before forking workers (which then skip
+    it in lifespan), or in each process's lifespan otherwise.
+    """
+    from app.models.chat_model import ChatModel
+    app_state.chat_model = ChatModel()
+    if not app_state.chat_model.model_loaded:
+        raise RuntimeError("ChatModel failed to initialize")
+
+    from app.models.nlp_model import NLPModel
+    app_state.nlp_model = NLPModel()
+
+    from app.utils.response_generator import AIResponseGenerator
+    from app.utils.intent_manager import IntentManager
+    app_state.response_generator = AIResponseGenerator(IntentManager())
+
 # Models
 class ChatRequest(BaseModel):
     text: str
-    user_id: Optional[str] = "default"
+    # Conversation to continue: the user's or chat session's id. Without one
+    # the message is answered without remembered context.
+    user_id: Optional[str] = None
     context: Optional[dict] = None
 
+async def cancel_background_tasks():
+    tasks, app_state.background_tasks = app_state.background_tasks, []
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def register_shutdown_steps():
+    """Buffers to flush and resources to close, in the order they are released"""
+    from app.utils.logging_config import flush_logging
+    from app.utils.security import password_hasher
+    from app.database import close_db
+    shutdown_coordinator.register_buffer("log queue", flush_logging)
+    shutdown_coordinator.register_closer("background tasks", cancel_background_tasks)
+    shutdown_coordinator.register_closer("password hashing pool", password_hasher.shutdown)
+    # Waits for chat pipeline steps still running in threads; nothing may use it afterwards
+    shutdown_coordinator.register_closer("default executor", asyncio.get_running_loop().shutdown_default_executor)
+    shutdown_coordinator.register_closer("MongoDB client", close_db)
+
+async def check_chat_nlp_model():
+    """Canary inference on the intent model chat requests use"""
+    model = app_state.chat_model.nlp_model if app_state.chat_model and app_state.chat_model.model_loaded \
+        else app_state.nlp_model
+    if model is None:
+        return False, {"error": "not loaded"}
+    healthy = await asyncio.get_running_loop().run_in_executor(None, model.health_check)
+    return healthy, {} if healthy else {"fallback": "keyword matching"}
+
+def register_health_checks(executor: InstrumentedExecutor):
+    from app.database import ping_db
+    health_prober.add_check("database", ping_db)
+    # Chat degrades to keyword matching without the model, so this only reports it
+    health_prober.add_check("nlp_model", check_chat_nlp_model, critical=False)
+    health_prober.add_check("executor", executor_check(lambda: executor))
+
 # Lifespan event
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Chat pipeline steps run on the default executor; this one reports its queue depth
+    executor = InstrumentedExecutor(thread_name_prefix="app-executor")
+    asyncio.get_running_loop().set_default_executor(executor)
+
     # Initialize database
     try:
         from app.database import init_db
@@ -48,39 +112,71 @@ async def lifespan(app: FastAPI):
         logger.critical(f"🚨 Database initialization failed: {e}")
         raise
 
-    # Initialize NLP components
+    # Collection versions behind the ETags of read-mostly endpoints
+    from app.database import collection_versions, VERSION_SYNC_SECONDS
+    await collection_versions.load()
+    app_state.background_tasks.append(asyncio.create_task(collection_versions.run_refresher(VERSION_SYNC_SECONDS)))
+
+    # Revoked refresh-token sessions, checked in memory on /auth/refresh
+    from app.crud.refresh_token_crud import load_revocation_filter, run_revocation_filter_refresher
+    await load_revocation_filter()
+    app_state.background_tasks.append(asyncio.create_task(run_revocation_filter_refresher()))
+
+    # Optional in-memory resource search
+    from app.models.resource import (
+        RESOURCE_INDEX_ENABLED, load_resource_index, run_resource_index_reconciler
+    )
+    if RESOURCE_INDEX_ENABLED:
+        await load_resource_index()
+        app_state.background_tasks.append(asyncio.create_task(run_resource_index_reconciler()))
+
+    # Optional in-memory faceted therapist directory
+    from app.crud.therapist_crud import (
+        THERAPIST_DIRECTORY_ENABLED, load_therapist_directory, run_therapist_directory_refresher
+    )
+    if THERAPIST_DIRECTORY_ENABLED:
+        await load_therapist_directory()
+        app_state.background_tasks.append(asyncio.create_task(run_therapist_directory_refresher()))
+
+    # Therapist suggestions for chat replies; chat still works without them
+    from app.crud.therapist_crud import (
+        therapist_matcher, load_therapist_matcher, run_therapist_matcher_refresher
+    )
     try:
-        logger.info("🔄 Initializing NLP components...")
-        
-        # Initialize ChatModel
-        from app.models.chat_model import ChatModel
-        loop = asyncio.get_running_loop()
-        app_state.chat_model = await loop.run_in_executor(None, ChatModel)
-        
-        if not app_state.chat_model.model_loaded:
-            raise RuntimeError("ChatModel failed to initialize")
-        
-        # Initialize NLP model
-        from app.models.nlp_model import NLPModel
-        app_state.nlp_model = NLPModel()
-        
-        # Initialize response generator
-        from app.utils.response_generator import AIResponseGenerator
-        from app.utils.intent_manager import IntentManager
-        
-        intent_manager = IntentManager()
-        app_state.response_generator = AIResponseGenerator(intent_manager)
-        
-        logger.info("✅ NLP components initialized successfully")
+        await load_therapist_matcher()
+    except Exception as e:
+        logger.error(f"⚠️ Therapist matcher unavailable: {e}")
+    app_state.background_tasks.append(asyncio.create_task(run_therapist_matcher_refresher()))
+
+    # Initialize NLP components, unless the launcher already loaded them before forking
+    try:
+        if app_state.nlp_preloaded:
+            logger.info("♻️ Using NLP components preloaded by the launcher")
+        else:
+            logger.info("🔄 Initializing NLP components...")
+            await asyncio.get_running_loop().run_in_executor(None, load_nlp_components)
+            logger.info("✅ NLP components initialized successfully")
+        app_state.chat_model.ai_response_generator.therapist_matcher = therapist_matcher
+        app_state.response_generator.therapist_matcher = therapist_matcher
+        from app.database import conversation_store
+        app_state.chat_model.conversation_store = conversation_store
     except Exception as e:
         logger.critical(f"🚨 Failed to initialize NLP components: {e}")
         raise
 
+    register_health_checks(executor)
+    await health_prober.run_once()
+    app_state.background_tasks.append(asyncio.create_task(health_prober.run()))
+
+    register_shutdown_steps()
+    shutdown_coordinator.start()
+    shutdown_coordinator.hook_signals()
     app_state.ready = True
     logger.info("🚀 Application startup complete")
     yield
     logger.info("🛑 Shutting down application...")
     app_state.ready = False
+    await shutdown_coordinator.shutdown()
 
 # App init
 app = FastAPI(
@@ -89,18 +185,40 @@ app = FastAPI(
     version="1.1.0",  # Updated version
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
-# Middleware
+# Middleware (the last one added runs first)
+# Innermost, so the 503s it sends while shutting down still carry CORS headers
+app.add_middleware(DrainingMiddleware, coordinator=shutdown_coordinator)
+
+async def get_rate_limits_collection():
+    from app.database import Database
+    db = await Database.get_instance()
+    return db.get_rate_limits_collection()
+
+if RATE_LIMIT_ENABLED:
+    from app.utils.jwt_handler import decode_token
+    # Inside CORS so that 429 responses still carry CORS headers
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=MongoBucketStore(get_rate_limits_collection) if RATE_LIMIT_BACKEND == "mongo" else None,
+        decode_token=decode_token,
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor", "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset",
+        "RateLimit-Policy", "Retry-After",
+    ],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(UnhandledErrorMiddleware)
 
 # Routers
 try:
@@ -109,20 +227,23 @@ try:
     from app.routes.resources import router as resources_router
     from app.routes.users import router as users_router
     from app.routes.mood_tracking import router as mood_router
+    from app.routes.export import router as export_router
 
     app.include_router(mood_router)
     app.include_router(users_router)
     app.include_router(auth_router)
     app.include_router(therapist_router)
     app.include_router(resources_router)
+    app.include_router(export_router)
     logger.info("✅ All routers included successfully")
 except ImportError as e:
     logger.critical(f"🚨 Failed to import routers: {e}")
     raise
 
-# Health check endpoint
+# Health check endpoints
 @app.get("/api/health", tags=["System"])
 async def health_check():
+    from app.database import conversation_store
     return {
         "status": "healthy" if app_state.ready else "initializing",
         "components": {
@@ -131,9 +252,22 @@ async def health_check():
             "nlp_model": "loaded" if app_state.nlp_model else "unavailable",
             "response_generator": "loaded" if app_state.response_generator else "unavailable"
         },
+        "checks": health_prober.snapshot(),
+        "conversations": conversation_store.stats(),
         "version": "1.1.0"
     }
 
+# Probes answer from the prober's cached results, so they never touch the database or the model
+@app.get("/api/health/live", tags=["System"])
+async def liveness_probe():
+    status_code, body = health_prober.liveness()
+    return Response(body, status_code=status_code, media_type="application/json")
+
+@app.get("/api/health/ready", tags=["System"])
+async def readiness_probe():
+    status_code, body = health_prober.readiness(accepting=app_state.ready and shutdown_coordinator.accepting)
+    return Response(body, status_code=status_code, media_type="application/json")
+
 # Chat endpoint - combined functionality
 @app.post("/api/chat", tags=["Chat"])
 async def handle_chat(request: ChatRequest):
@@ -141,7 +275,8 @@ async def handle_chat(request: ChatRequest):
         raise HTTPException(status_code=503, detail="Service initializing")
 
     try:
-        logger.info(f"💬 Incoming message from {request.user_id}: {request.text}")
+        # Never the message itself: it is sensitive and may be long
+        logger.info("💬 Incoming message from %s (%d chars)", request.user_id or "anonymous", len(request.text))
         
         # Option 1: Use ChatModel if available
         if app_state.chat_model and app_state.chat_model.model_loaded:
@@ -154,21 +289,26 @@ async def handle_chat(request: ChatRequest):
         # Option 2: Fallback to NLP pipeline if ChatModel not available
         if app_state.nlp_model and app_state.response_generator:
             intent = app_state.nlp_model.predict(request.text)
-            response = app_state.response_generator.generate_response(
-                message=request.text,
-                intent=intent
-            )
+
+            async def turn(state):
+                generator = app_state.response_generator.bind_context(state.get("context"))
+                response = generator.generate_response(message=request.text, intent=intent)
+                state["context"] = generator.export_context()
+                return response, generator.get_conversation_summary()
+
+            from app.database import conversation_store
+            response, summary = await conversation_store.update(request.user_id, turn)
             return {
                 "response": response,
                 "intent": intent,
-                "context": app_state.response_generator.get_conversation_summary(),
+                "context": summary,
                 "status": "success"
             }
         
         raise HTTPException(status_code=503, detail="No chat processing available")
         
     except Exception as e:
-        logger.error(f"💥 Chat processing error: {traceback.format_exc()}")
+        logger.exception("💥 Chat processing error")
         raise HTTPException(
             status_code=500,
             detail="Error processing your message. Please try again."
@@ -177,7 +317,10 @@ async def handle_chat(request: ChatRequest):
 # Error handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.warning(f"⚠️ Validation error: {exc.errors()}")
+    if logger.isEnabledFor(logging.WARNING):
+        # Locations and error types only; the offending input values may be passwords
+        logger.warning("⚠️ Validation error on %s: %s", request.url.path,
+                       [(error["loc"], error["type"]) for error in exc.errors()])
     return JSONResponse(
         status_code=422,
         content={"detail": exc.errors(), "body": exc.body},
@@ -185,7 +328,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    logger.warning(f"🔒 HTTP {exc.status_code}: {exc.detail}")
+    logger.warning("🔒 HTTP %s: %s", exc.status_code, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
@@ -193,19 +336,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"🔥 Unhandled error: {traceback.format_exc()}")
+    logger.error("🔥 Unhandled error", exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={"detail": "An unexpected error occurred"},
-    )
-
-@app.middleware("http")
-async def catch_unhandled_exceptions(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except Exception:
-        logger.error(f"🔥 Unhandled error in middleware:\n{traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "An unexpected error occurred. Please try again later."},
-        )
\ No newline at end of file
+    )
\ No newline at end of file
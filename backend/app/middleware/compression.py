@@ -0,0 +1,281 @@
+import os
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: "br" is simply not offered
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional: "zstd" is simply not offered
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1000"))
+# Short chat replies gain little from compression and are latency sensitive
+COMPRESSION_SKIP_PATHS = tuple(
+    path.strip().rstrip("/") for path in os.getenv("COMPRESSION_SKIP_PATHS", "/api/chat").split(",") if path.strip()
+)
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int = 6, cached_level: int = 9):
+        self.level = level
+        self.cached_level = cached_level
+
+    def compress(self, body: bytes, cached: bool = False) -> bytes:
+        compressor = zlib.compressobj(self.cached_level if cached else self.level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+
+    def stream(self) -> "_Stream":
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return _Stream(
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int = 4, cached_level: int = 9):
+        self.level = level
+        self.cached_level = cached_level
+
+    def compress(self, body: bytes, cached: bool = False) -> bytes:
+        return brotli.compress(body, quality=self.cached_level if cached else self.level)
+
+    def stream(self) -> "_Stream":
+        compressor = brotli.Compressor(quality=self.level)
+        return _Stream(lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish)
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int = 3, cached_level: int = 12):
+        self._live = zstandard.ZstdCompressor(level=level)
+        self._cached = zstandard.ZstdCompressor(level=cached_level)
+
+    def compress(self, body: bytes, cached: bool = False) -> bytes:
+        return (self._cached if cached else self._live).compress(body)
+
+    def stream(self) -> "_Stream":
+        compressor = self._live.compressobj()
+        return _Stream(
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+class _Stream:
+    """Compresses a streamed body chunk by chunk, flushing each so clients see progress"""
+    __slots__ = ("chunk", "finish")
+
+    def __init__(self, chunk, finish):
+        self.chunk = chunk
+        self.finish = finish
+
+
+def available_encoders() -> list:
+    """Encoders in server preference order, skipping those whose library is missing"""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder())
+    if brotli is not None:
+        encoders.append(BrotliEncoder())
+    encoders.append(GzipEncoder())
+    return encoders
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, offered: Tuple[str, ...]) -> Optional[str]:
+    """Best of ``offered`` for an Accept-Encoding header, ties going to the earlier one"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params[:2].lower() == "q=":
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in offered:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies for responses that carry an ETag, bounded by total bytes.
+
+    Such bodies only change when their ETag does, so a repeat request for
+    the same URL and version reuses the compressed bytes, which are
+    produced once at a higher compression level.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+        return body
+
+    def set(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes or key in self._bodies:
+            return
+        self._bodies[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self._size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """Pure ASGI response compression negotiated between zstd, br and gzip.
+
+    Small bodies, non-text content types, already-encoded responses, HEAD
+    requests and the paths in ``skip_paths`` pass through untouched.
+    Streaming responses are compressed chunk by chunk. Compressed
+    responses get ``Vary: Accept-Encoding`` and a weak ETag.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 skip_paths: Iterable[str] = COMPRESSION_SKIP_PATHS,
+                 encoders: Optional[Iterable] = None, cache_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.skip_paths = frozenset(skip_paths)
+        self.encoders = {encoder.name: encoder for encoder in (encoders or available_encoders())}
+        self.offered = tuple(self.encoders)
+        self.cache = CompressedBodyCache(cache_bytes) if cache_bytes else None
+
+    def _skipped(self, path: str) -> bool:
+        path = path.rstrip("/")
+        return any(path == skip or path.startswith(skip + "/") for skip in self.skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or self._skipped(scope["path"]):
+            return await self.app(scope, receive, send)
+        accept_encoding = next((value for name, value in scope["headers"] if name == b"accept-encoding"), None)
+        coding = negotiate(accept_encoding.decode("latin-1"), self.offered) if accept_encoding else None
+        if coding is None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, _CompressingSender(self, scope, send, coding).send)
+
+    def compress(self, coding: str, body: bytes, cache_key: Optional[tuple]) -> bytes:
+        if cache_key is None or self.cache is None:
+            return self.encoders[coding].compress(body)
+        compressed = self.cache.get(cache_key)
+        if compressed is None:
+            compressed = self.encoders[coding].compress(body, cached=True)
+            self.cache.set(cache_key, compressed)
+        return compressed
+
+
+class _CompressingSender:
+    """Holds back the response start until the first body chunk decides how to encode"""
+    __slots__ = ("middleware", "scope", "downstream", "coding", "start", "stream", "passthrough")
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, coding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.coding = coding
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if self.passthrough:
+            return await self.downstream(message)
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start = message
+            return
+        if message_type != "http.response.body":
+            # Extensions such as pathsend: leave the response alone
+            self.passthrough = True
+            if self.start is not None:
+                await self.downstream(self.start)
+            return await self.downstream(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is not None:
+            data = self.stream.chunk(body) if body else b""
+            if not more_body:
+                data += self.stream.finish()
+            return await self.downstream({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        if not self._eligible(start["status"], headers):
+            self.passthrough = True
+            if start["status"] == 304:
+                self._weaken_etag(headers)
+            await self.downstream({**start, "headers": headers.raw})
+            return await self.downstream(message)
+        headers.add_vary_header("Accept-Encoding")
+        if not more_body and len(body) < self.middleware.minimum_size:
+            self.passthrough = True
+            await self.downstream({**start, "headers": headers.raw})
+            return await self.downstream(message)
+
+        etag = headers.get("etag")
+        headers["Content-Encoding"] = self.coding
+        self._weaken_etag(headers)
+        if more_body:
+            if "content-length" in headers:
+                del headers["content-length"]
+            self.stream = self.middleware.encoders[self.coding].stream()
+            await self.downstream({**start, "headers": headers.raw})
+            return await self.downstream({"type": "http.response.body", "body": self.stream.chunk(body), "more_body": True})
+
+        cache_key = None
+        if etag and self.scope["method"] == "GET":
+            cache_key = (self.coding, self.scope["path"], self.scope.get("query_string", b""), etag)
+        compressed = self.middleware.compress(self.coding, body, cache_key)
+        headers["Content-Length"] = str(len(compressed))
+        await self.downstream({**start, "headers": headers.raw})
+        await self.downstream({"type": "http.response.body", "body": compressed})
+
+    @staticmethod
+    def _eligible(status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+    def _weaken_etag(self, headers: MutableHeaders) -> None:
+        # The compressed bytes differ from the identity representation
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
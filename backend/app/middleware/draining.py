@@ -0,0 +1,39 @@
+import json
+
+DRAINING_BODY = json.dumps({"detail": "Server is shutting down, please retry"}).encode("utf-8")
+
+
+class DrainingMiddleware:
+    """Pure ASGI gate counting requests as in flight and refusing new ones once shutdown starts.
+
+    ``coordinator`` is the process's ``ShutdownCoordinator``. Refused
+    requests get a 503 with ``Retry-After`` and ``Connection: close``, so
+    clients reconnect (to another worker) instead of reusing a connection
+    to a process that is going away.
+    """
+
+    def __init__(self, app, coordinator, retry_after: int = 1):
+        self.app = app
+        self.coordinator = coordinator
+        self.retry_after = str(retry_after).encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if not self.coordinator.accepting:
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(DRAINING_BODY)).encode("latin-1")),
+                    (b"retry-after", self.retry_after),
+                    (b"connection", b"close"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": DRAINING_BODY})
+            return
+
+        async with self.coordinator.track():
+            await self.app(scope, receive, send)
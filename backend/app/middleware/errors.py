@@ -0,0 +1,47 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+ERROR_BODY = json.dumps({"detail": "An unexpected error occurred. Please try again later."}).encode("utf-8")
+
+
+class UnhandledErrorMiddleware:
+    """Pure ASGI last resort turning exceptions that escape the app into a JSON 500.
+
+    Unlike an ``@app.middleware("http")`` function this wraps neither the
+    request nor the response body, so streaming responses pass straight
+    through. An error after the response has started cannot be reported
+    to the client and is re-raised for the server to close the connection.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = False
+
+        async def send_tracking(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception:
+            logger.exception("🔥 Unhandled error in middleware")
+            if started:
+                raise
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(ERROR_BODY)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": ERROR_BODY})
@@ -0,0 +1,215 @@
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# "memory" keeps buckets per worker; "mongo" shares them between workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# Only behind a proxy that sets X-Forwarded-For; otherwise clients could pick their own key
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+# (allowed, tokens remaining, seconds until the bucket is full again)
+TakeResult = Tuple[bool, int, int]
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A token bucket of ``capacity`` requests refilled over ``period`` seconds.
+
+    ``by_user`` rules key signed-in callers by their user id; the others,
+    such as login, always key by client IP.
+    """
+    name: str
+    method: str
+    paths: Tuple[str, ...]
+    capacity: int
+    period: float
+    by_user: bool = True
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+
+DEFAULT_RULES = (
+    RateLimitRule("chat", "POST", ("/api/chat",), capacity=20, period=60),
+    RateLimitRule("login", "POST", ("/auth/login",), capacity=10, period=60, by_user=False),
+    RateLimitRule("mood", "POST", ("/api/mood/log", "/api/mood/log/batch"), capacity=30, period=60),
+)
+
+
+class InMemoryBucketStore:
+    """Token buckets for one worker, as ``key -> (tokens, updated_at)``.
+
+    A bucket idle long enough to have refilled is indistinguishable from a
+    new one, so such entries are swept periodically and the table only
+    holds clients active within the last refill period.
+    """
+
+    def __init__(self, max_keys: int = 100000, sweep_every: int = 1024):
+        self.max_keys = max_keys
+        self.sweep_every = sweep_every
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._takes = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> TakeResult:
+        return self.take_now(key, capacity, refill_per_second, time.monotonic())
+
+    def take_now(self, key: str, capacity: int, refill_per_second: float, now: float) -> TakeResult:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        full_in = (capacity - tokens) / refill_per_second
+        self._buckets[key] = (tokens, now, now + full_in)
+
+        self._takes += 1
+        if self._takes % self.sweep_every == 0 or len(self._buckets) > self.max_keys:
+            self.sweep(now)
+        return allowed, int(tokens), math.ceil(full_in)
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        # Still over the bound: drop the oldest entries first
+        while len(self._buckets) > self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+
+
+class MongoBucketStore:
+    """Token buckets shared by all workers, one document per key.
+
+    Each take is a single atomic pipeline update that refills, spends and
+    reports the bucket; documents expire through a TTL index on
+    ``expires_at`` once the bucket would be full again.
+    """
+
+    def __init__(self, get_collection: Callable[[], Awaitable]):
+        self._get_collection = get_collection
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> TakeResult:
+        collection = await self._get_collection()
+        now = time.time()
+        refilled = {"$min": [
+            capacity,
+            {"$add": [
+                {"$ifNull": ["$tokens", capacity]},
+                {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, refill_per_second]},
+            ]},
+        ]}
+        bucket = await collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": datetime.utcfromtimestamp(now + capacity / refill_per_second),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        full_in = (capacity - bucket["tokens"]) / refill_per_second
+        return bucket["allowed"], int(bucket["tokens"]), math.ceil(full_in)
+
+
+class RateLimitMiddleware:
+    """Pure ASGI token-bucket limiter for selected routes.
+
+    Requests are keyed by rule and principal: the ``sub`` of a bearer token
+    that ``decode_token`` accepts, for rules keyed by user, the client IP
+    otherwise. Unverified tokens never pick the key, so sending a new one
+    each time does not get a fresh bucket. Limited responses carry
+    ``RateLimit-Limit``/``-Remaining``/``-Reset`` and ``RateLimit-Policy``
+    headers; rejected requests get a 429 with ``Retry-After``. If the
+    shared backend fails the request is let through.
+    """
+
+    def __init__(self, app, rules: Iterable[RateLimitRule] = DEFAULT_RULES, store=None,
+                 trust_forwarded: bool = RATE_LIMIT_TRUST_FORWARDED,
+                 decode_token: Optional[Callable[[str], Optional[dict]]] = None):
+        self.app = app
+        self.store = store if store is not None else InMemoryBucketStore()
+        self.trust_forwarded = trust_forwarded
+        self.decode_token = decode_token
+        self._rules: Dict[Tuple[str, str], RateLimitRule] = {
+            (rule.method, path): rule for rule in rules for path in rule.paths
+        }
+        self._policies = {
+            rule.name: f"{rule.capacity};w={int(rule.period)}".encode("latin-1") for rule in rules
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rule = self._rules.get((scope["method"], scope["path"].rstrip("/") or "/"))
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        key = f"{rule.name}:{self._principal(scope, rule)}"
+        try:
+            allowed, remaining, reset = await self.store.take(key, rule.capacity, rule.refill_per_second)
+        except Exception as e:
+            logger.error(f"Rate limit backend failed, allowing request: {e}")
+            return await self.app(scope, receive, send)
+
+        headers = [
+            (b"ratelimit-limit", str(rule.capacity).encode("latin-1")),
+            (b"ratelimit-remaining", str(remaining).encode("latin-1")),
+            (b"ratelimit-reset", str(reset).encode("latin-1")),
+            (b"ratelimit-policy", self._policies[rule.name]),
+        ]
+        if not allowed:
+            retry_after = max(1, math.ceil(1 / rule.refill_per_second))
+            body = json.dumps({"detail": "Too many requests, please slow down"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(retry_after).encode("latin-1")),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _principal(self, scope, rule: RateLimitRule) -> str:
+        forwarded = token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                token = value[7:].strip().decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded = value
+        if token and rule.by_user and self.decode_token is not None:
+            payload = self.decode_token(token)
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+        if forwarded and self.trust_forwarded:
+            return "ip:" + forwarded.split(b",")[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
@@ -17,7 +17,9 @@ logger = logging.getLogger(__name__)
 class ChatModel:
     def __init__(self):
         """High-performance chat model with parallel initialization"""
-        self.conversation_history: Dict[str, list] = {}
+        from backend.app.utils.conversation_store import InMemoryConversationStore
+        # Replaced by the shared store in lifespan so any worker can continue a conversation
+        self.conversation_store = InMemoryConversationStore()
         self.components_ready = False
         self.model_loaded = False
         self._init_components_parallel()
@@ -63,7 +65,7 @@ class ChatModel:
             logger.error(f"Initialization error for {component_name}: {e}")
             raise
 
-    async def get_response(self, message: str, user_id: str = "default") -> str:
+    async def get_response(self, message: str, user_id: Optional[str] = None) -> str:
         """Ultra-fast response generation pipeline"""
         if not self.model_loaded or not self.components_ready:
             return "System initializing... please wait"
@@ -78,10 +80,14 @@ class ChatModel:
             if emergency:
                 return "[URGENT] Contact emergency services immediately."
 
-            # Generate response using both message and predicted intent
-            response = await self._generate_response(message, intent)
-            await self._update_history(user_id, message, response)
-            return response
+            async def turn(state: Dict) -> str:
+                # Generate response using both message and predicted intent, in this user's context
+                generator = self.ai_response_generator.bind_context(state.get("context"))
+                response = await self._generate_response(generator, message, intent)
+                state["context"] = generator.export_context()
+                return response
+
+            return await self.conversation_store.update(user_id, turn)
 
         except Exception as e:
             logger.error(f"Response error: {e}")
@@ -94,29 +100,20 @@ class ChatModel:
     async def _predict_intent(self, text: str) -> Optional[str]:
         loop = asyncio.get_running_loop()
         intent = await loop.run_in_executor(None, self.nlp_model.predict, text)
-        logger.debug(f"Predicted intent: {intent}")
+        logger.debug("Predicted intent: %s", intent)
         return intent
 
-    async def _generate_response(self, message: str, intent: Optional[str]) -> str:
+    async def _generate_response(self, generator, message: str, intent: Optional[str]) -> str:
         loop = asyncio.get_running_loop()
         response = await loop.run_in_executor(
             None, 
-            self.ai_response_generator.generate_response, 
+            generator.generate_response, 
             message,
             intent
         )
-        logger.debug(f"Generated response for intent '{intent}': {response[:100]}...")
+        logger.debug("Generated %d-char response for intent '%s'", len(response), intent)
         return response
 
-    async def _update_history(self, user_id: str, user_msg: str, bot_response: str):
-        """Lock-free history update"""
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
-        self.conversation_history[user_id] = [
-            *self.conversation_history[user_id][-4:], 
-            {"user": user_msg, "bot": bot_response}
-        ]
-
 async def test_chat_model():
     chat_model = ChatModel()
     print("Chat Model Testing (type 'quit' to exit)")
@@ -111,7 +111,7 @@ class NLPModel:
             
             self.performance.predict_time = time.time() - start_time
             self.performance.last_prediction = prediction
-            logger.debug(f"Predicted '{prediction}' in {self.performance.predict_time:.4f}s")
+            logger.debug("Predicted '%s' in %.4fs", prediction, self.performance.predict_time)
             return prediction
 
         except Exception as e:
@@ -1,10 +1,35 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, field_validator
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
+from collections import Counter
 from bson import ObjectId
-from app.database import Database
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+import os
+from app.database import Database, resource_derived_fields, collection_versions
+from app.utils.category_cache import CategoryCache
+from app.utils.resource_index import ResourceSearchIndex
+from app.utils.text_search import build_text_search
+from app.utils.urls import normalize_url
 from pydantic_core import core_schema
 
+logger = logging.getLogger(__name__)
+
+# Optional in-process search engine for the (small, read-mostly) library
+RESOURCE_INDEX_ENABLED = os.getenv("RESOURCE_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+RESOURCE_INDEX_RECONCILE_SECONDS = int(os.getenv("RESOURCE_INDEX_RECONCILE_SECONDS", "60"))
+
+resource_index = ResourceSearchIndex()
+
+# Derived search/de-duplication fields are never returned to clients
+RESOURCE_PROJECTION = {"search_ngrams": 0, "url_key": 0}
+
+# Categories change only on resource writes; the TTL reload catches writes from other workers
+CATEGORY_CACHE_TTL_SECONDS = int(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "300"))
+category_cache = CategoryCache(ttl=CATEGORY_CACHE_TTL_SECONDS)
+
 class PyObjectId(str):
     @classmethod
     def __get_pydantic_core_schema__(cls, _source_type, _handler):
@@ -23,7 +48,15 @@ class ResourceBase(BaseModel):
     description: str = Field(..., min_length=1, max_length=1000)
 
 class ResourceCreate(ResourceBase):
-    pass
+    @field_validator("url")
+    @classmethod
+    def url_must_normalize(cls, url: str) -> str:
+        # The normalized URL is the de-duplication key, so it must be computable (e.g. port in range)
+        try:
+            normalize_url(url)
+        except ValueError as e:
+            raise ValueError(f"Invalid URL: {e}")
+        return url
 
 class Resource(ResourceBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -50,41 +83,68 @@ async def create_resource(resource: ResourceCreate):
     db = await Database.get_instance()
     resource_data = resource.model_dump()
     resource_data["created_at"] = resource_data["updated_at"] = datetime.utcnow()
+    resource_data.update(resource_derived_fields(resource_data))
     
-    result = await db.get_resources_collection().insert_one(resource_data)
-    created_resource = await db.get_resources_collection().find_one({"_id": ObjectId(result.inserted_id)})
-    return Resource(**created_resource) if created_resource else None
+    # insert_one sets resource_data["_id"], so the stored document is already in hand
+    await db.get_resources_collection().insert_one(resource_data)
+    await collection_versions.bump("resources")
+    _index_resource(resource_data)
+    category_cache.upsert(str(resource_data["_id"]), resource_data["category"])
+    return Resource(**resource_data)
+
+RESOURCE_FIELDS = ("title", "type", "category", "source", "url", "description")
+
+def resource_row(resource: dict) -> dict:
+    """A stored resource shaped like a serialized ``Resource``, without validating it again"""
+    row = {"_id": str(resource["_id"])}
+    for field in RESOURCE_FIELDS:
+        row[field] = resource[field]
+    row["created_at"] = resource.get("created_at") or datetime.utcnow()
+    row["updated_at"] = resource.get("updated_at") or datetime.utcnow()
+    return row
+
+async def get_resources(search: str = None, category: str = None, limit: int = 100, skip: int = 0,
+                        fuzzy: bool = False) -> List[dict]:
+    """Search resources through the text index, best matches first, as ``resource_row`` dicts"""
+    if RESOURCE_INDEX_ENABLED and resource_index.ready:
+        return [resource_row(resource) for resource in resource_index.search(search, category, limit, skip)]
 
-async def get_resources(search: str = None, category: str = None, limit: int = 100, skip: int = 0):
     db = await Database.get_instance()
     query = {}
-    
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
-    
+    projection = dict(RESOURCE_PROJECTION)
+    sort = [("created_at", -1)]
+
+    text_search = build_text_search(search, fuzzy) if search else ""
+    if text_search:
+        query["$text"] = {"$search": text_search}
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+
     if category and category.lower() != "all":
         query["category"] = category.lower()
-    
+
     resources = []
-    async for resource in db.get_resources_collection().find(query).sort("created_at", -1).skip(skip).limit(limit):
-        resources.append(Resource(**resource))
+    cursor = db.get_resources_collection().find(query, projection).sort(sort).skip(skip).limit(limit)
+    async for resource in cursor:
+        resources.append(resource_row(resource))
     return resources
 
-async def get_resource_categories():
+async def refresh_category_cache():
+    """Reload the categories cache from Mongo if its TTL has expired"""
+    if not category_cache.is_stale():
+        return category_cache
     db = await Database.get_instance()
-    pipeline = [
-        {"$group": {"_id": "$category"}},
-        {"$project": {"category": "$_id", "_id": 0}}
-    ]
-    
-    categories = ["all"]
-    async for category in db.get_resources_collection().aggregate(pipeline):
-        categories.append(category["category"])
-    
-    return sorted(categories)
+    pairs = []
+    async for resource in db.get_resources_collection().find({}, {"category": 1}):
+        pairs.append((str(resource["_id"]), resource.get("category")))
+    category_cache.replace_all(pairs)
+    return category_cache
+
+async def get_resource_categories():
+    return (await refresh_category_cache()).categories()
+
+async def get_resource_category_counts():
+    return (await refresh_category_cache()).counts()
 
 async def get_resource(resource_id: str):
     db = await Database.get_instance()
@@ -98,17 +158,204 @@ async def update_resource(resource_id: str, resource: ResourceCreate):
     db = await Database.get_instance()
     resource_data = resource.model_dump()
     resource_data["updated_at"] = datetime.utcnow()
+    resource_data.update(resource_derived_fields(resource_data))
     
-    result = await db.get_resources_collection().update_one(
+    updated_resource = await db.get_resources_collection().find_one_and_update(
         {"_id": ObjectId(resource_id)},
-        {"$set": resource_data}
+        {"$set": resource_data},
+        return_document=ReturnDocument.AFTER
     )
-    if result.modified_count == 1:
-        updated_resource = await db.get_resources_collection().find_one({"_id": ObjectId(resource_id)})
+    if updated_resource:
+        await collection_versions.bump("resources")
+        _index_resource(updated_resource)
+        category_cache.upsert(resource_id, updated_resource["category"])
         return Resource(**updated_resource)
     return None
 
 async def delete_resource(resource_id: str):
     db = await Database.get_instance()
     result = await db.get_resources_collection().delete_one({"_id": ObjectId(resource_id)})
-    return result.deleted_count == 1
\ No newline at end of file
+    if result.deleted_count == 1:
+        await collection_versions.bump("resources")
+        category_cache.remove(resource_id)
+        if resource_index.ready:
+            resource_index.remove(resource_id)
+    return result.deleted_count == 1
+
+# Bulk import
+
+IMPORT_BATCH_SIZE = 1000
+
+class ImportRowResult(BaseModel):
+    row: int
+    status: str  # "created", "updated", "duplicate", "invalid", "failed"
+    id: Optional[str] = None
+    errors: Optional[List[str]] = None
+
+class ImportReport(BaseModel):
+    created: int = 0
+    updated: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    rows: List[ImportRowResult] = []
+
+async def import_resources(rows: Union[Iterable[Tuple[int, dict]], AsyncIterator[Tuple[int, dict]]]) -> ImportReport:
+    """Validate and upsert ``(row_number, data)`` pairs keyed on normalized URL.
+
+    Rows are validated as they are read and written in unordered
+    ``bulk_write`` batches, so memory is bounded by the batch size rather
+    than the size of the import. Rows repeating a URL seen earlier in the
+    same import are reported as duplicates and skipped.
+    """
+    db = await Database.get_instance()
+    collection = db.get_resources_collection()
+    report = ImportReport()
+    seen_urls = {}
+    batch: List[Tuple[ImportRowResult, UpdateOne]] = []
+
+    async def flush():
+        if not batch:
+            return
+        await _write_import_batch(collection, batch)
+        batch.clear()
+
+    async for row_number, data in _aiter(rows):
+        result = ImportRowResult(row=row_number, status="created")
+        report.rows.append(result)
+        try:
+            resource = ResourceCreate(**data)
+        except ValidationError as e:
+            result.status = "invalid"
+            result.errors = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            continue
+        except TypeError:
+            result.status = "invalid"
+            result.errors = ["Row must be an object"]
+            continue
+
+        resource_data = resource.model_dump()
+        resource_data["updated_at"] = datetime.utcnow()
+        resource_data.update(resource_derived_fields(resource_data))
+        url_key = resource_data["url_key"]
+        if url_key in seen_urls:
+            result.status = "duplicate"
+            result.errors = [f"Same URL as row {seen_urls[url_key]}"]
+            continue
+        seen_urls[url_key] = row_number
+
+        batch.append((result, UpdateOne(
+            {"url_key": url_key},
+            {"$set": resource_data, "$setOnInsert": {"created_at": resource_data["updated_at"]}},
+            upsert=True
+        )))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+    await flush()
+
+    totals = Counter(result.status for result in report.rows)
+    report.created = totals["created"]
+    report.updated = totals["updated"]
+    report.duplicates = totals["duplicate"]
+    report.invalid = totals["invalid"]
+    report.failed = totals["failed"]
+
+    if report.created or report.updated:
+        await collection_versions.bump("resources")
+        category_cache.invalidate()
+        if resource_index.ready:
+            await reconcile_resource_index()
+    return report
+
+async def _write_import_batch(collection, batch):
+    """Run one bulk upsert and record the per-row outcome"""
+    upserted = {}
+    errors = {}
+    try:
+        outcome = await collection.bulk_write([op for _, op in batch], ordered=False)
+        upserted = outcome.upserted_ids
+    except BulkWriteError as e:
+        upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+        errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+
+    for position, (result, _) in enumerate(batch):
+        if position in errors:
+            result.status = "failed"
+            result.errors = [errors[position].get("errmsg", "Write failed")]
+        elif position in upserted:
+            result.id = str(upserted[position])
+        else:
+            result.status = "updated"
+
+async def _aiter(rows):
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+# In-memory search index maintenance
+
+def _index_resource(resource: dict):
+    if resource_index.ready:
+        resource_index.upsert({k: v for k, v in resource.items() if k not in RESOURCE_PROJECTION})
+
+async def load_resource_index():
+    """Load every resource into the in-memory search index"""
+    db = await Database.get_instance()
+    resources = await db.get_resources_collection().find({}, RESOURCE_PROJECTION).to_list(None)
+    resource_index.replace_all(resources)
+    logger.info(f"✅ Resource search index loaded with {len(resource_index)} resources")
+
+async def reconcile_resource_index():
+    """Bring the index in line with Mongo, refetching only changed resources.
+
+    Catches writes made by other workers or directly in the database.
+    """
+    collection = (await Database.get_instance()).get_resources_collection()
+    as_of = datetime.utcnow()
+    stamps = {}
+    async for resource in collection.find({}, {"updated_at": 1}):
+        stamps[str(resource["_id"])] = resource.get("updated_at")
+
+    changed, removed = resource_index.stale_ids(stamps, as_of)
+    for resource_id in removed:
+        resource_index.remove(resource_id)
+    if changed:
+        query = {"_id": {"$in": [ObjectId(resource_id) for resource_id in changed]}}
+        async for resource in collection.find(query, RESOURCE_PROJECTION):
+            resource_index.upsert(resource)
+    if changed or removed:
+        logger.info(f"🔁 Resource index reconciled: {len(changed)} refreshed, {len(removed)} removed")
+
+async def run_resource_index_reconciler(interval: int = RESOURCE_INDEX_RECONCILE_SECONDS):
+    """Background task that periodically reconciles the resource index"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_resource_index()
+        except Exception as e:
+            logger.error(f"Resource index reconciliation failed: {e}")
+
+_reconcile_tasks = set()
+
+async def _catch_up_resource_index():
+    # Searches go to Mongo meanwhile, so nothing stale is served under the new version's ETag
+    resource_index.ready = False
+    try:
+        await reconcile_resource_index()
+    except Exception as e:
+        logger.error(f"Resource index catch-up failed: {e}")
+    finally:
+        resource_index.ready = True
+
+def _on_remote_resource_change():
+    """Another worker wrote resources; bring the in-process views up to its version"""
+    category_cache.invalidate()
+    if resource_index.ready:
+        task = asyncio.get_running_loop().create_task(_catch_up_resource_index())
+        _reconcile_tasks.add(task)
+        task.add_done_callback(_reconcile_tasks.discard)
+
+collection_versions.add_listener("resources", _on_remote_resource_change)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 # Define the model for creating and updating therapists
 class TherapistModel(BaseModel):
@@ -17,6 +17,9 @@ class TherapistModel(BaseModel):
     social_links: Optional[dict]  
     years_of_experience: Optional[int]  
     availability: Optional[str]  
+    # Explicit coordinates; when omitted the location is geocoded
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 # Define the model for updating therapist details (with optional fields)
 class UpdateTherapistModel(BaseModel):
@@ -34,6 +37,8 @@ class UpdateTherapistModel(BaseModel):
     social_links: Optional[dict]  
     years_of_experience: Optional[int]  
     availability: Optional[str]  
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 # Define the model for therapist response (including id)
 class TherapistOutModel(BaseModel):
@@ -52,7 +57,29 @@ class TherapistOutModel(BaseModel):
     social_links: Optional[dict]  
     years_of_experience: Optional[int] 
     availability: Optional[str]  
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     class Config:
         orm_mode = True  
 
+
+# Define the model for a page of therapist search results
+class TherapistSearchResponse(BaseModel):
+    therapists: List[TherapistOutModel]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+
+
+# Define the model for a therapist returned by a "near me" search
+class TherapistNearbyModel(TherapistOutModel):
+    distance_km: float
+
+
+# Define the model for "near me" search results, nearest first
+class TherapistNearbyResponse(BaseModel):
+    latitude: float
+    longitude: float
+    radius_km: float
+    therapists: List[TherapistNearbyModel]
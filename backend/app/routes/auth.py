@@ -1,40 +1,33 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, EmailStr, validator
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-import os
+from pymongo.errors import DuplicateKeyError
 import logging
 from typing import Optional
 
 from app.database import Database
+from app.crud.user_crud import principal_cache
+from app.utils.security import password_hasher, HasherOverloaded
+from app.utils.jwt_handler import create_access_token, decode_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.crud.refresh_token_crud import (
+    issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_family, token_family,
+    RefreshTokenInvalid
+)
 from app.models.user_models import UserCreate, UserLogin 
 
 # Set up logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Auth config
-SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+def hashing_overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts right now, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 async def get_users_collection():
     db = await Database.get_instance()
@@ -44,24 +37,30 @@ async def get_user_by_email(email: str):
     users_col = await get_users_collection()  
     return await users_col.find_one({"email": email})
 
+async def load_principal(email: str):
+    """User document for an authenticated request, without the password hash"""
+    users_col = await get_users_collection()
+    return await users_col.find_one({"email": email}, {"password": 0})
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if not email:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    email: Optional[str] = payload.get("sub") if payload else None
+    if not email:
         raise credentials_exception
 
-    user = await get_user_by_email(email)
+    user = await principal_cache.get_or_load(email, lambda: load_principal(email))
     if not user:
         raise credentials_exception
-    return user
+    # Callers get their own copy of the shared cached document
+    return dict(user)
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -69,19 +68,16 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 async def register(user: UserCreate):
     users_col = await get_users_collection()
 
-    if await users_col.find_one({"email": user.email}):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-
     if user.password != user.confirm_password:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Passwords do not match"
         )
 
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherOverloaded:
+        raise hashing_overloaded()
 
     new_user = {
         "name": user.name,
@@ -100,6 +96,14 @@ async def register(user: UserCreate):
                 detail="Failed to create user"
             )
         return {"message": "User registered successfully"}
+    except DuplicateKeyError:
+        # Enforced by the unique email index rather than a racy pre-check
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         raise HTTPException(
@@ -110,11 +114,22 @@ async def register(user: UserCreate):
 @router.post("/login")
 async def login(user: UserLogin):
     db_user = await get_user_by_email(user.email)
-    if not db_user or not verify_password(user.password, db_user["password"]):
+    try:
+        valid, new_hash = (
+            await password_hasher.verify_and_update(user.password, db_user["password"])
+            if db_user else (False, None)
+        )
+    except HasherOverloaded:
+        raise hashing_overloaded()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    if new_hash:
+        # The configured bcrypt cost changed since this hash was made
+        users_col = await get_users_collection()
+        await users_col.update_one({"_id": db_user["_id"]}, {"$set": {"password": new_hash}})
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -124,10 +139,50 @@ async def login(user: UserLogin):
 
     return {
         "access_token": access_token,
+        "refresh_token": await issue_refresh_token(db_user),
         "token_type": "bearer",
         "user": {
             "email": db_user["email"],
             "name": db_user["name"],
             "role": db_user["role"]
         }
-    }
\ No newline at end of file
+    }
+
+@router.post("/refresh")
+async def refresh(request: RefreshRequest):
+    """Trade a refresh token for a new access token and a new refresh token.
+
+    No password check happens here, so clients should refresh rather than
+    log in again when their access token expires. The account must still
+    exist and be active; otherwise the session is revoked.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token"
+    )
+    try:
+        session, refresh_token = await rotate_refresh_token(request.refresh_token)
+    except RefreshTokenInvalid:
+        raise invalid
+
+    email = session["email"]
+    user = await principal_cache.get_or_load(email, lambda: load_principal(email))
+    if not user or user.get("status", "Active") != "Active":
+        await revoke_family(token_family(refresh_token))
+        raise invalid
+
+    access_token = create_access_token(
+        data={"sub": session["email"]},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/logout")
+async def logout(request: RefreshRequest):
+    """Revoke the session the refresh token belongs to"""
+    await revoke_refresh_token(request.refresh_token)
+    return {"message": "Logged out"}
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+from app.database import Database
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.streaming import (
+    iter_ndjson, iter_csv, gzip_stream,
+    NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE, GZIP_MEDIA_TYPE
+)
+from .auth import get_current_user
+from .mood_tracking import mood_owner_id
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["Export"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Documents fetched per round trip; large enough to amortise latency while
+# keeping the per-request working set small and constant
+EXPORT_BATCH_SIZE = 1000
+
+# Columns written for each exported mood entry
+MOOD_EXPORT_COLUMNS = ("id", "timestamp", "value", "notes", "cursor")
+
+def export_row(document: dict) -> dict:
+    """Shape a stored document for export, attaching its resume cursor"""
+    document.pop("user_id", None)
+    document["cursor"] = encode_cursor(document.get("timestamp"), document["_id"])
+    document["id"] = str(document.pop("_id"))
+    return document
+
+@router.get("/mood")
+async def export_mood_entries(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(True, description="Gzip the stream on the fly"),
+    cursor: Optional[str] = Query(None, description="Resume after the row carrying this cursor"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream all of the current user's mood entries.
+
+    Rows are read oldest first in ``(timestamp, _id)`` order straight from
+    the Motor cursor and written out as they arrive, so memory use does not
+    grow with history size. Every row carries a ``cursor`` value; pass the
+    last one received to resume an interrupted export.
+    """
+    query = {"user_id": mood_owner_id(current_user)}
+    if cursor:
+        try:
+            last_timestamp, last_id = decode_cursor(cursor, 2)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query.update(keyset_filter("timestamp", last_timestamp, last_id, descending=False))
+
+    db = await Database.get_instance()
+    documents = (
+        db.get_mood_collection()
+        .find(query)
+        .sort([("timestamp", 1), ("_id", 1)])
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+    if format == "csv":
+        body = iter_csv(documents, MOOD_EXPORT_COLUMNS, export_row)
+        media_type = CSV_MEDIA_TYPE
+    else:
+        body = iter_ndjson(documents, export_row)
+        media_type = NDJSON_MEDIA_TYPE
+
+    filename = f"mood-export-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    if compress:
+        body = gzip_stream(body)
+        media_type = GZIP_MEDIA_TYPE
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
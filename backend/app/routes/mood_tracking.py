@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from ..database import Database, get_db
+from ..utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from ..utils.streaming import iter_json_list, iter_ndjson, NDJSON_MEDIA_TYPE
 from .auth import get_current_user
 
 router = APIRouter(
@@ -18,6 +22,12 @@ class MoodEntry(BaseModel):
     notes: Optional[str] = None
     timestamp: Optional[datetime] = None
 
+class MoodEntryOut(BaseModel):
+    id: str
+    value: Optional[int] = None
+    notes: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
 class MoodStats(BaseModel):
     average: float
     highest: int
@@ -29,10 +39,59 @@ class MoodChartData(BaseModel):
     labels: List[str]
     values: List[int]
 
+MAX_BATCH_SIZE = 500
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+ENTRY_FIELDS = ("value", "notes", "timestamp")
+STREAM_BATCH_SIZE = 500
+
+class MoodBatchEntry(MoodEntry):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+
+class MoodBatchRequest(BaseModel):
+    entries: List[MoodBatchEntry] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class MoodBatchItemResult(BaseModel):
+    index: int
+    idempotency_key: str
+    status: str  # "created", "duplicate", "invalid", "failed"
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class MoodBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[MoodBatchItemResult]
+
 # Helper functions
 async def get_mood_collection():
     db = await Database.get_instance()
-    return db.get_collection("mood_entries")
+    return db.get_mood_collection()
+
+def mood_owner_id(current_user: dict) -> str:
+    """Stable key for a user's mood entries (the user document id)"""
+    return str(current_user["_id"])
+
+def parse_entry_fields(fields: Optional[str]) -> dict:
+    """Build a projection from a comma-separated field list.
+
+    ``timestamp`` and ``_id`` are always kept since they form the cursor.
+    """
+    requested = ENTRY_FIELDS if not fields else [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in ENTRY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    projection = {f: 1 for f in requested}
+    projection["timestamp"] = 1
+    return projection
+
+def mood_entry_out(entry: dict) -> dict:
+    entry["id"] = str(entry.pop("_id"))
+    return entry
 
 async def validate_mood_value(value: int):
     if value < 1 or value > 5:
@@ -52,7 +111,7 @@ async def log_mood(
     
     mood_collection = await get_mood_collection()
     entry_data = {
-        "user_id": user_id,
+        "user_id": mood_owner_id(user_id),
         "value": entry.value,
         "notes": entry.notes,
         "timestamp": entry.timestamp or datetime.utcnow()
@@ -67,21 +126,141 @@ async def log_mood(
             detail="Failed to log mood entry"
         )
 
-@router.get("/entries", response_model=List[MoodEntry])
+@router.post("/log/batch", response_model=MoodBatchResponse)
+async def log_mood_batch(
+    batch: MoodBatchRequest,
+    user_id: str = Depends(get_current_user)
+):
+    """Log a backlog of mood entries in one request (offline client sync).
+
+    Entries are validated in a single pass and written with one unordered
+    ``insert_many``. The unique ``(user_id, idempotency_key)`` index turns
+    retried entries into per-item ``duplicate`` results instead of copies.
+    """
+    owner_id = mood_owner_id(user_id)
+    now = datetime.utcnow()
+    results: List[MoodBatchItemResult] = []
+    documents = []
+    seen_keys = set()
+
+    for index, entry in enumerate(batch.entries):
+        result = MoodBatchItemResult(
+            index=index,
+            idempotency_key=entry.idempotency_key,
+            status="created"
+        )
+        results.append(result)
+        if entry.value < 1 or entry.value > 5:
+            result.status = "invalid"
+            result.detail = "Mood value must be between 1 and 5"
+            continue
+        if entry.idempotency_key in seen_keys:
+            result.status = "duplicate"
+            result.detail = "Idempotency key repeated within batch"
+            continue
+        seen_keys.add(entry.idempotency_key)
+        documents.append((result, {
+            "user_id": owner_id,
+            "value": entry.value,
+            "notes": entry.notes,
+            "timestamp": entry.timestamp or now,
+            "idempotency_key": entry.idempotency_key
+        }))
+
+    if documents:
+        mood_collection = await get_mood_collection()
+        write_errors = {}
+        try:
+            # insert_many assigns _id to each document before sending
+            await mood_collection.insert_many(
+                [doc for _, doc in documents], ordered=False
+            )
+        except BulkWriteError as e:
+            write_errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to log mood entries"
+            )
+
+        for position, (result, doc) in enumerate(documents):
+            error = write_errors.get(position)
+            if error is None:
+                result.id = str(doc["_id"])
+            elif error.get("code") == 11000:
+                result.status = "duplicate"
+                result.detail = "Entry already logged"
+            else:
+                result.status = "failed"
+                result.detail = error.get("errmsg", "Write failed")
+
+    return MoodBatchResponse(
+        created=sum(1 for r in results if r.status == "created"),
+        duplicates=sum(1 for r in results if r.status == "duplicate"),
+        rejected=sum(1 for r in results if r.status in ("invalid", "failed")),
+        results=results
+    )
+
+@router.get(
+    "/entries",
+    response_model=List[MoodEntryOut],
+    response_model_exclude_unset=True
+)
 async def get_mood_entries(
+    response: Response,
     days: Optional[int] = 7,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit both limit and cursor for all entries"),
+    cursor: Optional[str] = Query(None, description="Opaque token from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of value,notes,timestamp"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     user_id: str = Depends(get_current_user),
     db=Depends(get_db)
 ):
+    """List mood entries newest first, one keyset page at a time.
+
+    Pages follow ``(timestamp, _id)`` descending on the
+    ``(user_id, timestamp, _id)`` index; the next page token is returned in
+    the ``X-Next-Cursor`` header. Without ``limit`` or ``cursor`` every
+    entry in the window is streamed as one JSON array, read in batches so
+    memory stays flat however long the history. ``format=ndjson`` streams
+    every remaining entry in the window instead of a single page.
+    """
     mood_collection = await get_mood_collection()
     cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
-    entries = await mood_collection.find({
-        "user_id": user_id,
+    projection = parse_entry_fields(fields)
+
+    query = {
+        "user_id": mood_owner_id(user_id),
         "timestamp": {"$gte": cutoff_date}
-    }).sort("timestamp", -1).to_list(None)
-    
-    return entries
+    }
+    if cursor:
+        try:
+            last_timestamp, last_id = decode_cursor(cursor, 2)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query["$and"] = [keyset_filter("timestamp", last_timestamp, last_id)]
+
+    find = mood_collection.find(query, projection).sort([("timestamp", -1), ("_id", -1)])
+
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(find.batch_size(STREAM_BATCH_SIZE), mood_entry_out),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+
+    if limit is None and cursor is None:
+        return StreamingResponse(
+            iter_json_list(find.batch_size(STREAM_BATCH_SIZE), mood_entry_out),
+            media_type="application/json"
+        )
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    entries = await find.limit(limit).to_list(limit)
+    if len(entries) == limit:
+        last = entries[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["timestamp"], last["_id"])
+
+    return [mood_entry_out(entry) for entry in entries]
 
 @router.get("/stats", response_model=MoodStats)
 async def get_mood_stats(
@@ -94,7 +273,7 @@ async def get_mood_stats(
     
     pipeline = [
         {"$match": {
-            "user_id": user_id,
+            "user_id": mood_owner_id(user_id),
             "timestamp": {"$gte": cutoff_date}
         }},
         {"$group": {
@@ -124,7 +303,7 @@ async def get_mood_stats(
     if stats["count"] > 7:
         first_week = await mood_collection.aggregate([
             {"$match": {
-                "user_id": user_id,
+                "user_id": mood_owner_id(user_id),
                 "timestamp": {"$gte": cutoff_date, "$lt": cutoff_date + timedelta(days=3)}
             }},
             {"$group": {"_id": None, "avg": {"$avg": "$value"}}}
@@ -132,7 +311,7 @@ async def get_mood_stats(
         
         last_week = await mood_collection.aggregate([
             {"$match": {
-                "user_id": user_id,
+                "user_id": mood_owner_id(user_id),
                 "timestamp": {"$gte": cutoff_date + timedelta(days=4)}
             }},
             {"$group": {"_id": None, "avg": {"$avg": "$value"}}}
@@ -164,7 +343,7 @@ async def get_mood_chart_data(
     # Group by day
     pipeline = [
         {"$match": {
-            "user_id": user_id,
+            "user_id": mood_owner_id(user_id),
             "timestamp": {"$gte": cutoff_date}
         }},
         {"$group": {
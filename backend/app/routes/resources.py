@@ -1,15 +1,24 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from typing import Optional, List
+from pymongo.errors import DuplicateKeyError
+import csv
+import io
 from app.models.resource import (
     Resource,
     ResourceCreate,
+    ImportReport,
+    import_resources,
     create_resource,
     get_resources,
     get_resource,
     update_resource,
     delete_resource,
-    get_resource_categories
+    refresh_category_cache
 )
+from app.database import collection_versions
+from app.utils.http_cache import conditional_response, version_etag
+from app.utils.json_response import raw_json
+from app.utils.streaming import iter_json_array, spool_body
 from .auth import get_current_user
 
 router = APIRouter(
@@ -28,27 +37,84 @@ async def create_new_resource(
         if created_resource:
             return created_resource
         raise HTTPException(status_code=400, detail="Resource creation failed")
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A resource with this URL already exists")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/import", response_model=ImportReport)
+async def bulk_import_resources(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Import many resources at once, de-duplicated on normalized URL.
+
+    Accepts a JSON array body, a ``text/csv`` body, or a multipart upload
+    with a ``file`` field holding either format. Existing resources with
+    the same URL are updated in place. Returns a per-row report.
+
+    Bodies are read in chunks into a spooled file and parsed a row at a
+    time, so a large import never sits in memory whole. A parse error
+    late in the input comes after earlier batches were written; imports
+    upsert on URL, so fixing the input and retrying is safe.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or not hasattr(upload, "file"):
+                raise HTTPException(status_code=400, detail="Missing 'file' upload")
+            is_json = upload.filename.lower().endswith(".json") or "json" in (upload.content_type or "")
+            source = upload.file
+        else:
+            is_json = not content_type.startswith("text/csv")
+            source = await spool_body(request.stream())
+
+        with io.TextIOWrapper(source, encoding="utf-8-sig") as text:
+            if is_json:
+                rows = enumerate(iter_json_array(text), start=1)
+            else:
+                rows = enumerate(csv.DictReader(text), start=1)
+            return await import_resources(rows)
+    except HTTPException:
+        raise
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse import: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[Resource])
 async def read_resources(
+    request: Request,
+    response: Response,
     search: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    fuzzy: bool = Query(False, description="Match word prefixes to tolerate typos")
 ):
+    unchanged = conditional_response(request, response, version_etag("resources", collection_versions.get("resources")))
+    if unchanged:
+        return unchanged
     try:
-        return await get_resources(search, category, limit, skip)
+        # Rows come straight from the database, so response-model validation is skipped
+        return raw_json(await get_resources(search, category, limit, skip, fuzzy), response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/categories")
-async def read_resource_categories():
+async def read_resource_categories(request: Request, response: Response):
+    unchanged = conditional_response(request, response, version_etag("categories", collection_versions.get("resources")))
+    if unchanged:
+        return unchanged
     try:
-        return {"categories": await get_resource_categories()}
+        cache = await refresh_category_cache()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"categories": cache.categories(), "counts": cache.counts()}
 
 @router.get("/{resource_id}", response_model=Resource)
 async def read_resource(resource_id: str):
@@ -63,7 +129,10 @@ async def update_existing_resource(
     resource: ResourceCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    updated_resource = await update_resource(resource_id, resource)
+    try:
+        updated_resource = await update_resource(resource_id, resource)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A resource with this URL already exists")
     if updated_resource:
         return updated_resource
     raise HTTPException(status_code=404, detail="Resource not found")
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.models.therapist_model import TherapistModel, UpdateTherapistModel, TherapistOutModel
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+from app.models.therapist_model import (
+    TherapistModel, UpdateTherapistModel, TherapistOutModel, TherapistSearchResponse,
+    TherapistNearbyResponse
+)
 from app.crud.therapist_crud import (
-    add_therapist, list_therapists, update_therapist, delete_therapist, get_therapist_by_id
+    add_therapist, list_therapists, update_therapist, delete_therapist, get_therapist_by_id,
+    search_therapists, nearby_therapists
 )
+from app.utils.geocoder import geocode
+from app.utils.http_cache import conditional_response, version_etag
+from app.utils.json_response import raw_json
+from app.database import collection_versions
 from bson import ObjectId
 
 def is_valid_object_id(id: str) -> bool:
@@ -16,14 +24,63 @@ def is_valid_object_id(id: str) -> bool:
 
 router = APIRouter(prefix="/api/therapists", tags=["Therapists"])
 
+def therapists_etag() -> str:
+    return version_etag("therapists", collection_versions.get("therapists"))
+
 @router.get("/", response_model=List[TherapistOutModel])
-async def get_therapists():
-    return await list_therapists()
+async def get_therapists(request: Request, response: Response):
+    unchanged = conditional_response(request, response, therapists_etag())
+    if unchanged:
+        return unchanged
+    # therapist_helper already builds the TherapistOutModel shape
+    return raw_json(await list_therapists(), response)
+
+@router.get("/search", response_model=TherapistSearchResponse)
+async def search_therapist_directory(
+    location: Optional[str] = Query(None, description="City or ZIP code"),
+    specialty: Optional[List[str]] = Query(None),
+    language: Optional[List[str]] = Query(None),
+    insurance: Optional[List[str]] = Query(None),
+    telehealth: Optional[bool] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    facets: bool = Query(True, description="Include facet counts (first page only)")
+):
+    try:
+        return await search_therapists(
+            location, specialty, language, insurance, telehealth,
+            limit, cursor, with_facets=facets and not cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/nearby", response_model=TherapistNearbyResponse)
+async def find_nearby_therapists(
+    near: Optional[str] = Query(None, description="City or ZIP code"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=100),
+    specialty: Optional[List[str]] = Query(None)
+):
+    if lat is None or lng is None:
+        if not near:
+            raise HTTPException(status_code=400, detail="Provide lat and lng, or near")
+        coordinates = geocode(near)
+        if not coordinates:
+            raise HTTPException(status_code=404, detail=f"Unknown location: {near}")
+        lat, lng = coordinates
+
+    therapists = await nearby_therapists(lat, lng, radius_km, limit, specialty)
+    return {"latitude": lat, "longitude": lng, "radius_km": radius_km, "therapists": therapists}
 
 @router.get("/{id}", response_model=TherapistOutModel)
-async def get_therapist(id: str):
+async def get_therapist(id: str, request: Request, response: Response):
     if not is_valid_object_id(id):
         raise HTTPException(status_code=400, detail="Invalid therapist ID")
+    unchanged = conditional_response(request, response, therapists_etag())
+    if unchanged:
+        return unchanged
     
     therapist = await get_therapist_by_id(id)
     if not therapist:
@@ -6,6 +6,7 @@ from app.crud.user_crud import (
 )
 from bson import ObjectId
 from app.database import get_db
+from app.utils.json_response import raw_json
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
@@ -13,7 +14,7 @@ router = APIRouter(prefix="/api/users", tags=["Users"])
 @router.get("/", response_model=List[UserOutModel])
 async def get_users(db: AsyncIOMotorCollection = Depends(get_db)):
     try:
-        return await list_users()
+        return raw_json(await list_users())
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
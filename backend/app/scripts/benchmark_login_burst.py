@@ -0,0 +1,75 @@
+"""Measure event-loop lag while a burst of logins verifies passwords.
+
+A ticker coroutine sleeps in short steps and records how late it wakes
+up; that lateness is what every other request on the loop (chat, mood
+logging) would see. The burst is run twice: verifying inline, as the
+auth routes used to, and through the process-pool ``PasswordHasher``.
+No database is needed::
+
+    python -m app.scripts.benchmark_login_burst --logins 100 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # backend directory
+
+from app.utils.security import PasswordHasher, hash_password, verify_password
+
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - started - TICK_SECONDS)
+
+
+async def inline_login(password: str, hashed: str):
+    await asyncio.sleep(0)  # the request's other awaits (user lookup)
+    return verify_password(password, hashed)
+
+
+async def run_burst(name: str, logins: int, login):
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 4)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{name:<8} {logins} logins in {elapsed:6.2f}s | loop lag ms: "
+        f"median {statistics.median(lags_ms):7.2f}  p99 {p99:8.2f}  max {lags_ms[-1]:8.2f}  "
+        f"ticks {len(lags_ms)}"
+    )
+
+
+async def main(logins: int, rounds: int, workers: int):
+    password = "correct horse battery staple"
+    hashed = hash_password(password, rounds)
+    hasher = PasswordHasher(workers=workers, max_pending=logins, rounds=rounds)
+    try:
+        await hasher.verify(password, hashed)  # start the worker processes outside the timing
+        await run_burst("inline", logins, lambda: inline_login(password, hashed))
+        await run_burst("pool", logins, lambda: hasher.verify(password, hashed))
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.rounds, args.workers))
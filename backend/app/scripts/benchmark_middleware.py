@@ -0,0 +1,102 @@
+"""Measure requests/sec through the old and new middleware stacks.
+
+"old" is the previous stack: an ``@app.middleware("http")`` exception
+catcher, ``GZipMiddleware`` and CORS. "new" is the pure ASGI stack:
+``UnhandledErrorMiddleware``, ``CompressionMiddleware`` and CORS. Requests
+are driven straight through ASGI, so no server or database is needed::
+
+    python -m app.scripts.benchmark_middleware --requests 3000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # backend directory
+
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.errors import UnhandledErrorMiddleware
+from app.utils.json_response import FastJSONResponse
+
+RESOURCES = [{
+    "_id": f"65a0000000000000000{i:05d}",
+    "title": f"Coping with stress, part {i}",
+    "category": ("articles", "videos", "hotlines")[i % 3],
+    "url": f"https://example.org/resources/{i}",
+    "description": "Practical steps for managing everyday stress and anxiety.",
+} for i in range(300)]
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.post("/api/chat")
+    async def chat():
+        return {"message": "I'm here for you. Would you like to talk about it?", "status": "success"}
+
+    @app.get("/api/resources/")
+    async def resources(response: Response):
+        response.headers["ETag"] = '"resources-v1"'
+        return RESOURCES
+
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    if stack == "old":
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+        @app.middleware("http")
+        async def catch_unhandled_exceptions(request: Request, call_next):
+            try:
+                return await call_next(request)
+            except Exception:
+                return JSONResponse(status_code=500, content={"detail": "error"})
+    else:
+        app.add_middleware(CompressionMiddleware)
+        app.add_middleware(UnhandledErrorMiddleware)
+    return app
+
+
+async def drive(app, method: str, path: str, accept: bytes, count: int) -> float:
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "path": path, "raw_path": path.encode(),
+        "root_path": "", "scheme": "http", "query_string": b"", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(b"host", b"bench"), (b"accept-encoding", accept), (b"origin", b"http://localhost")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(count, 100)):  # warm up
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return count / (time.perf_counter() - started)
+
+
+async def main(count: int):
+    apps = {"old": build_app("old"), "new": build_app("new")}
+    cases = [
+        ("small chat reply", "POST", "/api/chat", b"gzip, deflate, br, zstd"),
+        ("resource list, gzip", "GET", "/api/resources/", b"gzip"),
+        ("resource list, negotiated", "GET", "/api/resources/", b"gzip, deflate, br, zstd"),
+    ]
+    for name, method, path, accept in cases:
+        rates = {stack: await drive(app, method, path, accept, count) for stack, app in apps.items()}
+        print(f"{name:<27} old {rates['old']:8.0f} req/s | new {rates['new']:8.0f} req/s"
+              f" | x{rates['new'] / rates['old']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
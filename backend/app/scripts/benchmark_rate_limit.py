@@ -0,0 +1,79 @@
+"""Measure the per-request overhead of the rate-limit middleware.
+
+Drives a trivial ASGI app directly (no sockets) with and without
+``RateLimitMiddleware`` in front of it, for a limited route and an
+unlisted one. Pass ``--mongo`` to time the shared Mongo backend against
+``MONGO_URI`` (a local mongod is enough)::
+
+    python -m app.scripts.benchmark_rate_limit --requests 100000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # backend directory
+
+from app.middleware.rate_limit import (
+    InMemoryBucketStore, MongoBucketStore, RateLimitMiddleware, RateLimitRule
+)
+
+# Large enough that no request is rejected, so only the bookkeeping is timed
+RULES = (RateLimitRule("chat", "POST", ("/api/chat",), capacity=10**9, period=1),)
+
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(target, path: str, requests: int, clients: int) -> float:
+    scopes = [
+        {"type": "http", "method": "POST", "path": path, "headers": [], "client": (f"10.0.{i // 256}.{i % 256}", 1)}
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for i in range(requests):
+        await target(scopes[i % clients], receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests: int, clients: int, mongo: bool):
+    baseline = await drive(app, "/api/chat", requests, clients)
+    print(f"{'no middleware':<28} {baseline:7.2f} µs/request")
+    limited = RateLimitMiddleware(app, RULES, store=InMemoryBucketStore())
+    for name, path in (("memory, limited route", "/api/chat"), ("memory, unlisted route", "/api/resources")):
+        cost = await drive(limited, path, requests, clients)
+        print(f"{name:<28} {cost:7.2f} µs/request  (+{cost - baseline:.2f})")
+
+    if mongo:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from app.database import MONGO_URI
+        collection = AsyncIOMotorClient(MONGO_URI)["rate_limit_benchmark"]["rate_limits"]
+
+        async def get_collection():
+            return collection
+
+        shared = RateLimitMiddleware(app, RULES, store=MongoBucketStore(get_collection))
+        count = min(requests, 5000)
+        cost = await drive(shared, "/api/chat", count, clients)
+        print(f"{'mongo, limited route':<28} {cost:7.2f} µs/request  (+{cost - baseline:.2f})")
+        await collection.database.client.drop_database("rate_limit_benchmark")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--mongo", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.clients, args.mongo))
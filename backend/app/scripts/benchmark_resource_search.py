@@ -0,0 +1,130 @@
+"""Compare the legacy regex resource search with the text-index search.
+
+Seeds a throwaway database with synthetic resources and times both query
+shapes against it. Needs a reachable MongoDB (``MONGO_URI``)::
+
+    python -m app.scripts.benchmark_resource_search --count 100000
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # backend directory
+
+from app.utils.text_search import (
+    build_search_ngrams, build_text_search, RESOURCE_TEXT_INDEX_NAME, RESOURCE_TEXT_WEIGHTS
+)
+
+VOCABULARY = (
+    "anxiety depression stress sleep trauma grief mindfulness therapy coping panic "
+    "breathing meditation support recovery resilience burnout loneliness relationships "
+    "self-care journaling exercise nutrition workbook guide podcast video article "
+    "teen adult veteran parent student workplace crisis hotline community"
+).split()
+CATEGORIES = ["articles", "videos", "podcasts", "books", "apps", "hotlines"]
+QUERIES = ["anxiety", "sleep guide", "panic breathing", "mindful", "veteran crisis", "journaling"]
+
+
+def seed(collection, count: int, batch_size: int = 5000):
+    rng = random.Random(42)
+    batch = []
+    for i in range(count):
+        title = " ".join(rng.choices(VOCABULARY, k=4)).title()
+        description = " ".join(rng.choices(VOCABULARY, k=25))
+        batch.append({
+            "title": title,
+            "type": "article",
+            "category": rng.choice(CATEGORIES),
+            "source": "benchmark",
+            "url": f"https://example.org/resource/{i}",
+            "description": description,
+            "search_ngrams": build_search_ngrams([title]),
+            "created_at": datetime.utcnow(),
+        })
+        if len(batch) == batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    collection.create_index(
+        [(field, "text") for field in RESOURCE_TEXT_WEIGHTS],
+        name=RESOURCE_TEXT_INDEX_NAME,
+        weights=RESOURCE_TEXT_WEIGHTS,
+    )
+    collection.create_index("category")
+    collection.create_index("created_at")
+
+
+def regex_search(collection, search: str, category: str, limit: int):
+    pattern = re.escape(search)
+    query = {"$or": [
+        {"title": {"$regex": pattern, "$options": "i"}},
+        {"description": {"$regex": pattern, "$options": "i"}},
+    ]}
+    if category:
+        query["category"] = category
+    return list(collection.find(query).sort("created_at", -1).limit(limit))
+
+
+def text_search(collection, search: str, category: str, limit: int, fuzzy: bool = False):
+    query = {"$text": {"$search": build_text_search(search, fuzzy)}}
+    if category:
+        query["category"] = category
+    projection = {"search_ngrams": 0, "score": {"$meta": "textScore"}}
+    sort = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+    return list(collection.find(query, projection).sort(sort).limit(limit))
+
+
+def time_queries(fn, collection, rounds: int, **kwargs):
+    timings = []
+    for _ in range(rounds):
+        for search in QUERIES:
+            start = time.perf_counter()
+            fn(collection, search, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database")
+    args = parser.parse_args()
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    db_name = "resource_search_benchmark"
+    client.drop_database(db_name)
+    collection = client[db_name]["resources"]
+
+    print(f"Seeding {args.count} resources...")
+    seed(collection, args.count)
+
+    cases = [
+        ("regex", regex_search, {"category": None}),
+        ("regex + category", regex_search, {"category": "articles"}),
+        ("$text", text_search, {"category": None}),
+        ("$text + category", text_search, {"category": "articles"}),
+        ("$text fuzzy", text_search, {"category": None, "fuzzy": True}),
+    ]
+    print(f"{'query':<20}{'mean ms':>10}{'p95 ms':>10}")
+    for label, fn, kwargs in cases:
+        mean, p95 = time_queries(fn, collection, args.rounds, limit=args.limit, **kwargs)
+        print(f"{label:<20}{mean:>10.2f}{p95:>10.2f}")
+
+    if not args.keep:
+        client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
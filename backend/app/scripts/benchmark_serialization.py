@@ -0,0 +1,75 @@
+"""Microbenchmark list-endpoint serialization per 1000 resources.
+
+"before" repeats the old path: a ``Resource`` model per row, FastAPI's
+response-model validation and serialization, then ``JSONResponse``.
+"after" is the current path: ``resource_row`` dicts rendered straight by
+``FastJSONResponse``. No database is needed::
+
+    python -m app.scripts.benchmark_serialization --rows 1000 --rounds 50
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent.parent))  # backend directory
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.models.resource import Resource, resource_row
+from app.utils.json_response import FastJSONResponse, orjson
+
+
+def make_documents(count: int) -> list:
+    started = datetime(2024, 1, 1)
+    return [{
+        "_id": ObjectId(),
+        "title": f"Coping with stress, part {i}",
+        "type": "article",
+        "category": ("articles", "videos", "hotlines")[i % 3],
+        "source": "National Institute of Mental Health",
+        "url": f"https://example.org/resources/{i}",
+        "description": "Practical steps for managing everyday stress and anxiety. " * 3,
+        "created_at": started + timedelta(minutes=i),
+        "updated_at": started + timedelta(minutes=i, seconds=30),
+    } for i in range(count)]
+
+
+def before(documents: list, adapter: TypeAdapter) -> bytes:
+    models = [Resource(**document) for document in documents]
+    value = adapter.validate_python(models, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode="json", by_alias=True)).body
+
+
+def after(documents: list, adapter: TypeAdapter) -> bytes:
+    return FastJSONResponse([resource_row(document) for document in documents]).body
+
+
+def run(name: str, serialize, documents: list, rounds: int):
+    adapter = TypeAdapter(List[Resource])
+    serialize(documents, adapter)  # warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        body = serialize(documents, adapter)
+    elapsed = time.perf_counter() - started
+    per_thousand = elapsed / rounds / len(documents) * 1000
+    print(f"{name:<7} {len(body):>8} bytes | {per_thousand * 1e3:8.3f} ms per 1000 rows")
+
+
+def main(rows: int, rounds: int):
+    documents = make_documents(rows)
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    run("before", before, documents, rounds)
+    run("after", after, documents, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rows, args.rounds)
@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class CategoryCache:
+    """Resource categories and per-category counts kept in process.
+
+    The cache remembers each resource's category so that writes can move
+    counts incrementally, and it is fully reloaded once ``ttl`` seconds have
+    passed (or when invalidated) to pick up writes made elsewhere.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._category_by_id: Dict[str, str] = {}
+        self._counts: Counter = Counter()
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def replace_all(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Reload from ``(resource_id, category)`` pairs"""
+        self._category_by_id = {resource_id: category for resource_id, category in pairs}
+        self._counts = Counter(self._category_by_id.values())
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, resource_id: str, category: str) -> None:
+        """Record a created resource, or one whose category may have changed"""
+        if not self.loaded:
+            return
+        previous = self._category_by_id.get(resource_id)
+        if previous == category:
+            return
+        if previous is not None:
+            self._decrement(previous)
+        self._category_by_id[resource_id] = category
+        self._counts[category] += 1
+
+    def remove(self, resource_id: str) -> None:
+        if not self.loaded:
+            return
+        previous = self._category_by_id.pop(resource_id, None)
+        if previous is not None:
+            self._decrement(previous)
+
+    def invalidate(self) -> None:
+        """Force a reload on the next read"""
+        self._loaded_at = None
+
+    def _decrement(self, category: str) -> None:
+        self._counts[category] -= 1
+        if self._counts[category] <= 0:
+            del self._counts[category]
+
+    def categories(self) -> List[str]:
+        """Category names (plus the ``all`` pseudo-category), sorted"""
+        return sorted(["all", *self._counts])
+
+    def counts(self) -> Dict[str, int]:
+        return dict(sorted(self._counts.items()))
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionVersions:
+    """Per-collection change counters shared between workers through Mongo.
+
+    CRUD functions ``bump`` a collection after every write, which is
+    reflected locally straight away; other workers learn about it when
+    they next ``load`` (run periodically by ``run_refresher``). Readers
+    call ``get``, which never touches the database, so a counter can
+    back an ETag that is checked before doing any query.
+    """
+
+    def __init__(self, get_collection: Callable[[], Awaitable]):
+        self._get_collection = get_collection
+        self._versions: Dict[str, int] = {}
+        self._listeners: Dict[str, List[Callable[[], None]]] = {}
+        self.loaded = False
+
+    def get(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def add_listener(self, name: str, listener: Callable[[], None]):
+        """Call ``listener()`` whenever another worker's write to ``name`` is observed"""
+        self._listeners.setdefault(name, []).append(listener)
+
+    async def bump(self, name: str) -> int:
+        collection = await self._get_collection()
+        counter = await collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # Skipping a number means another worker wrote in between
+        self._observe(name, counter["version"], remote=counter["version"] > self.get(name) + 1)
+        return counter["version"]
+
+    async def load(self):
+        collection = await self._get_collection()
+        async for counter in collection.find({}):
+            self._observe(counter["_id"], counter["version"], remote=self.loaded)
+        self.loaded = True
+
+    def _observe(self, name: str, version: int, remote: bool):
+        if version <= self._versions.get(name, 0):
+            return
+        self._versions[name] = version
+        if not remote:
+            return
+        for listener in self._listeners.get(name, []):
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Version listener for {name} failed: {e}")
+
+    async def run_refresher(self, interval: float):
+        """Background task that picks up other workers' bumps"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Collection version refresh failed: {e}")
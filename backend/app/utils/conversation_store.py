@@ -0,0 +1,189 @@
+import json
+import logging
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional, Tuple, TypeVar
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Leading byte of every encoded state, so the format can change later.
+# 2: states hold no message text (version 1 kept recent user messages)
+FORMAT_VERSION = 2
+
+# Id older clients send for every anonymous chat; like a missing id, it names no conversation
+ANONYMOUS_USER_ID = "default"
+
+
+def encode_state(state: dict) -> bytes:
+    """Compact binary form of a JSON-serializable conversation state"""
+    payload = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return bytes((FORMAT_VERSION,)) + zlib.compress(payload, 6)
+
+
+def decode_state(data: bytes) -> dict:
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError("Unknown conversation state format")
+    return json.loads(zlib.decompress(data[1:]))
+
+
+class ConversationConflict(Exception):
+    """The conversation was saved by someone else since it was loaded"""
+
+
+class StoredConversation(NamedTuple):
+    state: dict
+    version: int
+
+
+class ConversationStore(ABC):
+    """Per-user conversation state with optimistic versioning.
+
+    ``load`` returns a fresh copy each time, so callers may mutate it;
+    ``save`` only succeeds if the stored version is still the loaded one.
+    ``conflicts`` and ``lost_updates`` count retried and abandoned saves.
+    """
+
+    def __init__(self):
+        self.conflicts = 0
+        self.lost_updates = 0
+
+    @abstractmethod
+    async def load(self, user_id: str) -> Optional[StoredConversation]:
+        ...
+
+    @abstractmethod
+    async def save(self, user_id: str, state: dict, expected_version: int) -> int:
+        ...
+
+    async def update(self, user_id: Optional[str], turn: Callable[[dict], Awaitable[T]], attempts: int = 2) -> T:
+        """Run ``turn`` on the user's state and save it, retrying from fresh state on conflict.
+
+        If every attempt conflicts, the last result is still returned but
+        its state changes are lost, which is logged and counted in
+        ``lost_updates``.
+
+        Anonymous turns (no id, or ``ANONYMOUS_USER_ID``) run on an empty
+        state that is not saved. Stored under one shared id, every anonymous
+        user would read the others' context and contend for a single record.
+        """
+        if not user_id or user_id == ANONYMOUS_USER_ID:
+            return await turn({})
+        for attempt in range(attempts):
+            stored = await self.load(user_id)
+            state, version = (stored.state, stored.version) if stored else ({}, 0)
+            result = await turn(state)
+            try:
+                await self.save(user_id, state, version)
+                return result
+            except ConversationConflict:
+                self.conflicts += 1
+                logger.warning(f"⚠️ Conversation for {user_id} changed concurrently (attempt {attempt + 1})")
+        self.lost_updates += 1
+        logger.error(f"🚨 Conversation state for {user_id} not saved after {attempts} attempts")
+        return result
+
+    def stats(self) -> dict:
+        return {"conflicts": self.conflicts, "lost_updates": self.lost_updates}
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Conversations of this process only, as an LRU of encoded states"""
+
+    def __init__(self, max_conversations: int = 10000):
+        super().__init__()
+        self.max_conversations = max_conversations
+        self._states: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def load(self, user_id: str) -> Optional[StoredConversation]:
+        entry = self._states.get(user_id)
+        if entry is None:
+            return None
+        self._states.move_to_end(user_id)
+        return StoredConversation(decode_state(entry[0]), entry[1])
+
+    async def save(self, user_id: str, state: dict, expected_version: int) -> int:
+        current = self._states.get(user_id, (None, 0))[1]
+        if current != expected_version:
+            raise ConversationConflict(user_id)
+        self._states[user_id] = (encode_state(state), current + 1)
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_conversations:
+            self._states.popitem(last=False)
+        return current + 1
+
+
+class MongoConversationStore(ConversationStore):
+    """Conversations shared by every worker, with a write-through local cache.
+
+    Each document holds the encoded state and a version number; a save
+    only matches the version it was loaded at. Saves update the cache, so
+    a conversation that keeps landing on the same worker is read from
+    Mongo only on its first message there. A cached copy another worker
+    has since advanced fails its save with a conflict, which drops it from
+    the cache and retries the turn from the stored state.
+    """
+
+    def __init__(self, get_collection: Callable[[], Awaitable], cache_size: int = 10000,
+                 cache_ttl: float = 300, expire_days: int = 30):
+        super().__init__()
+        self._get_collection = get_collection
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.expire_days = expire_days
+        self._cache: "OrderedDict[str, Tuple[bytes, int, float]]" = OrderedDict()
+
+    def _remember(self, user_id: str, data: bytes, version: int):
+        self._cache[user_id] = (data, version, time.monotonic() + self.cache_ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def load(self, user_id: str) -> Optional[StoredConversation]:
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[2] > time.monotonic():
+            self._cache.move_to_end(user_id)
+            return StoredConversation(decode_state(cached[0]), cached[1])
+
+        collection = await self._get_collection()
+        document = await collection.find_one({"_id": user_id}, {"state": 1, "version": 1})
+        if document is None:
+            self._cache.pop(user_id, None)
+            return None
+        data = bytes(document["state"])
+        self._remember(user_id, data, document["version"])
+        return StoredConversation(decode_state(data), document["version"])
+
+    async def save(self, user_id: str, state: dict, expected_version: int) -> int:
+        collection = await self._get_collection()
+        data = encode_state(state)
+        now = datetime.utcnow()
+        fields = {
+            "state": data, "format": FORMAT_VERSION,
+            "updated_at": now, "expires_at": now + timedelta(days=self.expire_days),
+        }
+        if expected_version == 0:
+            try:
+                await collection.insert_one({"_id": user_id, "version": 1, **fields})
+            except DuplicateKeyError:
+                self._cache.pop(user_id, None)
+                raise ConversationConflict(user_id)
+        else:
+            result = await collection.update_one(
+                {"_id": user_id, "version": expected_version},
+                {"$set": fields, "$inc": {"version": 1}}
+            )
+            if result.matched_count == 0:
+                self._cache.pop(user_id, None)
+                raise ConversationConflict(user_id)
+        self._remember(user_id, data, expected_version + 1)
+        return expected_version + 1
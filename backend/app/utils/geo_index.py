@@ -0,0 +1,92 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGridIndex:
+    """Uniform lat/lon grid for radius queries without a ``2dsphere`` index.
+
+    Used where ``$geoNear`` is unavailable (tests, in-memory Mongo stand-ins).
+    A query only visits the cells overlapping the search radius and then
+    filters candidates by exact haversine distance.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._payloads: Dict[str, object] = {}
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def upsert(self, key: str, lat: Optional[float], lon: Optional[float], payload: object = None) -> None:
+        """Place ``key`` at (lat, lon); a missing coordinate just removes it"""
+        self.remove(key)
+        if lat is None or lon is None:
+            return
+        self._points[key] = (lat, lon)
+        self._payloads[key] = payload
+        self._cells.setdefault(self._cell(lat, lon), {})[key] = (lat, lon)
+
+    def remove(self, key: str) -> bool:
+        point = self._points.pop(key, None)
+        if point is None:
+            return False
+        self._payloads.pop(key, None)
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        del members[key]
+        if not members:
+            del self._cells[cell]
+        return True
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+        self._payloads.clear()
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: int = 20,
+               predicate: Optional[Callable[[object], bool]] = None) -> List[Tuple[object, float]]:
+        """``(payload, distance_km)`` pairs within ``radius_km``, nearest first.
+
+        ``predicate``, if given, is applied to payloads before the limit.
+        """
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        min_row, min_col = self._cell(max(lat - lat_span, -90.0), lon - lon_span)
+        max_row, max_col = self._cell(min(lat + lat_span, 90.0), lon + lon_span)
+
+        # Very wide searches touch more cells than there are points
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            candidates = self._points.items()
+        else:
+            candidates = (
+                item
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+                for item in self._cells.get((row, col), {}).items()
+            )
+
+        hits = []
+        for key, (plat, plon) in candidates:
+            distance = haversine_km(lat, lon, plat, plon)
+            if distance <= radius_km and (predicate is None or predicate(self._payloads[key])):
+                hits.append((distance, key))
+        hits.sort()
+        return [(self._payloads[key], round(distance, 3)) for distance, key in hits[:limit]]
@@ -0,0 +1,96 @@
+import csv
+import logging
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]  # (latitude, longitude)
+
+# The bundled table is a sample of a few dozen major-city ZIP codes, enough
+# for development; most real therapist locations do not resolve against it.
+# Deployments should point GEO_CENTROIDS_PATH at a full ZIP centroid table
+# with the same zip,city,state,latitude,longitude columns.
+BUNDLED_CENTROIDS_PATH = Path(__file__).parent.parent / "data" / "geo_centroids.csv"
+CENTROIDS_PATH = Path(os.getenv("GEO_CENTROIDS_PATH") or BUNDLED_CENTROIDS_PATH)
+ZIP_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+STATE_RE = re.compile(r",\s*([A-Za-z]{2})\b")
+
+
+class OfflineGeocoder:
+    """Resolve "City, ST", a city name or a ZIP code to centroid coordinates.
+
+    Backed by a local centroid table (``CENTROIDS_PATH``); no external
+    service is ever called. Unknown ZIP codes fall back to the centroid of
+    known ZIPs sharing their 3-digit prefix. Locations the table cannot
+    place resolve to None.
+    """
+
+    def __init__(self, path: Path = CENTROIDS_PATH):
+        self._zips: Dict[str, Coordinates] = {}
+        self._zip3: Dict[str, List[Coordinates]] = {}
+        self._cities: Dict[Tuple[str, str], List[Coordinates]] = {}
+        self._load(path)
+        if path == BUNDLED_CENTROIDS_PATH:
+            logger.info(f"📍 Geocoding with the bundled sample of {len(self)} ZIP centroids; "
+                        "set GEO_CENTROIDS_PATH to a full table")
+
+    def __len__(self) -> int:
+        return len(self._zips)
+
+    def _load(self, path: Path) -> None:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                point = (float(row["latitude"]), float(row["longitude"]))
+                self._zips[row["zip"]] = point
+                self._zip3.setdefault(row["zip"][:3], []).append(point)
+                key = (row["city"].strip().lower(), row["state"].strip().lower())
+                self._cities.setdefault(key, []).append(point)
+
+    def geocode(self, location: Optional[str]) -> Optional[Coordinates]:
+        if not location:
+            return None
+        zip_match = ZIP_RE.search(location)
+        if zip_match:
+            code = zip_match.group(1)
+            if code in self._zips:
+                return self._zips[code]
+            if code[:3] in self._zip3:
+                return _centroid(self._zip3[code[:3]])
+
+        city = location.split(",")[0].strip().lower()
+        city = ZIP_RE.sub("", city).strip()
+        state_match = STATE_RE.search(location)
+        if state_match:
+            points = self._cities.get((city, state_match.group(1).lower()))
+            if points:
+                return _centroid(points)
+        # City without a state: only answer when the name is unambiguous
+        matches = [points for (name, _), points in self._cities.items() if name == city]
+        if len(matches) == 1:
+            return _centroid(matches[0])
+        return None
+
+
+def _centroid(points: List[Coordinates]) -> Coordinates:
+    return (
+        round(sum(p[0] for p in points) / len(points), 6),
+        round(sum(p[1] for p in points) / len(points), 6),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_geocoder() -> OfflineGeocoder:
+    return OfflineGeocoder()
+
+
+def geocode(location: Optional[str]) -> Optional[Coordinates]:
+    """Geocode with the shared bundled table, returning None when unknown"""
+    try:
+        return get_geocoder().geocode(location)
+    except OSError as e:
+        logger.error(f"Geocoder table unavailable: {e}")
+        return None
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_SECONDS = float(os.getenv("HEALTH_CHECK_SECONDS", "10"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# Worst event-loop delay over a probe interval before the worker stops being ready
+HEALTH_MAX_LOOP_LAG = float(os.getenv("HEALTH_MAX_LOOP_LAG", "0.5"))
+# Tasks waiting for an executor thread before the worker stops being ready
+HEALTH_MAX_EXECUTOR_QUEUE = int(os.getenv("HEALTH_MAX_EXECUTOR_QUEUE", "64"))
+
+# How often the loop lag sampler wakes up
+LAG_SAMPLE_SECONDS = 0.25
+
+Check = Callable[[], Awaitable[Tuple[bool, Dict]]]
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """Thread pool that counts the tasks still waiting for a thread"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queued = 0
+        self._count_lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        waiting = [True]
+
+        def leave_queue(*_):
+            # Once per task: when a thread picks it up, or when it is cancelled before that
+            with self._count_lock:
+                if waiting[0]:
+                    waiting[0] = False
+                    self.queued -= 1
+
+        def started():
+            leave_queue()
+            return fn(*args, **kwargs)
+
+        with self._count_lock:
+            self.queued += 1
+        try:
+            future = super().submit(started)
+        except BaseException:
+            leave_queue()
+            raise
+        future.add_done_callback(leave_queue)
+        return future
+
+
+def executor_check(get_executor: Callable[[], Optional[InstrumentedExecutor]],
+                   max_queued: int = HEALTH_MAX_EXECUTOR_QUEUE) -> Check:
+    """Healthy while no more than ``max_queued`` tasks wait for a thread"""
+    async def check():
+        executor = get_executor()
+        if executor is None:
+            return True, {}
+        return executor.queued <= max_queued, {"queued": executor.queued}
+    return check
+
+
+class CheckResult(NamedTuple):
+    healthy: bool
+    critical: bool
+    latency_ms: float
+    detail: Dict
+
+    @property
+    def status(self) -> str:
+        if self.healthy:
+            return "ok"
+        return "failing" if self.critical else "degraded"
+
+
+def _body(payload: Dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class HealthProber:
+    """Deep health checks run in the background, served to probes from cache.
+
+    Every ``interval`` the registered checks (database ping, a canary
+    inference, executor queue depth, ...) run concurrently, each bounded
+    by ``timeout``, alongside the worst event-loop lag seen since the last
+    run. The outcome is rendered to JSON once, so ``liveness`` and
+    ``readiness`` only pick a prebuilt body and cost nothing however often
+    an orchestrator calls them.
+
+    A failing critical check makes the worker not ready; a failing
+    non-critical one only reports it as degraded. Results older than
+    three intervals are not trusted either.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_SECONDS, timeout: float = HEALTH_CHECK_TIMEOUT,
+                 max_loop_lag: float = HEALTH_MAX_LOOP_LAG):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_loop_lag = max_loop_lag
+        self._checks: Dict[str, Tuple[Check, bool]] = {}
+        self.results: Dict[str, CheckResult] = {}
+        self.checked_at: Optional[float] = None
+        self._worst_lag = 0.0
+        self._lag_task: Optional[asyncio.Task] = None
+        self._ready: Tuple[int, bytes] = (503, _body({"status": "starting"}))
+
+    def add_check(self, name: str, check: Check, critical: bool = True):
+        """``check()`` returns ``(healthy, detail)``; raising or timing out counts as unhealthy"""
+        self._checks[name] = (check, critical)
+
+    async def _run_check(self, check: Check, critical: bool) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            healthy, detail = await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            healthy, detail = False, {"error": f"timed out after {self.timeout:.1f}s"}
+        except Exception as e:
+            healthy, detail = False, {"error": f"{type(e).__name__}: {e}"}
+        return CheckResult(healthy, critical, round((time.perf_counter() - started) * 1000, 2), detail)
+
+    async def run_once(self) -> Dict[str, CheckResult]:
+        names = list(self._checks)
+        outcomes = await asyncio.gather(*(self._run_check(*self._checks[name]) for name in names))
+        results = dict(zip(names, outcomes))
+
+        lag, self._worst_lag = self._worst_lag, 0.0
+        results["event_loop"] = CheckResult(lag <= self.max_loop_lag, True, 0.0, {"lag_ms": round(lag * 1000, 2)})
+
+        for name, result in results.items():
+            previous = self.results.get(name)
+            if previous is not None and previous.healthy != result.healthy:
+                log = logger.info if result.healthy else logger.warning
+                log("🩺 Health check %s is now %s %s", name, result.status, result.detail or "")
+
+        self.results = results
+        self.checked_at = time.monotonic()
+        ready = not any(result.status == "failing" for result in results.values())
+        degraded = any(result.status == "degraded" for result in results.values())
+        self._ready = (200 if ready else 503, _body({
+            "status": ("degraded" if degraded else "ready") if ready else "not_ready",
+            "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "checks": self.snapshot(),
+        }))
+        return results
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            name: {"status": result.status, "latency_ms": result.latency_ms, **result.detail}
+            for name, result in self.results.items()
+        }
+
+    async def _sample_lag(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(LAG_SAMPLE_SECONDS)
+            self._worst_lag = max(self._worst_lag, time.monotonic() - started - LAG_SAMPLE_SECONDS)
+
+    async def run(self):
+        """Background task running the checks every ``interval``"""
+        self._lag_task = asyncio.create_task(self._sample_lag())
+        try:
+            while True:
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"Health checks failed to run: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._lag_task.cancel()
+
+    def liveness(self) -> Tuple[int, bytes]:
+        """Alive while the event loop keeps running the background sampler"""
+        if self._lag_task is not None and self._lag_task.done():
+            return 503, LAG_SAMPLER_STOPPED
+        return 200, ALIVE
+
+    def readiness(self, accepting: bool = True) -> Tuple[int, bytes]:
+        """Latest checked readiness; ``accepting=False`` (starting or shutting down) is never ready"""
+        if not accepting:
+            return 503, NOT_ACCEPTING
+        if self.checked_at is not None and time.monotonic() - self.checked_at > 3 * self.interval:
+            return 503, STALE
+        return self._ready
+
+
+ALIVE = _body({"status": "alive"})
+LAG_SAMPLER_STOPPED = _body({"status": "stalled", "reason": "event loop sampler stopped"})
+NOT_ACCEPTING = _body({"status": "not_ready", "reason": "not accepting requests"})
+STALE = _body({"status": "not_ready", "reason": "health checks have not run recently"})
+
+health_prober = HealthProber()
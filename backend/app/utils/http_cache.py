@@ -0,0 +1,36 @@
+from typing import Optional
+from fastapi import Request, Response
+
+# Clients may reuse a response but must revalidate it with the ETag first
+REVALIDATE = "no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def version_etag(name: str, version: int) -> str:
+    return f'"{name}-v{version}"'
+
+def conditional_response(request: Request, response: Response, etag: str,
+                         cache_control: str = REVALIDATE) -> Optional[Response]:
+    """A 304 if the client already holds ``etag``; otherwise set the validators on ``response``.
+
+    Call before doing any work so that revalidations skip the query and
+    serialization entirely.
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
@@ -1,20 +1,109 @@
-from jose import jwt, JWTError
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from jose import jwt, JWTError
+
+logger = logging.getLogger(__name__)
 
-SECRET_KEY = "MY_SECRET_KEY"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+
+def load_signing_keys() -> Tuple[Dict[str, str], str]:
+    """Signing keys by kid, and the kid new tokens are signed with.
+
+    ``JWT_SECRET_KEYS`` holds ``kid:secret`` pairs separated by commas. To
+    rotate, add the new key, point ``JWT_ACTIVE_KID`` at it, and drop the
+    old key once the tokens it signed have expired. Without
+    ``JWT_SECRET_KEYS`` the single legacy ``SECRET_KEY`` is used.
+    """
+    keys = {}
+    for pair in os.getenv("JWT_SECRET_KEYS", "").split(","):
+        kid, _, secret = pair.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret
+    if not keys:
+        keys = {"default": os.getenv("SECRET_KEY", "supersecret")}
+    active_kid = os.getenv("JWT_ACTIVE_KID") or next(iter(keys))
+    if active_kid not in keys:
+        raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} is not in JWT_SECRET_KEYS")
+    return keys, active_kid
+
+
+class TokenService:
+    """Issues and verifies access tokens for every auth dependency.
+
+    Verified tokens are remembered in a small LRU keyed by a digest of the
+    token, so repeat requests with the same bearer token skip signature
+    verification. A cached entry is only served until the token's ``exp``.
+    """
 
-def create_access_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def decode_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    def __init__(self, keys: Dict[str, str], active_kid: str, algorithm: str = ALGORITHM,
+                 expire_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES, cache_size: int = TOKEN_CACHE_SIZE):
+        self.keys = dict(keys)
+        self.active_kid = active_kid
+        self.algorithm = algorithm
+        self.expire_minutes = expire_minutes
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+
+    def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
+        to_encode = data.copy()
+        expire = datetime.utcnow() + (expires_delta or timedelta(minutes=self.expire_minutes))
+        to_encode.update({"exp": expire})
+        return jwt.encode(
+            to_encode, self.keys[self.active_kid], algorithm=self.algorithm,
+            headers={"kid": self.active_kid}
+        )
+
+    def decode(self, token: str) -> Optional[dict]:
+        """Claims of a valid, unexpired token, or None"""
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        cached = self._verified.get(digest)
+        if cached is not None:
+            expires_at, payload = cached
+            if expires_at > time.time():
+                self._verified.move_to_end(digest)
+                return dict(payload)
+            del self._verified[digest]
+
+        payload = self._verify(token)
+        if payload is None:
+            return None
+        if self.cache_size and isinstance(payload.get("exp"), (int, float)):
+            self._verified[digest] = (payload["exp"], payload)
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return dict(payload)
+
+    def _verify(self, token: str) -> Optional[dict]:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            return None
+        # Tokens issued before kids were introduced may carry none
+        secrets = [self.keys[kid]] if kid in self.keys else [] if kid else list(self.keys.values())
+        for secret in secrets:
+            try:
+                return jwt.decode(token, secret, algorithms=[self.algorithm])
+            except JWTError:
+                continue
         return None
+
+    def clear_cache(self) -> None:
+        self._verified.clear()
+
+
+token_service = TokenService(*load_signing_keys())
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    return token_service.create_access_token(data, expires_delta)
+
+def decode_token(token: str) -> Optional[dict]:
+    return token_service.decode(token)
@@ -0,0 +1,263 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for structured records, "text" for the classic human-readable lines
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# "logger=fraction" pairs: share of records below WARNING that are kept
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# "logger=records per second" pairs, applied at every level
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Fields passed through ``extra=`` that may hold what a user typed or a secret
+REDACTED_FIELDS = frozenset({"text", "message_text", "body", "password", "token", "refresh_token"})
+SECRET_PATTERNS = (
+    (re.compile(r"(?i)\bbearer\s+[\w\-.~+/]+=*"), "Bearer [redacted]"),
+    (re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b"), "[email]"),
+)
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def parse_logger_settings(value: str) -> Dict[str, float]:
+    """``"app.main=0.1,uvicorn.access=0.01"`` -> ``{"app.main": 0.1, ...}``"""
+    settings = {}
+    for pair in value.split(","):
+        name, _, number = pair.strip().partition("=")
+        if name and number:
+            settings[name.strip()] = float(number)
+    return settings
+
+
+def _setting_for(settings: Dict[str, float], logger_name: str) -> Optional[float]:
+    """Setting of the closest configured ancestor logger, if any"""
+    name = logger_name
+    while True:
+        if name in settings:
+            return settings[name]
+        if "." not in name:
+            return settings.get("root")
+        name = name.rsplit(".", 1)[0]
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a configured fraction of a logger's records below WARNING"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _setting_for(self.rates, record.name)
+        return rate is None or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per logger allowing a burst of one second's worth of records"""
+
+    def __init__(self, limits: Dict[str, float]):
+        super().__init__()
+        self.limits = limits
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        limit = _setting_for(self.limits, record.name)
+        if limit is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.name, [limit, now])
+            bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            self.suppressed += 1
+            return False
+
+
+class RedactionFilter(logging.Filter):
+    """Replaces sensitive ``extra=`` fields with their length before the record is queued"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field in REDACTED_FIELDS.intersection(vars(record)):
+            value = getattr(record, field)
+            if value is not None:
+                setattr(record, field, f"[redacted {len(str(value))} chars]")
+        return True
+
+
+def scrub(text: str) -> str:
+    for pattern, replacement in SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any ``extra=`` fields, with secrets scrubbed"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": scrub(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = scrub(record.exc_text)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ScrubbingFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return scrub(super().format(record))
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the writer thread and drops them when the queue is full.
+
+    Only the message is rendered here; timestamps, JSON and I/O happen in
+    the writer thread, off the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriter(logging.handlers.QueueListener):
+    """Background writer that also reports how many records were dropped or suppressed"""
+
+    def __init__(self, log_queue: queue.Queue, handler: logging.Handler, counters=()):
+        super().__init__(log_queue, handler, respect_handler_level=True)
+        self.counters = counters
+        self._reported: Dict[int, int] = {}
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for counter, attribute in self.counters:
+            lost = getattr(counter, attribute) - self._reported.get(id(counter), 0)
+            if lost:
+                self._reported[id(counter)] = self._reported.get(id(counter), 0) + lost
+                super().handle(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"⚠️ {lost} log records {attribute}", attribute: lost,
+                }))
+        super().handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full; wait for room rather than losing the sentinel
+        self.queue.put(self._sentinel, timeout=5)
+
+
+_writer: Optional[LogWriter] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, queue_size: int = LOG_QUEUE_SIZE,
+                      sample_rates: Optional[Dict[str, float]] = None,
+                      rate_limits: Optional[Dict[str, float]] = None) -> LogWriter:
+    """Route the root logger through a bounded queue to a background writer thread.
+
+    Sampling, rate limiting and redaction run as filters before a record
+    is queued, so discarded records cost no I/O. Loggers that do not
+    propagate to the root (such as ``uvicorn.access``) keep their own
+    handlers.
+    """
+    global _writer
+    stop_logging()
+    sample_rates = parse_logger_settings(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+    rate_limits = parse_logger_settings(LOG_RATE_LIMITS) if rate_limits is None else rate_limits
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    rate_limit = RateLimitFilter(rate_limits)
+    for log_filter in (SamplingFilter(sample_rates), rate_limit, RedactionFilter()):
+        queue_handler.addFilter(log_filter)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else ScrubbingFormatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _writer = LogWriter(log_queue, stream_handler, counters=((queue_handler, "dropped"), (rate_limit, "suppressed")))
+    _writer.start()
+    return _writer
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
+
+
+def flush_logging(timeout: float = 5.0) -> bool:
+    """Wait until the writer has handled every queued record, keeping it running"""
+    writer = _writer
+    if writer is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while writer.queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _restart_writer_in_child() -> None:
+    """Threads do not survive fork, so a forked worker gets its own queue and writer"""
+    if _writer is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_writer.queue.maxsize)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            handler.queue = log_queue
+    _writer.queue = log_queue
+    _writer._thread = None
+    _writer.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_writer_in_child)
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+from bson import ObjectId
+
+
+def _tag(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$d": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$o": str(value)}
+    return value
+
+def _untag(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$d" in value:
+            return datetime.fromisoformat(value["$d"])
+        if "$o" in value:
+            return ObjectId(value["$o"])
+    return value
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last returned document as an opaque token"""
+    raw = json.dumps([_tag(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Decode a token produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor shape")
+        return [_untag(v) for v in values]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def keyset_filter(field: str, value: Any, last_id: ObjectId, descending: bool = True) -> Dict:
+    """Match documents strictly after ``(value, last_id)`` in ``(field, _id)`` order.
+
+    The outer range on ``field`` keeps index bounds tight, so resuming from a
+    deep cursor scans no more index keys than the first page does.
+    """
+    inclusive, strict = ("$lte", "$lt") if descending else ("$gte", "$gt")
+    return {
+        field: {inclusive: value},
+        "$or": [
+            {field: {strict: value}},
+            {"_id": {strict: last_id}},
+        ],
+    }
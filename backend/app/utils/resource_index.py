@@ -0,0 +1,193 @@
+import bisect
+import math
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .text_search import tokenize
+
+
+class ResourceSearchIndex:
+    """In-process inverted index over the resource library.
+
+    Documents get a small integer ordinal; postings map each term to
+    ``{ordinal: weighted term frequency}`` and every category keeps a bitset
+    (a Python int) of its ordinals. Queries are ranked with BM25 and the last
+    query word is matched as a prefix, so results work while the user types.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75,
+                 field_weights: Optional[Dict[str, float]] = None):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or {"title": 3.0, "description": 1.0}
+        self.ready = False
+        self._clear()
+
+    def _clear(self) -> None:
+        self._docs: Dict[int, dict] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._next_ordinal = 0
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._total_len = 0.0
+        self._category_bits: Dict[str, int] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        self._recent: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self._ordinals
+
+    # Writes
+
+    def replace_all(self, documents: Iterable[dict]) -> None:
+        """Rebuild the index from a full set of resource documents"""
+        self._clear()
+        for document in documents:
+            self.upsert(document)
+        self.ready = True
+
+    def upsert(self, document: dict) -> None:
+        """Add a resource or replace the indexed copy of it"""
+        resource_id = str(document["_id"])
+        if resource_id in self._ordinals:
+            self.remove(resource_id)
+        ordinal = self._free.pop() if self._free else self._allocate()
+        self._ordinals[resource_id] = ordinal
+        self._docs[ordinal] = document
+
+        terms: Counter = Counter()
+        for field, weight in self.field_weights.items():
+            for term in tokenize(document.get(field, "")):
+                terms[term] += weight
+        self._doc_terms[ordinal] = dict(terms)
+        self._doc_len[ordinal] = sum(terms.values())
+        self._total_len += self._doc_len[ordinal]
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_terms = None
+            postings[ordinal] = frequency
+
+        category = (document.get("category") or "").lower()
+        self._category_bits[category] = self._category_bits.get(category, 0) | (1 << ordinal)
+        self._recent = None
+
+    def remove(self, resource_id: str) -> bool:
+        """Drop a resource from the index; returns False if it was not indexed"""
+        ordinal = self._ordinals.pop(resource_id, None)
+        if ordinal is None:
+            return False
+        document = self._docs.pop(ordinal)
+        for term in self._doc_terms.pop(ordinal):
+            postings = self._postings[term]
+            del postings[ordinal]
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_len -= self._doc_len.pop(ordinal)
+
+        category = (document.get("category") or "").lower()
+        bits = self._category_bits.get(category, 0) & ~(1 << ordinal)
+        if bits:
+            self._category_bits[category] = bits
+        else:
+            self._category_bits.pop(category, None)
+        self._free.append(ordinal)
+        self._recent = None
+        return True
+
+    def stale_ids(self, stamps: Dict[str, Optional[datetime]],
+                  as_of: Optional[datetime] = None) -> Tuple[Set[str], Set[str]]:
+        """Compare against ``{id: updated_at}`` read from the database.
+
+        Returns ``(changed, removed)``: ids whose indexed copy is missing or
+        differs, and indexed ids absent from ``stamps``. Entries indexed at or
+        after ``as_of`` (when the stamps were read) are never reported removed.
+        """
+        changed = set()
+        for resource_id, updated_at in stamps.items():
+            ordinal = self._ordinals.get(resource_id)
+            if ordinal is None or self._docs[ordinal].get("updated_at") != updated_at:
+                changed.add(resource_id)
+        removed = set()
+        for resource_id in set(self._ordinals) - set(stamps):
+            updated_at = self._docs[self._ordinals[resource_id]].get("updated_at")
+            if as_of is None or updated_at is None or updated_at < as_of:
+                removed.add(resource_id)
+        return changed, removed
+
+    def _allocate(self) -> int:
+        ordinal = self._next_ordinal
+        self._next_ordinal += 1
+        return ordinal
+
+    # Reads
+
+    def categories(self) -> List[str]:
+        return sorted(category for category in self._category_bits if category)
+
+    def search(self, query: Optional[str] = None, category: Optional[str] = None,
+               limit: int = 100, skip: int = 0) -> List[dict]:
+        """Return matching resource documents, best BM25 score first.
+
+        Without a query, resources in the category are returned newest first.
+        """
+        allowed = None
+        if category and category.lower() != "all":
+            allowed = self._category_bits.get(category.lower(), 0)
+            if not allowed:
+                return []
+
+        words = tokenize(query) if query else []
+        if not words:
+            ordinals = self._recent_ordinals()
+            if allowed is not None:
+                ordinals = [o for o in ordinals if (allowed >> o) & 1]
+            return [self._docs[o] for o in ordinals[skip:skip + limit]]
+
+        scores: Dict[int, float] = {}
+        for position, word in enumerate(words):
+            is_last = position == len(words) - 1
+            for term in (self._expand_prefix(word) if is_last else [word]):
+                self._accumulate(term, scores, allowed)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [self._docs[o] for o, _ in ranked[skip:skip + limit]]
+
+    def _accumulate(self, term: str, scores: Dict[int, float], allowed: Optional[int]) -> None:
+        postings = self._postings.get(term)
+        if not postings:
+            return
+        count = len(self._docs)
+        idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+        avg_len = (self._total_len / count) or 1.0
+        k1, b = self.k1, self.b
+        for ordinal, frequency in postings.items():
+            if allowed is not None and not (allowed >> ordinal) & 1:
+                continue
+            norm = k1 * (1 - b + b * self._doc_len[ordinal] / avg_len)
+            scores[ordinal] = scores.get(ordinal, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + "\uffff", start)
+        return terms[start:end]
+
+    def _recent_ordinals(self) -> List[int]:
+        if self._recent is None:
+            self._recent = sorted(
+                self._docs,
+                key=lambda o: self._docs[o].get("created_at") or datetime.min,
+                reverse=True
+            )
+        return self._recent
@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import Dict, Optional, List
 from datetime import datetime
+import copy
 import random
 import re
 import logging
@@ -8,6 +9,9 @@ import logging
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Messages kept in a saved conversation context
+MAX_CONTEXT_MESSAGES = 20
+
 class ConversationState(Enum):
     INITIAL = 1
     FOLLOW_UP = 2
@@ -36,13 +40,14 @@ class AIResponseGenerator:
             return "Could you please share more about how you're feeling?"
         
 class AIResponseGenerator:
-    def __init__(self, intent_manager=None):
+    def __init__(self, intent_manager=None, therapist_matcher=None):
         """Advanced mental health response generator with contextual awareness"""
         self.responses = self._initialize_responses()
         self.resources = self._initialize_resources()
         self.crisis_keywords = self._initialize_crisis_keywords()
         self._setup_conversation_tracking()
         self.intent_manager = intent_manager
+        self.therapist_matcher = therapist_matcher
 
     def _initialize_responses(self) -> Dict:
         """Initialize comprehensive response library with actionable strategies"""
@@ -483,7 +488,11 @@ class AIResponseGenerator:
 
     def _setup_conversation_tracking(self):
         """Initialize conversation tracking system"""
-        self.conversation_context = {
+        self.conversation_context = self._new_context()
+
+    @staticmethod
+    def _new_context() -> Dict:
+        return {
             "current_topic": None,
             "state": ConversationState.INITIAL,
             "user_info": {
@@ -494,9 +503,46 @@ class AIResponseGenerator:
             },
             "message_history": [],
             "sentiment_trend": [],
+            "crisis_flagged": False,
             "start_time": datetime.now()
         }
 
+    def bind_context(self, saved: Optional[Dict] = None) -> "AIResponseGenerator":
+        """A generator for one conversation, restored from ``export_context`` output.
+
+        The copy is shallow: the response library and matcher are shared,
+        only the conversation context is its own.
+        """
+        bound = copy.copy(self)
+        bound.conversation_context = self._new_context()
+        if saved:
+            context = bound.conversation_context
+            context["current_topic"] = saved.get("current_topic")
+            context["state"] = ConversationState[saved.get("state", "INITIAL")]
+            context["user_info"].update(saved.get("user_info", {}))
+            context["sentiment_trend"] = list(saved.get("sentiment_trend", []))
+            context["crisis_flagged"] = bool(saved.get("crisis_flagged"))
+            if saved.get("start_time"):
+                context["start_time"] = datetime.fromtimestamp(saved["start_time"])
+        return bound
+
+    def export_context(self) -> Dict:
+        """JSON-serializable conversation context, without the messages themselves.
+
+        What users write is sensitive and the context may be kept for days,
+        so only what later replies depend on is exported: topic, state,
+        user info, recent sentiment scores and whether a crisis came up.
+        """
+        context = self.conversation_context
+        return {
+            "current_topic": context["current_topic"],
+            "state": context["state"].name,
+            "user_info": dict(context["user_info"]),
+            "sentiment_trend": context["sentiment_trend"][-MAX_CONTEXT_MESSAGES:],
+            "crisis_flagged": context["crisis_flagged"],
+            "start_time": context["start_time"].timestamp(),
+        }
+
     def generate_response(self, message: str, intent: Optional[str] = None) -> str:
         """
         Generate contextually appropriate mental health response
@@ -506,11 +552,12 @@ class AIResponseGenerator:
         Returns:
             Generated response with support strategies
         """
-        logger.debug(f"Generating response for intent: {intent}, message: {message[:50]}...")
+        logger.debug("Generating response for intent: %s (%d-char message)", intent, len(message))
         self._update_conversation_context(message)
         
         crisis_level = self._assess_crisis_risk(message)
         if crisis_level:
+            self.conversation_context["crisis_flagged"] = True
             return self._handle_crisis_situation(crisis_level)
             
         if not intent:
@@ -591,6 +638,7 @@ class AIResponseGenerator:
         
         if self._should_include_resources(intent):
             response += self._get_resources(intent)
+            response += self._get_therapist_suggestions(intent)
             
         return response
 
@@ -636,6 +684,22 @@ class AIResponseGenerator:
         resources = random.sample(self.resources[intent], min(2, len(self.resources[intent])))
         return "\n\nHelpful resources:\n• " + "\n• ".join(resources)
 
+    def _get_therapist_suggestions(self, intent: str, limit: int = 2) -> str:
+        """Format precomputed therapist matches for the intent, if any"""
+        if not self.therapist_matcher:
+            return ""
+        matches = self.therapist_matcher.match(intent, limit)
+        if not matches:
+            return ""
+
+        lines = []
+        for therapist in matches:
+            line = f"{therapist['name']}, {therapist['credentials']} ({', '.join(therapist['specialties'][:3])})"
+            if therapist.get("telehealth"):
+                line += " - offers telehealth"
+            lines.append(line)
+        return "\n\nTherapists who may be able to help:\n• " + "\n• ".join(lines)
+
     def _analyze_sentiment(self, message: str) -> float:
         """Analyze message sentiment with enhanced word lists"""
         positive = ["hope", "better", "improving", "progress", "happy", "relief"]
@@ -668,8 +732,7 @@ class AIResponseGenerator:
             "main_topics": self._get_main_topics(),
             "sentiment_trend": self._get_sentiment_trend(),
             "user_info": self.conversation_context["user_info"],
-            "crisis_flagged": any(m for m in self.conversation_context["message_history"] 
-                                 if self._assess_crisis_risk(m))
+            "crisis_flagged": self.conversation_context["crisis_flagged"]
         }
 
     def _get_main_topics(self) -> List[str]:
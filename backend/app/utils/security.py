@@ -1,7 +1,108 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
 import bcrypt
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+logger = logging.getLogger(__name__)
+
+# Changing the cost only affects new hashes; existing ones are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify requests allowed to wait for a worker before new ones are shed
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    try:
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash (e.g. a legacy plaintext value)
+        return False
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Cost factor of a ``$2b$12$...`` bcrypt hash"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    return hash_rounds(hashed) != rounds
+
+
+class HasherOverloaded(Exception):
+    """Raised instead of queueing when too many hashes are already waiting"""
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a small process pool.
+
+    bcrypt is deliberately slow CPU work; run inline it stalls every other
+    request on the loop. At most ``workers`` jobs are handed to the pool at
+    a time and at most ``max_pending`` more may wait for a slot, after which
+    callers get ``HasherOverloaded`` straight away rather than a slow login.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 rounds: int = BCRYPT_ROUNDS, executor: Optional[Executor] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor = executor
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs running or waiting for a worker"""
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # spawn, so workers do not inherit the parent's threads and loaded models
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._in_flight >= self.workers + self.max_pending:
+            raise HasherOverloaded("Password hashing queue is full")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self._in_flight += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password, also returning a new hash when the stored one uses another cost"""
+        if not await self.verify(plain, hashed):
+            return False, None
+        if needs_rehash(hashed, self.rounds):
+            return True, await self.hash(plain)
+        return True, None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,159 @@
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long in-flight requests get to finish once shutdown starts
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "20"))
+# Limit for each registered buffer flush and each closer
+SHUTDOWN_STEP_SECONDS = float(os.getenv("SHUTDOWN_STEP_SECONDS", "5"))
+
+
+async def _call(step: Callable[[], Any], timeout: float):
+    """Await an async step, or run a blocking one in a thread, within ``timeout``"""
+    if inspect.iscoroutinefunction(step):
+        return await asyncio.wait_for(step(), timeout)
+    return await asyncio.wait_for(asyncio.to_thread(step), timeout)
+
+
+class ShutdownCoordinator:
+    """Orders a graceful shutdown of one process.
+
+    Phases, each timed and logged:
+
+    1. admission stops: new requests get a 503 (see ``DrainingMiddleware``)
+       and readiness fails. With ``hook_signals`` this happens as soon as
+       SIGTERM arrives, while uvicorn is still closing its sockets and
+       waiting for open connections.
+    2. in-flight requests, such as chat pipelines, finish up to a deadline.
+       uvicorn has usually waited for them already; this covers whatever
+       is left when its own graceful timeout runs out.
+    3. registered buffers are flushed, while their destinations are still open
+    4. registered closers (background tasks, executors, pools, the database
+       client) run in registration order
+
+    A failing or slow step is logged and skipped, so one stuck resource
+    cannot keep the others from closing.
+    """
+
+    def __init__(self, drain_timeout: float = SHUTDOWN_DRAIN_SECONDS, step_timeout: float = SHUTDOWN_STEP_SECONDS):
+        self.drain_timeout = drain_timeout
+        self.step_timeout = step_timeout
+        self.accepting = True
+        self.in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._buffers: List[Tuple[str, Callable[[], Any]]] = []
+        self._closers: List[Tuple[str, Callable[[], Any]]] = []
+
+    def register_buffer(self, name: str, flush: Callable[[], Any]):
+        """Flush ``flush`` (sync or async) after draining, before anything is closed"""
+        self._buffers.append((name, flush))
+
+    def register_closer(self, name: str, close: Callable[[], Any]):
+        """Run ``close`` (sync or async) after the buffers, in registration order"""
+        self._closers.append((name, close))
+
+    def start(self):
+        self.accepting = True
+
+    def stop_admission(self):
+        """Safe to call from a signal handler: only flips a flag"""
+        self.accepting = False
+
+    def hook_signals(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """Stop admission when a shutdown signal arrives, then hand it to the server's handler.
+
+        Call from lifespan startup, once the server has installed its own
+        handlers. Signals without a Python handler are left alone.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in signals:
+            previous = signal.getsignal(sig)
+            if not callable(previous) or getattr(previous, "stops_admission", False):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                self.stop_admission()
+                previous(signum, frame)
+
+            handler.stops_admission = True
+            signal.signal(sig, handler)
+
+    @asynccontextmanager
+    async def track(self):
+        """Count the enclosed work as in flight until it finishes"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0 and self._idle is not None:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until nothing is in flight; False if the deadline passed first"""
+        if self.in_flight == 0:
+            return True
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._idle = None
+
+    async def _run_steps(self, label: str, steps: List[Tuple[str, Callable[[], Any]]]) -> List[str]:
+        failed = []
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                await _call(step, self.step_timeout)
+                logger.info("🧹 %s %s in %.1f ms", label, name, (time.perf_counter() - started) * 1000)
+            except asyncio.TimeoutError:
+                failed.append(name)
+                logger.error("⏱️ %s %s did not finish within %.0fs", label, name, self.step_timeout)
+            except Exception:
+                failed.append(name)
+                logger.exception("💥 %s %s failed", label, name)
+        return failed
+
+    async def shutdown(self) -> Dict[str, float]:
+        """Run every phase; returns the seconds each one took"""
+        timings = {}
+        self.stop_admission()
+
+        started = time.perf_counter()
+        waiting = self.in_flight
+        drained = await self.drain(self.drain_timeout)
+        timings["drain"] = time.perf_counter() - started
+        if drained:
+            logger.info("🚰 Drained %d in-flight requests in %.2fs", waiting, timings["drain"])
+        else:
+            logger.warning("⚠️ %d requests still in flight after %.0fs; shutting down anyway",
+                           self.in_flight, self.drain_timeout)
+
+        # Steps are registered again by the next startup
+        buffers, self._buffers = self._buffers, []
+        closers, self._closers = self._closers, []
+        for phase, label, steps in (("flush", "Flushed", buffers), ("close", "Closed", closers)):
+            started = time.perf_counter()
+            failed = await self._run_steps(label, steps)
+            timings[phase] = time.perf_counter() - started
+            if failed:
+                logger.warning("⚠️ Shutdown %s phase incomplete: %s", phase, ", ".join(failed))
+
+        logger.info("🛑 Shutdown finished in %.2fs (%s)", sum(timings.values()),
+                    ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in timings.items()))
+        return timings
+
+
+shutdown_coordinator = ShutdownCoordinator()
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import io
+import json
+import re
+import tempfile
+import zlib
+from datetime import datetime
+from typing import IO, Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence
+from bson import ObjectId
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# Flush compressed output roughly every 64KB so clients see steady progress
+GZIP_FLUSH_BYTES = 64 * 1024
+
+# Request bodies larger than this are spooled to a temporary file (as multipart uploads are)
+SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+JSON_READ_CHARS = 64 * 1024
+# Largest single item accepted from a streamed JSON array
+JSON_MAX_ITEM_CHARS = 1024 * 1024
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for the BSON types we store"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def iter_ndjson(
+    cursor,
+    transform: Optional[Callable[[Dict], Dict]] = None
+) -> AsyncIterator[bytes]:
+    """Yield one JSON line per document as the Motor cursor produces them"""
+    async for document in cursor:
+        if transform:
+            document = transform(document)
+        yield (json.dumps(document, default=json_default, separators=(",", ":")) + "\n").encode("utf-8")
+
+async def iter_json_list(
+    cursor,
+    transform: Optional[Callable[[Dict], Dict]] = None
+) -> AsyncIterator[bytes]:
+    """Yield a JSON array of the cursor's documents, one element at a time"""
+    separator = b"["
+    async for document in cursor:
+        if transform:
+            document = transform(document)
+        yield separator + json.dumps(document, default=json_default, separators=(",", ":")).encode("utf-8")
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+async def iter_csv(
+    cursor,
+    columns: Sequence[str],
+    transform: Optional[Callable[[Dict], Dict]] = None
+) -> AsyncIterator[bytes]:
+    """Yield a CSV header and then one encoded row per document"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(columns)
+    yield drain()
+    async for document in cursor:
+        if transform:
+            document = transform(document)
+        writer.writerow([_csv_value(document.get(column)) for column in columns])
+        yield drain()
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, ObjectId)):
+        return json_default(value)
+    return value
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly without buffering it whole"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    pending = 0
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= GZIP_FLUSH_BYTES:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def spool_body(chunks: AsyncIterator[bytes], max_memory: int = SPOOL_MAX_MEMORY_BYTES) -> IO[bytes]:
+    """Copy a request body stream into a file that spills to disk past ``max_memory``, rewound"""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    async for chunk in chunks:
+        if getattr(spool, "_rolled", False):
+            await asyncio.to_thread(spool.write, chunk)
+        else:
+            spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def iter_json_array(
+    file: IO[str],
+    read_chars: int = JSON_READ_CHARS,
+    max_item_chars: int = JSON_MAX_ITEM_CHARS
+) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time, reading ``file`` in chunks.
+
+    Only the item being decoded is held in memory. Malformed input raises
+    ``ValueError`` when it is reached, after the items before it were yielded.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def read_more() -> bool:
+        nonlocal buffer, position, eof
+        chunk = "" if eof else file.read(read_chars)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+        return not eof
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position < len(buffer) or not read_more():
+                return buffer[position:position + 1]
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+    if next_char() == "]":
+        position += 1
+    else:
+        while True:
+            next_char()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if len(buffer) - position > max_item_chars:
+                        raise ValueError(f"JSON array item longer than {max_item_chars} characters")
+                    if not read_more():
+                        raise
+                    continue
+                # A number ending the buffer may continue in the next chunk
+                if end < len(buffer) or not read_more():
+                    break
+            position = end
+            yield item
+
+            separator = next_char()
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError("Expected ',' or ']' between JSON array items")
+    if next_char():
+        raise ValueError("Unexpected data after the JSON array")
@@ -0,0 +1,45 @@
+import re
+from typing import Iterable, List
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Edge n-gram bounds for the resource ``search_ngrams`` helper field
+MIN_NGRAM = 3
+MAX_NGRAM = 15
+
+# Relative weights inside the resources text index: whole-word title hits
+# outrank description hits, which outrank prefix-only (n-gram) hits
+RESOURCE_TEXT_INDEX_NAME = "resource_text"
+RESOURCE_TEXT_WEIGHTS = {"title": 10, "description": 3, "search_ngrams": 1}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric words of ``text``"""
+    return WORD_RE.findall((text or "").lower())
+
+def edge_ngrams(word: str, min_len: int = MIN_NGRAM, max_len: int = MAX_NGRAM) -> List[str]:
+    """Leading substrings of ``word``, shortest first (``anxiety`` -> ``anx, anxi, ...``)"""
+    return [word[:size] for size in range(min_len, min(len(word), max_len) + 1)]
+
+def build_search_ngrams(texts: Iterable[str]) -> List[str]:
+    """Prefix terms stored on a resource so partial words hit the text index"""
+    grams = set()
+    for text in texts:
+        for word in tokenize(text):
+            grams.update(edge_ngrams(word))
+    return sorted(grams)
+
+def build_text_search(search: str, fuzzy: bool = False) -> str:
+    """Build a ``$text`` ``$search`` string from raw user input.
+
+    Input is reduced to plain words, so quotes and ``-`` negation cannot leak
+    into the query. With ``fuzzy`` each word is widened to its own prefixes,
+    which tolerates typos and truncations past the first few letters.
+    """
+    words = tokenize(search)
+    if fuzzy:
+        terms = set()
+        for word in words:
+            terms.update(edge_ngrams(word) or [word])
+        return " ".join(sorted(terms))
+    return " ".join(words)
@@ -0,0 +1,154 @@
+import bisect
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .text_search import tokenize
+
+
+def iter_bits(mask: int) -> Iterable[int]:
+    """Positions of the set bits in ``mask``, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class TherapistDirectoryIndex:
+    """In-memory faceted index over the therapist directory.
+
+    Every therapist gets a small integer ordinal (freed ordinals are reused,
+    which keeps the bitsets dense) and every facet value keeps a bitset of
+    the ordinals that carry it, held in a Python int. A query ORs the
+    bitsets of the values selected within a facet, ANDs across facets and
+    counts facets with ``int.bit_count``, so no per-therapist work happens
+    until the page of results is materialised.
+    """
+
+    def __init__(self, facet_keys: Dict[str, str], facet_limit: int = 20):
+        # Maps a therapist list field ("specialties") to its facet name ("specialty_keys")
+        self.facet_keys = dict(facet_keys)
+        self.facet_limit = facet_limit
+        self.ready = False
+        self._clear()
+
+    def _clear(self) -> None:
+        self._therapists: Dict[int, dict] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._next_ordinal = 0
+        self._all = 0
+        self._bits: Dict[str, Dict[object, int]] = {key: {} for key in [*self.facet_keys.values(), "telehealth"]}
+        self._location_bits: Dict[str, int] = {}
+        self._location_terms: Optional[List[str]] = None
+        self._values: Dict[int, List[Tuple[str, object]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._therapists)
+
+    # Writes
+
+    def build(self, therapists: Iterable[dict]) -> None:
+        """(Re)build from therapist dicts as returned by ``list_therapists``"""
+        self._clear()
+        for therapist in therapists:
+            self.upsert(therapist)
+        self.ready = True
+
+    def upsert(self, therapist: dict) -> None:
+        therapist_id = therapist["id"]
+        if therapist_id in self._ordinals:
+            self.remove(therapist_id)
+        if self._free:
+            ordinal = self._free.pop()
+        else:
+            ordinal = self._next_ordinal
+            self._next_ordinal += 1
+        bit = 1 << ordinal
+        self._ordinals[therapist_id] = ordinal
+        self._therapists[ordinal] = therapist
+        self._all |= bit
+
+        values = []
+        for source, key in self.facet_keys.items():
+            for value in {v.strip().lower() for v in therapist.get(source) or [] if v and v.strip()}:
+                values.append((key, value))
+        values.append(("telehealth", bool(therapist.get("telehealth"))))
+        for term in set(tokenize(therapist.get("location", ""))):
+            values.append(("location", term))
+
+        for key, value in values:
+            bits = self._location_bits if key == "location" else self._bits[key]
+            if key == "location" and value not in bits:
+                self._location_terms = None
+            bits[value] = bits.get(value, 0) | bit
+        self._values[ordinal] = values
+
+    def remove(self, therapist_id: str) -> bool:
+        ordinal = self._ordinals.pop(therapist_id, None)
+        if ordinal is None:
+            return False
+        bit = 1 << ordinal
+        for key, value in self._values.pop(ordinal):
+            bits = self._location_bits if key == "location" else self._bits[key]
+            remaining = bits[value] & ~bit
+            if remaining:
+                bits[value] = remaining
+            else:
+                del bits[value]
+                if key == "location":
+                    self._location_terms = None
+        del self._therapists[ordinal]
+        self._all &= ~bit
+        self._free.append(ordinal)
+        return True
+
+    # Reads
+
+    def match(self, filters: Dict[str, List], location: Optional[str] = None) -> int:
+        """Bitset of therapists matching ``{facet: [values]}`` and ``location``"""
+        mask = self._all
+        for key, values in filters.items():
+            if not values:
+                continue
+            selected = 0
+            for value in values:
+                selected |= self._bits[key].get(value, 0)
+            mask &= selected
+        for word in tokenize(location) if location else []:
+            mask &= self._prefix_bits(word)
+        return mask
+
+    def facet_counts(self, mask: int) -> Dict[str, Dict[str, int]]:
+        """Top values per facet among the therapists in ``mask``"""
+        counts = {}
+        for key, values in self._bits.items():
+            hits = ((value, (bits & mask).bit_count()) for value, bits in values.items())
+            top = heapq.nsmallest(self.facet_limit, ((-n, str(v).lower()) for v, n in hits if n))
+            counts[key] = {value: -negative for negative, value in top}
+        return counts
+
+    def search(self, filters: Dict[str, List], location: Optional[str] = None, limit: int = 20,
+               after: Optional[Tuple[str, str]] = None, with_facets: bool = True) -> Dict:
+        """One page of therapists ordered by ``(name, id)`` after the ``after`` key"""
+        mask = self.match(filters, location)
+        candidates = (self._therapists[o] for o in iter_bits(mask))
+        if after is not None:
+            candidates = (t for t in candidates if (t["name"], t["id"]) > after)
+        page = heapq.nsmallest(limit, candidates, key=lambda t: (t["name"], t["id"]))
+
+        result = {"therapists": page, "next_cursor": None}
+        if with_facets:
+            result["total"] = mask.bit_count()
+            result["facets"] = self.facet_counts(mask)
+        return result
+
+    def _prefix_bits(self, prefix: str) -> int:
+        if self._location_terms is None:
+            self._location_terms = sorted(self._location_bits)
+        terms = self._location_terms
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + "\uffff", start)
+        bits = 0
+        for term in terms[start:end]:
+            bits |= self._location_bits[term]
+        return bits
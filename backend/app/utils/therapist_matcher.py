@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Chat intents that can lead to a therapist suggestion, and the specialty
+# keywords (matched as substrings of a lowercased specialty) that fit each
+INTENT_SPECIALTIES: Dict[str, Tuple[str, ...]] = {
+    "depression": ("depress", "mood", "bipolar"),
+    "anxiety": ("anxiety", "panic", "stress", "ocd", "phobia"),
+    "trauma": ("trauma", "ptsd", "abuse"),
+    "self_harm": ("self-harm", "self harm", "crisis", "dbt"),
+    "suicide_risk": ("suicid", "crisis"),
+    "emergency": ("suicid", "crisis"),
+}
+
+# Matcher fields copied from therapist_helper dicts into suggestions
+SUGGESTION_FIELDS = ("id", "name", "credentials", "specialties", "languages", "telehealth", "location")
+
+
+class TherapistMatcher:
+    """Precomputed intent -> ranked therapists lookup for chat suggestions.
+
+    Rankings are rebuilt whenever the directory changes (a rare, admin-side
+    write) so a chat turn only does a dict lookup and a slice. Therapists
+    are ranked by how many of their specialties fit the intent, then
+    telehealth availability, years of experience and language coverage.
+    Each intent also keeps per-language rankings for users who prefer a
+    language other than English.
+    """
+
+    def __init__(self, intent_specialties: Dict[str, Iterable[str]] = INTENT_SPECIALTIES, top_n: int = 10):
+        self.intent_specialties = {intent: tuple(keywords) for intent, keywords in intent_specialties.items()}
+        self.top_n = top_n
+        self.ready = False
+        self._therapists: Dict[str, dict] = {}
+        self._ranked: Dict[Tuple[str, Optional[str]], Tuple[dict, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._therapists)
+
+    def build(self, therapists: Iterable[dict]) -> None:
+        """(Re)build from therapist dicts as returned by ``list_therapists``"""
+        self._therapists = {t["id"]: t for t in therapists}
+        self._rank()
+        self.ready = True
+
+    def upsert(self, therapist: dict) -> None:
+        self._therapists[therapist["id"]] = therapist
+        self._rank()
+
+    def remove(self, therapist_id: str) -> bool:
+        if self._therapists.pop(therapist_id, None) is None:
+            return False
+        self._rank()
+        return True
+
+    def match(self, intent: Optional[str], limit: int = 3, language: Optional[str] = None) -> List[dict]:
+        """Top ``limit`` suggestions for ``intent``, optionally speaking ``language``"""
+        key = (intent, language.strip().lower() if language else None)
+        return list(self._ranked.get(key, ())[:limit])
+
+    def _rank(self) -> None:
+        scored: Dict[Tuple[str, Optional[str]], List[Tuple[tuple, dict]]] = {}
+        for therapist in self._therapists.values():
+            specialties = [s.lower() for s in therapist.get("specialties") or []]
+            languages = {l.strip().lower() for l in therapist.get("languages") or [] if l and l.strip()}
+            suggestion = {field: therapist.get(field) for field in SUGGESTION_FIELDS}
+            for intent, keywords in self.intent_specialties.items():
+                fit = sum(1 for s in specialties if any(k in s for k in keywords))
+                if not fit:
+                    continue
+                score = (
+                    -fit,
+                    not therapist.get("telehealth"),
+                    -(therapist.get("years_of_experience") or 0),
+                    -len(languages),
+                    therapist.get("name") or "",
+                    therapist["id"],
+                )
+                for language in (None, *languages):
+                    scored.setdefault((intent, language), []).append((score, suggestion))
+
+        # Swapped in as a whole so concurrent readers never see a partial ranking
+        self._ranked = {
+            key: tuple(s for _, s in sorted(entries, key=lambda e: e[0])[:self.top_n])
+            for key, entries in scored.items()
+        }
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+import pytest
+
+# Route and CRUD modules import the application package as ``app``
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    """Fake Mongo database counting round trips (see mongo_fakes)"""
+    from mongo_fakes import install_fake_database
+    return install_fake_database(monkeypatch)
@@ -0,0 +1,317 @@
+"""In-memory stand-ins for the Motor database, shared by route and CRUD tests.
+
+Import only after ``pytest.importorskip`` of the app's web dependencies.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import copy
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.database import Database, collection_versions
+from app.models.resource import ResourceCreate
+from app.models.therapist_model import TherapistModel
+from app.models.user_models import UserCreate
+from app.crud import refresh_token_crud
+from app.crud.user_crud import principal_cache
+from app.utils.bloom_filter import BloomFilter
+from app.utils.security import password_hasher
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.calls = []
+
+    def hit(self, collection: str, operation: str):
+        self.calls.append((collection, operation))
+
+    def reset(self):
+        self.calls = []
+
+    @property
+    def total(self) -> int:
+        return len(self.calls)
+
+
+class FakeCollection:
+    """Just enough of the Motor collection API, counting every call"""
+
+    def __init__(self, name, counter, unique=()):
+        self.name = name
+        self.counter = counter
+        self.unique = unique
+        self.docs = {}
+
+    def _matches(self, doc, query):
+        def element(value, expected):
+            # Array fields match when any element does, as in Mongo
+            if isinstance(value, list):
+                return any(element(item, expected) for item in value)
+            if hasattr(expected, "match"):
+                return isinstance(value, str) and expected.match(value) is not None
+            return value == expected
+
+        def test(value, condition):
+            if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+                return all({
+                    "$ne": lambda expected: value != expected,
+                    "$gt": lambda expected: value is not None and value > expected,
+                    "$gte": lambda expected: value is not None and value >= expected,
+                    "$lt": lambda expected: value is not None and value < expected,
+                    "$lte": lambda expected: value is not None and value <= expected,
+                    "$in": lambda expected: any(element(value, option) for option in expected),
+                    "$all": lambda expected: all(element(value, option) for option in expected),
+                }[op](expected) for op, expected in condition.items())
+            return value == condition or element(value, condition)
+
+        def clause(key, condition):
+            if key == "$or":
+                return any(self._matches(doc, sub) for sub in condition)
+            if key == "$and":
+                return all(self._matches(doc, sub) for sub in condition)
+            return test(doc.get(key), condition)
+        return all(clause(key, condition) for key, condition in query.items())
+
+    def _check_unique(self, doc, skip_id=None):
+        # Each entry is a field name or a tuple of fields forming a compound unique index
+        for fields in self.unique:
+            fields = fields if isinstance(fields, tuple) else (fields,)
+            if not all(field in doc for field in fields):
+                continue
+            for other in self.docs.values():
+                if other["_id"] != skip_id and all(other.get(field) == doc[field] for field in fields):
+                    raise DuplicateKeyError(f"duplicate {', '.join(fields)}")
+
+    async def count_documents(self, query):
+        self.counter.hit(self.name, "count_documents")
+        return sum(1 for d in self.docs.values() if self._matches(d, query))
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self, query or {}, projection)
+
+    async def bulk_write(self, requests, ordered=True):
+        """``UpdateOne`` requests, upserting like Mongo does"""
+        self.counter.hit(self.name, "bulk_write")
+        upserted = {}
+        for index, request in enumerate(requests):
+            query, update = request._filter, request._doc
+            doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+            if doc is None and request._upsert:
+                doc = {**copy.deepcopy(query), "_id": ObjectId(), **copy.deepcopy(update.get("$setOnInsert", {}))}
+                self.docs[doc["_id"]] = doc
+                upserted[index] = doc["_id"]
+            if doc is not None:
+                doc.update(copy.deepcopy(update.get("$set", {})))
+
+        class Result:
+            upserted_ids = upserted
+        return Result()
+
+    async def insert_many(self, docs, ordered=True):
+        self.counter.hit(self.name, "insert_many")
+        errors = []
+        for index, doc in enumerate(docs):
+            doc.setdefault("_id", ObjectId())
+            try:
+                self._check_unique(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+                continue
+            self.docs[doc["_id"]] = copy.deepcopy(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def insert_one(self, doc):
+        self.counter.hit(self.name, "insert_one")
+        self._check_unique(doc)
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+    async def find_one(self, query, projection=None):
+        self.counter.hit(self.name, "find_one")
+        doc = next((copy.deepcopy(d) for d in self.docs.values() if self._matches(d, query)), None)
+        for field, include in (projection or {}).items():
+            if doc is not None and not include:
+                doc.pop(field, None)
+        return doc
+
+    async def find_one_and_update(self, query, update, return_document=ReturnDocument.BEFORE,
+                                  upsert=False, **kwargs):
+        self.counter.hit(self.name, "find_one_and_update")
+        doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return None
+            doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        before = copy.deepcopy(doc)
+        self._check_unique(update.get("$set", {}), skip_id=doc["_id"])
+        doc.update(copy.deepcopy(update.get("$set", {})))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return copy.deepcopy(doc) if return_document == ReturnDocument.AFTER else before
+
+    async def delete_one(self, query):
+        self.counter.hit(self.name, "delete_one")
+        doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+
+        class Result:
+            deleted_count = 0 if doc is None else 1
+        if doc is not None:
+            del self.docs[doc["_id"]]
+        return Result()
+
+    async def update_one(self, query, update):
+        self.counter.hit(self.name, "update_one")
+        doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+        if doc is not None:
+            doc.update(copy.deepcopy(update["$set"]))
+
+    async def update_many(self, query, update):
+        self.counter.hit(self.name, "update_many")
+        for doc in self.docs.values():
+            if self._matches(doc, query):
+                doc.update(copy.deepcopy(update["$set"]))
+
+    async def distinct(self, field, query):
+        self.counter.hit(self.name, "distinct")
+        return list({d[field] for d in self.docs.values() if self._matches(d, query)})
+
+    async def find_one_and_delete(self, query, projection=None):
+        self.counter.hit(self.name, "find_one_and_delete")
+        doc = next((d for d in self.docs.values() if self._matches(d, query)), None)
+        if doc is not None:
+            del self.docs[doc["_id"]]
+        return doc
+
+
+class FakeCursor:
+    """Sorted, sliced ``find`` results; fetching them counts as one round trip"""
+
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection or {}
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, keys):
+        self._sort = keys
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def _project(self, doc):
+        if any(self.projection.values()):
+            return {k: v for k, v in doc.items() if k == "_id" or self.projection.get(k)}
+        return {k: v for k, v in doc.items() if k not in self.projection}
+
+    def _results(self):
+        self.collection.counter.hit(self.collection.name, "find")
+        docs = [copy.deepcopy(d) for d in self.collection.docs.values() if self.collection._matches(d, self.query)]
+        for field, direction in reversed(self._sort):
+            docs.sort(key=lambda d: d.get(field), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [self._project(d) for d in docs]
+
+    async def to_list(self, length):
+        docs = self._results()
+        return docs[:length] if length else docs
+
+    async def __aiter__(self):
+        for doc in self._results():
+            yield doc
+
+
+class FakeDatabase:
+    def __init__(self, counter):
+        self.collections = {
+            "users": FakeCollection("users", counter, unique=("email",)),
+            "therapists": FakeCollection("therapists", counter),
+            "resources": FakeCollection("resources", counter),
+            "refresh_tokens": FakeCollection("refresh_tokens", counter),
+            "collection_versions": FakeCollection("collection_versions", counter),
+            "mood_entries": FakeCollection("mood_entries", counter, unique=(("user_id", "idempotency_key"),)),
+        }
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+    def get_users_collection(self):
+        return self.collections["users"]
+
+    def get_therapists_collection(self):
+        return self.collections["therapists"]
+
+    def get_resources_collection(self):
+        return self.collections["resources"]
+
+    def get_refresh_tokens_collection(self):
+        return self.collections["refresh_tokens"]
+
+    def get_versions_collection(self):
+        return self.collections["collection_versions"]
+
+    def get_mood_collection(self):
+        return self.collections["mood_entries"]
+
+
+def install_fake_database(monkeypatch) -> RoundTripCounter:
+    """Route ``Database.get_instance`` to a fresh fake and reset the per-process caches"""
+    counter = RoundTripCounter()
+    fake_db = FakeDatabase(counter)
+    counter.db = fake_db
+
+    async def get_instance(cls):
+        return fake_db
+
+    monkeypatch.setattr(Database, "get_instance", classmethod(get_instance))
+    principal_cache.clear()
+    # Cheap hashes in threads; the process pool is exercised in test_password_hasher
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    monkeypatch.setattr(password_hasher, "_executor", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(password_hasher, "_slots", None)
+    monkeypatch.setattr(refresh_token_crud, "revoked_families", BloomFilter(1000))
+    monkeypatch.setattr(collection_versions, "_versions", {})
+    return counter
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def read_body(response) -> bytes:
+    """Drain a ``StreamingResponse``"""
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+RESOURCE = ResourceCreate(
+    title="Understanding Anxiety", type="article", category="articles",
+    source="NIMH", url="https://www.nimh.nih.gov/anxiety", description="Guide"
+)
+
+THERAPIST = TherapistModel(
+    name="Dr. Lee", credentials="PhD", specialties=["anxiety"], location="Boston, MA",
+    languages=["English"], insurance=["Aetna"], telehealth=True, photo="", bio="",
+    phone_number=None, website=None, social_links=None, years_of_experience=10,
+    availability=None
+)
+
+USER = UserCreate(
+    name="Sam", email="sam@example.com", password="secret123", confirm_password="secret123"
+)
@@ -0,0 +1,16 @@
+from backend.app.utils.bloom_filter import BloomFilter
+
+def test_no_false_negatives():
+    bloom = BloomFilter.from_items((f"family-{i}" for i in range(1000)), capacity=1000)
+    assert all(f"family-{i}" in bloom for i in range(1000))
+    assert len(bloom) == 1000
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter.from_items((f"family-{i}" for i in range(5000)), capacity=5000, error_rate=0.01)
+    false_positives = sum(f"other-{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+def test_empty_filter():
+    bloom = BloomFilter(10)
+    assert "anything" not in bloom
+    assert bloom.hash_count >= 1
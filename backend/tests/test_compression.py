@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+import json
+import pytest
+from backend.app.middleware.compression import CompressionMiddleware, GzipEncoder, negotiate
+from backend.app.middleware.errors import UnhandledErrorMiddleware
+
+BODY = json.dumps([{"title": f"Resource {i}", "category": "articles"} for i in range(200)]).encode("utf-8")
+
+
+def json_app(body=BODY, headers=()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers,
+        ]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+async def streaming_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+    for i in range(3):
+        await send({"type": "http.response.body", "body": b'{"n":%d}\n' % i, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+def call(app, path="/api/resources/", method="GET", accept=b"gzip"):
+    headers = [(b"accept-encoding", accept)] if accept else []
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+def test_negotiation_honours_q_values_and_server_preference():
+    offered = ("zstd", "br", "gzip")
+    assert negotiate("gzip, deflate, br", offered) == "br"
+    assert negotiate("br;q=0.5, gzip", offered) == "gzip"
+    assert negotiate("*", offered) == "zstd"
+    assert negotiate("*;q=0.1, gzip;q=0", ("gzip",)) is None
+    assert negotiate("identity", offered) is None
+
+def test_compresses_and_weakens_etag():
+    app = CompressionMiddleware(json_app(headers=[(b"etag", b'"resources-v1"')]), encoders=[GzipEncoder()])
+    status, headers, body = call(app)
+    assert status == 200 and headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding" and headers[b"etag"] == b'W/"resources-v1"'
+    assert int(headers[b"content-length"]) == len(body) and gzip.decompress(body) == BODY
+    # The compressed body of an ETagged response is reused
+    assert len(app.cache) == 1 and call(app)[2] == body
+
+def test_skips_small_bodies_opted_out_paths_and_encoded_responses():
+    small = CompressionMiddleware(json_app(b'{"ok":true}'), encoders=[GzipEncoder()])
+    assert b"content-encoding" not in call(small)[1]
+    opted_out = CompressionMiddleware(json_app(), encoders=[GzipEncoder()], skip_paths=["/api/chat"])
+    assert call(opted_out, path="/api/chat")[2] == BODY
+    encoded = CompressionMiddleware(json_app(headers=[(b"content-encoding", b"br")]), encoders=[GzipEncoder()])
+    assert call(encoded)[2] == BODY
+    assert b"content-encoding" not in call(CompressionMiddleware(json_app()), accept=None)[1]
+
+def test_streams_chunk_by_chunk():
+    app = CompressionMiddleware(streaming_app, encoders=[GzipEncoder()])
+    status, headers, body = call(app)
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    assert gzip.decompress(body) == b'{"n":0}\n{"n":1}\n{"n":2}\n'
+
+@pytest.mark.parametrize("coding,module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encodings_round_trip(coding, module):
+    library = pytest.importorskip(module)
+    status, headers, body = call(CompressionMiddleware(json_app()), accept=coding.encode())
+    assert headers[b"content-encoding"] == coding.encode()
+    decompress = library.decompress if coding == "br" else library.ZstdDecompressor().decompress
+    assert decompress(body) == BODY
+
+def test_unhandled_errors_become_json_500():
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    status, headers, body = call(UnhandledErrorMiddleware(failing_app))
+    assert status == 500 and json.loads(body)["detail"]
@@ -0,0 +1,139 @@
+import asyncio
+import copy
+import json
+from types import SimpleNamespace
+import pytest
+from pymongo.errors import DuplicateKeyError
+from backend.app.utils.conversation_store import (
+    ANONYMOUS_USER_ID, ConversationConflict, ConversationStore, InMemoryConversationStore,
+    MongoConversationStore, decode_state, encode_state
+)
+from backend.app.utils.response_generator import AIResponseGenerator, ConversationState
+
+
+class FakeConversations:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        doc = self.docs.get(query["_id"])
+        return copy.deepcopy(doc) if doc else None
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate")
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if not doc or doc["version"] != query["version"]:
+            return SimpleNamespace(matched_count=0)
+        doc.update(update["$set"])
+        doc["version"] += update["$inc"]["version"]
+        return SimpleNamespace(matched_count=1)
+
+
+def append_turn(message):
+    async def turn(state):
+        state["messages"] = state.get("messages", []) + [message]
+        return len(state["messages"])
+    return turn
+
+
+def test_state_encoding_is_compact_and_lossless():
+    state = {"context": {"message_history": ["I feel anxious about work"] * 20, "state": "FOLLOW_UP"}}
+    data = encode_state(state)
+    assert decode_state(data) == state
+    assert len(data) < len(json.dumps(state)) / 4
+
+
+def test_in_memory_store_versions_each_save():
+    store = InMemoryConversationStore()
+    assert asyncio.run(store.update("u1", append_turn("hi"))) == 1
+    assert asyncio.run(store.update("u1", append_turn("again"))) == 2
+    stored = asyncio.run(store.load("u1"))
+    assert stored.version == 2 and stored.state["messages"] == ["hi", "again"]
+    with pytest.raises(ConversationConflict):
+        asyncio.run(store.save("u1", {}, expected_version=1))
+
+
+def test_anonymous_turns_are_not_stored():
+    collection = FakeConversations()
+
+    async def get_collection():
+        return collection
+
+    store = MongoConversationStore(get_collection)
+    for user_id in (None, "", ANONYMOUS_USER_ID):
+        # Each anonymous message starts from an empty state, whoever sent the one before
+        assert asyncio.run(store.update(user_id, append_turn("hi"))) == 1
+    assert collection.docs == {} and collection.reads == 0
+    assert store.stats() == {"conflicts": 0, "lost_updates": 0}
+
+
+def test_stores_must_implement_load_and_save():
+    class PartialStore(ConversationStore):
+        async def load(self, user_id):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_updates_lost_to_repeated_conflicts_are_counted():
+    store = InMemoryConversationStore()
+
+    async def conflicting_turn(state):
+        # Another worker saves the conversation while this turn runs
+        stored = await store.load("u1")
+        await store.save("u1", {}, stored.version if stored else 0)
+        return "reply"
+
+    assert asyncio.run(store.update("u1", conflicting_turn)) == "reply"
+    assert store.stats() == {"conflicts": 2, "lost_updates": 1}
+
+
+def test_any_worker_continues_a_conversation():
+    collection = FakeConversations()
+
+    async def get_collection():
+        return collection
+
+    worker_a, worker_b = MongoConversationStore(get_collection), MongoConversationStore(get_collection)
+
+    async def conversation():
+        await worker_a.update("u1", append_turn("one"))
+        reads = collection.reads
+        await worker_a.update("u1", append_turn("two"))
+        assert collection.reads == reads  # served from the write-through cache
+
+        # A worker that has never seen the conversation needs a single read
+        reads = collection.reads
+        assert await worker_b.update("u1", append_turn("three")) == 3
+        assert collection.reads == reads + 1
+
+        # Worker A's cached copy is now stale: its save conflicts and the turn is retried
+        assert await worker_a.update("u1", append_turn("four")) == 4
+
+    asyncio.run(conversation())
+    assert decode_state(collection.docs["u1"]["state"])["messages"] == ["one", "two", "three", "four"]
+    assert collection.docs["u1"]["version"] == 4
+
+
+def test_bound_contexts_are_independent_and_restorable():
+    shared = AIResponseGenerator()
+    first = shared.bind_context()
+    first.generate_response("My name is Alex and I feel hopeless")
+    saved = json.loads(json.dumps(first.export_context()))
+
+    assert "hopeless" not in json.dumps(saved)
+    assert saved["crisis_flagged"] == first.get_conversation_summary()["crisis_flagged"]
+
+    restored = shared.bind_context(saved)
+    assert restored.conversation_context["user_info"]["name"] == "Alex"
+    assert restored.conversation_context["state"] in ConversationState
+    assert restored.responses is shared.responses
+    assert shared.conversation_context["message_history"] == []
+    assert shared.bind_context().conversation_context["message_history"] == []
@@ -0,0 +1,66 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.routes.export import MOOD_EXPORT_COLUMNS, export_mood_entries
+from mongo_fakes import read_body, run
+
+OWNER = {"_id": ObjectId()}
+
+
+def log_entries(counter, count):
+    entries = counter.db.get_mood_collection()
+    start = datetime(2024, 1, 1)
+    for n in range(count):
+        run(entries.insert_one({
+            "user_id": str(OWNER["_id"]), "value": n % 5 + 1, "notes": f"entry {n}",
+            "timestamp": start + timedelta(hours=n // 2),
+        }))
+    run(entries.insert_one({"user_id": "someone else", "value": 1, "timestamp": start}))
+
+
+def export(**params):
+    params = {"format": "ndjson", "compress": False, "cursor": None, **params}
+    response = run(export_mood_entries(current_user=OWNER, **params))
+    return response, run(read_body(response))
+
+
+def test_export_resumes_after_the_last_received_row(counter):
+    log_entries(counter, 6)
+    _, body = export()
+    rows = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert [row["notes"] for row in rows] == [f"entry {n}" for n in range(6)]
+    assert all("user_id" not in row for row in rows)
+
+    # Interrupted after the third row (which shares its timestamp with the fourth)
+    _, body = export(cursor=rows[2]["cursor"])
+    resumed = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert [row["id"] for row in resumed] == [row["id"] for row in rows[3:]]
+
+
+def test_compressed_csv_export_is_a_complete_gzip_stream(counter):
+    log_entries(counter, 4)
+    response, body = export(format="csv", compress=True)
+    assert response.media_type == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.csv.gz"')
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode("utf-8"))))
+    assert tuple(rows[0]) == MOOD_EXPORT_COLUMNS
+    assert [row["notes"] for row in rows] == [f"entry {n}" for n in range(4)]
+
+
+def test_malformed_export_cursor_is_rejected(counter):
+    with pytest.raises(HTTPException) as exc:
+        export(cursor="garbage")
+    assert exc.value.status_code == 400
@@ -0,0 +1,48 @@
+from backend.app.utils.geo_index import GeoGridIndex, haversine_km
+from backend.app.utils.geocoder import OfflineGeocoder, get_geocoder
+
+BOSTON = (42.3576, -71.0636)
+CAMBRIDGE = (42.3736, -71.1097)
+NEW_YORK = (40.7506, -73.9972)
+
+def test_haversine():
+    assert haversine_km(*BOSTON, *BOSTON) == 0
+    assert 300 < haversine_km(*BOSTON, *NEW_YORK) < 310
+
+def test_geocode_zip_city_and_prefix():
+    geocoder = get_geocoder()
+    assert geocoder.geocode("02108") == BOSTON
+    assert geocoder.geocode("Austin, TX 78701") == (30.2711, -97.7437)
+    # Unknown ZIP falls back to known ZIPs sharing its 3-digit prefix
+    assert geocoder.geocode("02199") == (42.35025, -71.0779)
+    # Multi-ZIP cities resolve to their centroid, with or without a state
+    assert geocoder.geocode("boston, ma") == geocoder.geocode("Boston") == (42.35025, -71.0779)
+    assert geocoder.geocode("Springfield, ZZ") is None
+    assert geocoder.geocode("") is None
+
+def test_grid_radius_and_order():
+    grid = GeoGridIndex()
+    grid.upsert("ny", *NEW_YORK, "New York")
+    grid.upsert("cam", *CAMBRIDGE, "Cambridge")
+    grid.upsert("bos", *BOSTON, "Boston")
+    grid.upsert("nowhere", None, None, "Nowhere")
+    assert [name for name, _ in grid.nearby(*BOSTON, radius_km=10)] == ["Boston", "Cambridge"]
+    assert [name for name, _ in grid.nearby(*BOSTON, radius_km=400, limit=2)] == ["Boston", "Cambridge"]
+    assert [name for name, _ in grid.nearby(*BOSTON, radius_km=400, predicate=lambda p: p != "Cambridge")] == ["Boston", "New York"]
+    assert len(grid) == 3
+
+def test_grid_updates():
+    grid = GeoGridIndex()
+    grid.upsert("a", *BOSTON, "a")
+    grid.upsert("a", *NEW_YORK, "a")
+    assert grid.nearby(*BOSTON, radius_km=50) == []
+    assert grid.remove("a") and not grid.remove("a")
+    assert grid.nearby(*NEW_YORK, radius_km=50) == []
+
+def test_geocoder_reads_a_replacement_table(tmp_path):
+    table = tmp_path / "zips.csv"
+    table.write_text("zip,city,state,latitude,longitude\n04101,Portland,ME,43.6591,-70.2568\n")
+    geocoder = OfflineGeocoder(table)
+    assert len(geocoder) == 1
+    assert geocoder.geocode("Portland, ME") == (43.6591, -70.2568)
+    assert geocoder.geocode("Boston, MA") is None
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from backend.app.utils.health import HealthProber, InstrumentedExecutor, executor_check
+
+
+def test_probes_serve_cached_results_and_reflect_failures():
+    prober = HealthProber(interval=10, timeout=0.05)
+    calls = {"database": 0}
+    state = {"database": True}
+
+    async def database():
+        calls["database"] += 1
+        return state["database"], {}
+
+    async def canary():
+        return False, {"fallback": "keyword matching"}
+
+    async def hanging():
+        await asyncio.sleep(1)
+        return True, {}
+
+    prober.add_check("database", database)
+    prober.add_check("nlp_model", canary, critical=False)
+    assert prober.readiness()[0] == 503  # nothing checked yet
+
+    asyncio.run(prober.run_once())
+    status, body = prober.readiness()
+    payload = json.loads(body)
+    assert status == 200 and payload["status"] == "degraded"
+    assert payload["checks"]["nlp_model"]["status"] == "degraded"
+    assert payload["checks"]["nlp_model"]["fallback"] == "keyword matching"
+    for _ in range(1000):
+        assert prober.readiness() == (status, body)
+    assert calls["database"] == 1
+    assert prober.readiness(accepting=False)[0] == 503
+
+    state["database"] = False
+    prober.add_check("executor", hanging)
+    asyncio.run(prober.run_once())
+    status, body = prober.readiness()
+    checks = json.loads(body)["checks"]
+    assert status == 503 and checks["database"]["status"] == "failing"
+    assert checks["executor"]["error"].startswith("timed out")
+
+    prober.checked_at -= 31
+    assert json.loads(prober.readiness()[1])["reason"] == "health checks have not run recently"
+    assert prober.liveness()[0] == 200
+
+
+def test_event_loop_lag_makes_the_worker_not_ready():
+    prober = HealthProber(interval=10, max_loop_lag=0.1)
+
+    async def scenario():
+        task = asyncio.create_task(prober.run())
+        await asyncio.sleep(0.01)
+        time.sleep(0.4)  # blocks the loop past the sampler's wake-up
+        await asyncio.sleep(0.05)
+        results = await prober.run_once()
+        task.cancel()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results["event_loop"].status == "failing"
+    assert results["event_loop"].detail["lag_ms"] > 100
+
+
+def test_executor_check_counts_tasks_waiting_for_a_thread():
+    executor = InstrumentedExecutor(max_workers=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(4)]
+    time.sleep(0.05)
+    healthy, detail = asyncio.run(executor_check(lambda: executor, max_queued=2)())
+    assert not healthy and detail == {"queued": 3}
+    release.set()
+    for future in futures:
+        future.result()
+    assert asyncio.run(executor_check(lambda: executor, max_queued=2)()) == (True, {"queued": 0})
+    executor.shutdown()
+
+
+def test_cancelled_tasks_leave_the_executor_queue():
+    executor = InstrumentedExecutor(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        busy = loop.run_in_executor(executor, release.wait)
+        # Callers that give up (timeouts, client disconnects) cancel their queued work
+        for _ in range(5):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(loop.run_in_executor(executor, time.sleep, 0), 0.01)
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert executor.queued == 0
+    executor.shutdown()
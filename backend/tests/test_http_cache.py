@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import Request, Response
+
+from app.models.therapist_model import UpdateTherapistModel
+from app.routes.therapist_routes import create_therapist, edit_therapist, get_therapists
+from mongo_fakes import THERAPIST, run
+
+
+def test_revalidated_therapist_list_skips_the_database(counter, monkeypatch):
+    async def list_therapists():
+        counter.hit("therapists", "find")
+        return []
+    monkeypatch.setattr("app.routes.therapist_routes.list_therapists", list_therapists)
+    run(create_therapist(THERAPIST))
+
+    def request(etag=None):
+        headers = [(b"if-none-match", etag.encode("latin-1"))] if etag else []
+        return Request({"type": "http", "method": "GET", "path": "/api/therapists/", "headers": headers})
+
+    response = Response()
+    run(get_therapists(request(), response))
+    etag = response.headers["etag"]
+
+    counter.reset()
+    assert run(get_therapists(request(etag), Response())).status_code == 304
+    assert counter.total == 0
+
+    update = UpdateTherapistModel(**{**{f: None for f in UpdateTherapistModel.model_fields}, "bio": "Updated"})
+    run(edit_therapist(str(next(iter(counter.db.get_therapists_collection().docs))), update))
+    response = Response()
+    run(get_therapists(request(etag), response))
+    assert response.headers["etag"] != etag
@@ -0,0 +1,56 @@
+import json
+from datetime import datetime
+from typing import List
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+
+from bson import ObjectId
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.crud.therapist_crud import therapist_helper
+from app.models.resource import Resource, resource_row
+from app.models.therapist_model import TherapistOutModel
+from app.models.user_models import UserOutModel, user_helper
+from app.utils.json_response import raw_json
+
+
+def validated(model, rows):
+    """What FastAPI's response_model path would send for ``rows``"""
+    return json.loads(TypeAdapter(List[model]).dump_json(rows, by_alias=True))
+
+
+def test_resource_rows_match_response_model_output():
+    stored = [{
+        "_id": ObjectId(), "title": "Understanding Anxiety", "type": "article", "category": "articles",
+        "source": "NIMH", "url": "https://www.nimh.nih.gov/anxiety", "description": "Guide",
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678000), "updated_at": datetime(2024, 1, 2, 3, 4, 5),
+        "score": 1.5,
+    }]
+    body = json.loads(raw_json([resource_row(doc) for doc in stored]).body)
+    assert body == validated(Resource, [Resource(**doc) for doc in stored])
+
+
+def test_therapist_and_user_rows_match_response_model_output():
+    therapist = {
+        "_id": ObjectId(), "name": "Dr. Lee", "credentials": "PhD", "specialties": ["anxiety"],
+        "location": "Boston, MA", "languages": ["English"], "insurance": ["Aetna"], "telehealth": True,
+        "photo": "", "bio": "", "years_of_experience": 10, "geo": {"type": "Point", "coordinates": [-71.06, 42.36]},
+    }
+    rows = [therapist_helper(therapist)]
+    assert json.loads(raw_json(rows).body) == validated(TherapistOutModel, rows)
+
+    rows = [user_helper({"_id": ObjectId(), "name": "Sam", "email": "sam@example.com"})]
+    assert json.loads(raw_json(rows).body) == validated(UserOutModel, rows)
+
+
+def test_raw_json_keeps_headers_set_on_injected_response():
+    response = Response()
+    response.headers["ETag"] = '"resources-v3"'
+    result = raw_json([{"id": ObjectId("65a000000000000000000001")}], response)
+    assert result.headers["etag"] == '"resources-v3"'
+    assert result.headers["content-length"] == str(len(result.body))
+    assert json.loads(result.body) == [{"id": "65a000000000000000000001"}]
@@ -0,0 +1,53 @@
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("jose")
+
+from jose import jwt
+from backend.app.utils.jwt_handler import TokenService
+
+KEYS = {"2024-01": "old-secret", "2024-06": "new-secret"}
+
+def test_round_trip_and_cache():
+    service = TokenService(KEYS, "2024-06")
+    token = service.create_access_token({"sub": "sam@example.com"})
+    assert jwt.get_unverified_header(token)["kid"] == "2024-06"
+    assert service.decode(token)["sub"] == "sam@example.com"
+    assert len(service._verified) == 1
+    # Cached claims are copies
+    service.decode(token)["sub"] = "mallory@example.com"
+    assert service.decode(token)["sub"] == "sam@example.com"
+
+def test_rotation_and_legacy_tokens():
+    old = TokenService({"2024-01": "old-secret"}, "2024-01").create_access_token({"sub": "a"})
+    legacy = jwt.encode({"sub": "b", "exp": 4102444800}, "old-secret", algorithm="HS256")
+    service = TokenService(KEYS, "2024-06")
+    assert service.decode(old)["sub"] == "a"
+    assert service.decode(legacy)["sub"] == "b"
+    # Once the old key is retired its tokens stop verifying
+    retired = TokenService({"2024-06": "new-secret"}, "2024-06")
+    assert retired.decode(old) is None and retired.decode(legacy) is None
+
+def test_rejects_tampered_and_expired():
+    service = TokenService(KEYS, "2024-06")
+    forged = TokenService({"2024-06": "guess"}, "2024-06").create_access_token({"sub": "a"})
+    assert service.decode(forged) is None
+    assert service.decode("not-a-token") is None
+    expired = service.create_access_token({"sub": "a"}, expires_delta=timedelta(seconds=-1))
+    assert service.decode(expired) is None
+
+def test_cache_honours_exp(monkeypatch):
+    service = TokenService(KEYS, "2024-06")
+    token = service.create_access_token({"sub": "a"}, expires_delta=timedelta(minutes=5))
+    assert service.decode(token)
+    exp = jwt.get_unverified_claims(token)["exp"]
+    monkeypatch.setattr("backend.app.utils.jwt_handler.time.time", lambda: exp + 1)
+    monkeypatch.setattr(service, "_verify", lambda token: None)
+    assert service.decode(token) is None
+    assert not service._verified
+
+def test_cache_is_bounded():
+    service = TokenService(KEYS, "2024-06", cache_size=2)
+    for i in range(3):
+        service.decode(service.create_access_token({"sub": str(i)}))
+    assert len(service._verified) == 2
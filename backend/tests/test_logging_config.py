@@ -0,0 +1,64 @@
+import json
+import logging
+import queue
+import pytest
+from backend.app.utils.logging_config import (
+    DroppingQueueHandler, JsonFormatter, RateLimitFilter, RedactionFilter, SamplingFilter,
+    configure_logging, parse_logger_settings, stop_logging
+)
+
+
+def record(name="app.main", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    log_record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    log_record.__dict__.update(extra)
+    return log_record
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_settings_apply_to_child_loggers():
+    rates = parse_logger_settings("app=0, app.routes.auth=1")
+    sampling = SamplingFilter(rates)
+    assert not sampling.filter(record("app.main"))
+    assert sampling.filter(record("app.routes.auth.login"))
+    assert sampling.filter(record("app.main", logging.WARNING))
+    assert sampling.filter(record("uvicorn.error"))
+
+
+def test_rate_limit_suppresses_bursts_per_logger():
+    limiter = RateLimitFilter({"app.main": 2})
+    assert [limiter.filter(record()) for _ in range(3)] == [True, True, False]
+    assert limiter.suppressed == 1 and limiter.filter(record("app.other"))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(record())
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().getMessage() == "hello world"
+
+
+def test_bodies_and_secrets_are_redacted():
+    log_record = record(msg="login by %s with %s", args=("sam@example.com", "Bearer abc.def"), text="I feel awful")
+    RedactionFilter().filter(log_record)
+    entry = json.loads(JsonFormatter().format(log_record))
+    assert entry["message"] == "login by [email] with Bearer [redacted]"
+    assert entry["text"] == "[redacted 12 chars]"
+    assert entry["level"] == "INFO" and entry["logger"] == "app.main"
+
+
+def test_records_are_written_as_json_by_the_writer_thread(root_logger, capsys):
+    configure_logging(level="INFO", fmt="json", sample_rates={}, rate_limits={})
+    logging.getLogger("app.test").info("💬 Incoming message from %s (%d chars)", "user-1", 42, extra={"route": "/api/chat"})
+    stop_logging()
+    entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert entry["message"] == "💬 Incoming message from user-1 (42 chars)" and entry["route"] == "/api/chat"
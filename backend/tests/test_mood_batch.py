@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.routes.mood_tracking import MoodBatchRequest, log_mood_batch
+from mongo_fakes import run
+
+OWNER = {"_id": ObjectId()}
+
+
+def batch(*entries):
+    return MoodBatchRequest(entries=[{"value": value, "idempotency_key": key} for value, key in entries])
+
+
+def statuses(response):
+    return [(result.idempotency_key, result.status) for result in response.results]
+
+
+def test_each_entry_gets_its_own_status(counter):
+    response = run(log_mood_batch(batch((3, "a"), (9, "b"), (4, "c"), (2, "a")), user_id=OWNER))
+    assert statuses(response) == [("a", "created"), ("b", "invalid"), ("c", "created"), ("a", "duplicate")]
+    assert response.results[3].detail == "Idempotency key repeated within batch"
+    assert (response.created, response.duplicates, response.rejected) == (2, 1, 1)
+    assert all(result.id for result in response.results if result.status == "created")
+    # Only valid, first-seen entries are sent, in one round trip
+    assert counter.calls == [("mood_entries", "insert_many")]
+    assert len(counter.db.get_mood_collection().docs) == 2
+
+
+def test_retried_batches_do_not_log_entries_twice(counter):
+    run(log_mood_batch(batch((3, "a"), (4, "b")), user_id=OWNER))
+
+    # The client never saw the response and resends, with one new entry
+    response = run(log_mood_batch(batch((3, "a"), (4, "b"), (5, "c")), user_id=OWNER))
+    assert statuses(response) == [("a", "duplicate"), ("b", "duplicate"), ("c", "created")]
+    assert response.results[0].detail == "Entry already logged"
+    assert len(counter.db.get_mood_collection().docs) == 3
+
+    # Keys are per user: someone else's "a" is a new entry
+    other = run(log_mood_batch(batch((1, "a")), user_id={"_id": ObjectId()}))
+    assert statuses(other) == [("a", "created")]
+
+
+def test_other_write_errors_fail_only_their_entry(counter, monkeypatch):
+    async def insert_many(docs, ordered=True):
+        for doc in docs:
+            doc["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [
+            {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"},
+            {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+        ]})
+    monkeypatch.setattr(counter.db.get_mood_collection(), "insert_many", insert_many)
+
+    response = run(log_mood_batch(batch((1, "a"), (2, "b"), (3, "c")), user_id=OWNER))
+    assert statuses(response) == [("a", "duplicate"), ("b", "created"), ("c", "failed")]
+    assert response.results[2].detail == "Document failed validation"
+    assert (response.created, response.duplicates, response.rejected) == (1, 1, 1)
@@ -0,0 +1,72 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+from app.routes.mood_tracking import get_mood_entries
+from mongo_fakes import read_body, run
+
+OWNER = {"_id": ObjectId()}
+
+
+def log_entries(counter, count, owner=OWNER):
+    entries = counter.db.get_mood_collection()
+    now = datetime.utcnow()
+    for n in range(count):
+        # Pairs of entries share a timestamp, so pages must break ties on _id
+        run(entries.insert_one({
+            "user_id": str(owner["_id"]), "value": n % 5 + 1, "notes": f"entry {n}",
+            "timestamp": now - timedelta(minutes=n // 2),
+        }))
+
+
+def list_entries(**params):
+    response = Response()
+    params = {"days": 7, "limit": None, "cursor": None, "fields": None, "format": "json", **params}
+    entries = run(get_mood_entries(response, user_id=OWNER, db=None, **params))
+    return entries, response.headers.get("X-Next-Cursor")
+
+
+def test_keyset_pages_cover_every_entry_once_in_order(counter):
+    log_entries(counter, 7)
+    log_entries(counter, 3, owner={"_id": ObjectId()})
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = list_entries(limit=3, cursor=cursor, fields="value")
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert len(seen) == 7 and len({entry["id"] for entry in seen}) == 7
+    keys = [(entry["timestamp"], entry["id"]) for entry in seen]
+    assert keys == sorted(keys, reverse=True)
+    # Projected to the requested field plus the cursor's sort key
+    assert set(seen[0]) == {"id", "value", "timestamp"}
+
+
+def test_malformed_cursors_are_rejected(counter):
+    for cursor in ("not-a-cursor", "WzFd"):  # garbage, and a valid token of the wrong shape
+        with pytest.raises(HTTPException) as exc:
+            list_entries(limit=3, cursor=cursor)
+        assert exc.value.status_code == 400 and exc.value.detail.startswith("Invalid cursor")
+
+
+def test_unpaged_listing_streams_the_whole_window(counter):
+    log_entries(counter, 5)
+    response, _ = list_entries()
+    assert isinstance(response, StreamingResponse)
+    entries = json.loads(run(read_body(response)))
+    # Newest first, ties on timestamp broken by _id
+    assert [entry["notes"] for entry in entries] == ["entry 1", "entry 0", "entry 3", "entry 2", "entry 4"]
+    assert set(entries[0]) == {"id", "value", "notes", "timestamp"}
+
+    counter.db.get_mood_collection().docs.clear()
+    assert json.loads(run(read_body(list_entries()[0]))) == []
@@ -0,0 +1,44 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+pytest.importorskip("bcrypt")
+
+from backend.app.utils.security import (
+    PasswordHasher, HasherOverloaded, hash_password, hash_rounds, verify_password
+)
+
+def test_hash_and_verify_in_process_pool():
+    hasher = PasswordHasher(workers=2, rounds=4)
+    try:
+        async def scenario():
+            hashed = await hasher.hash("s3cret")
+            return hashed, await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+        hashed, good, bad = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+    assert hash_rounds(hashed) == 4
+    assert good and not bad
+
+def test_rehash_when_cost_changes():
+    hasher = PasswordHasher(workers=1, rounds=5, executor=ThreadPoolExecutor(1))
+    old = hash_password("s3cret", rounds=4)
+    valid, new_hash = asyncio.run(hasher.verify_and_update("s3cret", old))
+    assert valid and hash_rounds(new_hash) == 5 and verify_password("s3cret", new_hash)
+    assert asyncio.run(hasher.verify_and_update("s3cret", new_hash)) == (True, None)
+    assert asyncio.run(hasher.verify_and_update("wrong", old)) == (False, None)
+    assert not verify_password("s3cret", "s3cret")
+
+def test_sheds_when_queue_full():
+    hasher = PasswordHasher(workers=1, max_pending=1, rounds=4, executor=ThreadPoolExecutor(1))
+
+    async def scenario():
+        jobs = [asyncio.create_task(hasher.hash("s3cret")) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert hasher.in_flight == 2
+        with pytest.raises(HasherOverloaded):
+            await hasher.hash("s3cret")
+        await asyncio.gather(*jobs)
+        assert hasher.in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import HTTPException
+
+from app.models.user_models import UserLogin
+from app.routes.auth import login
+from app.routes.users import create_user
+from app.utils.security import HasherOverloaded, hash_password, hash_rounds, password_hasher
+from mongo_fakes import USER, run
+
+
+def stored_password(counter):
+    return next(iter(counter.db.get_users_collection().docs.values()))["password"]
+
+
+def test_new_users_store_a_hash_at_the_configured_cost(counter):
+    run(create_user(USER))
+    assert stored_password(counter) != USER.password
+    assert hash_rounds(stored_password(counter)) == password_hasher.rounds
+
+
+def test_login_rehashes_passwords_made_at_another_cost(counter):
+    run(create_user(USER))
+    users = counter.db.get_users_collection()
+    next(iter(users.docs.values()))["password"] = hash_password(USER.password, 5)
+
+    counter.reset()
+    run(login(UserLogin(email=USER.email, password=USER.password)))
+    assert ("users", "update_one") in counter.calls
+    assert hash_rounds(stored_password(counter)) == password_hasher.rounds
+
+    # Already at the configured cost: nothing to write back
+    counter.reset()
+    run(login(UserLogin(email=USER.email, password=USER.password)))
+    assert ("users", "update_one") not in counter.calls
+
+
+def test_saturated_hasher_refuses_signups_with_retry_after(counter, monkeypatch):
+    async def overloaded(*args):
+        raise HasherOverloaded()
+    monkeypatch.setattr(password_hasher, "_run", overloaded)
+
+    with pytest.raises(HTTPException) as exc:
+        run(create_user(USER))
+    assert exc.value.status_code == 503 and exc.value.headers["Retry-After"] == "1"
+    assert counter.total == 0
@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import HTTPException
+
+from app.models.user_models import UpdateUserModel
+from app.routes.auth import create_access_token, get_current_user
+from app.routes.users import create_user, update_user_route
+from app.crud.user_crud import delete_user
+from mongo_fakes import USER, run
+
+
+def test_authenticated_requests_reuse_cached_principal(counter):
+    created = run(create_user(USER))
+    token = create_access_token({"sub": USER.email})
+
+    async def authenticate_twice():
+        await asyncio.gather(*(get_current_user(token) for _ in range(5)))
+        return await get_current_user(token)
+
+    counter.reset()
+    user = run(authenticate_twice())
+    assert user["name"] == "Sam" and "password" not in user
+    # Concurrent misses share a single lookup and later calls hit the cache
+    assert counter.calls == [("users", "find_one")]
+
+    run(update_user_route(created.id, UpdateUserModel(name="Samuel")))
+    counter.reset()
+    assert run(get_current_user(token))["name"] == "Samuel"
+    assert counter.calls == [("users", "find_one")]
+
+    run(delete_user(created.id))
+    with pytest.raises(HTTPException) as exc:
+        run(get_current_user(token))
+    assert exc.value.status_code == 401
@@ -0,0 +1,82 @@
+import asyncio
+import json
+from backend.app.middleware.rate_limit import InMemoryBucketStore, RateLimitMiddleware, RateLimitRule
+
+RULES = (RateLimitRule("login", "POST", ("/auth/login",), capacity=2, period=60),)
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+def call(app, path="/auth/login", method="POST", headers=(), client=("10.0.0.1", 1234)):
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+def test_bucket_refills_over_time():
+    store = InMemoryBucketStore()
+    assert store.take_now("k", 2, 1.0, now=0) == (True, 1, 1)
+    assert store.take_now("k", 2, 1.0, now=0) == (True, 0, 2)
+    assert store.take_now("k", 2, 1.0, now=0.5)[0] is False
+    assert store.take_now("k", 2, 1.0, now=1.0)[0] is True
+
+def test_idle_buckets_are_swept():
+    store = InMemoryBucketStore(max_keys=2)
+    store.take_now("a", 2, 1.0, now=0)
+    store.take_now("b", 2, 1.0, now=0)
+    store.sweep(now=5)
+    assert len(store) == 0
+    for key in "abc":
+        store.take_now(key, 2, 1.0, now=10)
+    assert len(store) == 2
+
+def test_limits_per_principal_with_headers():
+    app = RateLimitMiddleware(ok_app, RULES)
+    status, headers, _ = call(app)
+    assert status == 200
+    assert headers[b"ratelimit-limit"] == b"2" and headers[b"ratelimit-remaining"] == b"1"
+    assert headers[b"ratelimit-policy"] == b"2;w=60"
+    call(app)
+    status, headers, body = call(app)
+    assert status == 429 and headers[b"retry-after"] == b"30"
+    assert json.loads(body)["detail"]
+    # Other clients have their own buckets; login is keyed by IP whatever token is sent
+    assert call(app, client=("10.0.0.2", 1))[0] == 200
+    assert call(app, headers=[(b"authorization", b"Bearer abc")])[0] == 429
+
+def test_only_verified_tokens_get_their_own_bucket():
+    rules = (RateLimitRule("chat", "POST", ("/api/chat",), capacity=1, period=60),)
+    tokens = {"good-1": {"sub": "sam@example.com"}, "good-2": {"sub": "sam@example.com"}}
+    app = RateLimitMiddleware(ok_app, rules, decode_token=tokens.get)
+
+    def chat(token):
+        return call(app, path="/api/chat", headers=[(b"authorization", b"Bearer " + token)])[0]
+
+    assert chat(b"good-1") == 200
+    # Same user with another valid token shares the bucket
+    assert chat(b"good-2") == 429
+    # Forged tokens fall back to the client IP, so rotating them does not help
+    assert chat(b"random-1") == 200
+    assert chat(b"random-2") == 429
+
+def test_unlisted_routes_pass_through():
+    app = RateLimitMiddleware(ok_app, RULES)
+    for _ in range(5):
+        status, headers, _ = call(app, path="/api/resources", method="GET")
+        assert status == 200 and b"ratelimit-limit" not in headers
+
+def test_backend_failure_allows_request():
+    class BrokenStore:
+        async def take(self, *args):
+            raise ConnectionError("mongo down")
+
+    assert call(RateLimitMiddleware(ok_app, RULES, store=BrokenStore()))[0] == 200
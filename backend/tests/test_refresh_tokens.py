@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import HTTPException
+
+from app.models.user_models import UpdateUserModel, UserLogin
+from app.routes.auth import get_current_user, login, refresh, logout, RefreshRequest
+from app.routes.users import create_user, update_user_route
+from app.crud.user_crud import delete_user
+from app.utils.security import password_hasher
+from mongo_fakes import USER, run
+
+
+def test_refresh_rotates_without_password_check(counter, monkeypatch):
+    run(create_user(USER))
+    session = run(login(UserLogin(email=USER.email, password=USER.password)))
+
+    async def no_bcrypt(*args):
+        raise AssertionError("refresh must not hash or verify passwords")
+    monkeypatch.setattr(password_hasher, "_run", no_bcrypt)
+
+    counter.reset()
+    rotated = run(refresh(RefreshRequest(refresh_token=session["refresh_token"])))
+    assert rotated["refresh_token"] != session["refresh_token"]
+    assert run(get_current_user(rotated["access_token"]))["email"] == USER.email
+    assert counter.calls[:2] == [("refresh_tokens", "find_one_and_update"), ("refresh_tokens", "insert_one")]
+
+    # Replaying the spent token revokes the whole family, including its replacement
+    for token in (session["refresh_token"], rotated["refresh_token"]):
+        with pytest.raises(HTTPException) as exc:
+            run(refresh(RefreshRequest(refresh_token=token)))
+        assert exc.value.status_code == 401
+
+
+def test_deleted_or_inactive_accounts_cannot_refresh(counter):
+    created = run(create_user(USER))
+    first = run(login(UserLogin(email=USER.email, password=USER.password)))
+    second = run(login(UserLogin(email=USER.email, password=USER.password)))
+
+    # Deactivated: the rotated session is revoked on the spot
+    run(update_user_route(created.id, UpdateUserModel(status="Inactive")))
+    with pytest.raises(HTTPException) as exc:
+        run(refresh(RefreshRequest(refresh_token=first["refresh_token"])))
+    assert exc.value.status_code == 401
+
+    # Deleted: every remaining session family is revoked without a Mongo lookup on refresh
+    run(delete_user(created.id))
+    counter.reset()
+    with pytest.raises(HTTPException):
+        run(refresh(RefreshRequest(refresh_token=second["refresh_token"])))
+    assert counter.total == 0
+
+
+def test_logout_revokes_in_memory(counter):
+    run(create_user(USER))
+    session = run(login(UserLogin(email=USER.email, password=USER.password)))
+    run(logout(RefreshRequest(refresh_token=session["refresh_token"])))
+
+    counter.reset()
+    with pytest.raises(HTTPException):
+        run(refresh(RefreshRequest(refresh_token=session["refresh_token"])))
+    assert counter.total == 0
@@ -0,0 +1,77 @@
+import json
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.requests import Request
+
+from app.database import backfill_derived_fields, resource_derived_fields
+from app.models.resource import ResourceCreate, import_resources
+from app.routes.resources import bulk_import_resources
+from mongo_fakes import RESOURCE, run
+
+
+def test_unusable_resource_urls_are_rejected_per_row(counter):
+    bad = dict(RESOURCE.model_dump(), url="https://x.org:99999/")
+    with pytest.raises(ValidationError):
+        ResourceCreate(**bad)
+
+    report = run(import_resources([(1, bad)]))
+    assert report.invalid == 1 and report.rows[0].status == "invalid"
+    assert "Invalid URL" in report.rows[0].errors[0]
+    assert counter.total == 0
+
+
+def import_request(body: bytes, content_type: str, chunk_size: int = 16):
+    """A request whose body arrives in small chunks, like a slow upload"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    headers = [(b"content-type", content_type.encode("latin-1"))]
+    return Request({"type": "http", "method": "POST", "path": "/api/resources/import", "headers": headers}, receive)
+
+
+def test_json_and_csv_bodies_are_parsed_as_they_stream(counter, monkeypatch):
+    async def read_whole(self):
+        raise AssertionError("import bodies must be streamed, not read whole")
+    monkeypatch.setattr(Request, "body", read_whole)
+
+    rows = [dict(RESOURCE.model_dump(), url=f"https://example.org/{n}", title=f"Guide {n}") for n in range(3)]
+    rows.append(dict(rows[0], url="https://www.example.org/0/"))
+    body = json.dumps(rows).encode("utf-8")
+    report = run(bulk_import_resources(import_request(body, "application/json"), current_user={}))
+    assert (report.created, report.duplicates) == (3, 1)
+    assert report.rows[3].errors == ["Same URL as row 1"]
+
+    columns = list(RESOURCE.model_dump())
+    lines = [",".join(columns)] + [",".join(f'"{row[c]}"' for c in columns) for row in rows[:2]]
+    body = ("\ufeff" + "\n".join(lines) + "\n").encode("utf-8")
+    report = run(bulk_import_resources(import_request(body, "text/csv"), current_user={}))
+    assert report.updated == 2 and report.created == 0
+    assert len(counter.db.get_resources_collection().docs) == 3
+
+
+def test_malformed_json_import_is_a_bad_request(counter):
+    for body in (b'{"title": "not a list"}', b'[{"title": "cut short"'):
+        with pytest.raises(HTTPException) as exc:
+            run(bulk_import_resources(import_request(body, "application/json"), current_user={}))
+        assert exc.value.status_code == 400 and exc.value.detail.startswith("Could not parse import")
+
+
+def test_legacy_unnormalizable_urls_do_not_block_the_backfill(counter):
+    resources = counter.db.get_resources_collection()
+    for url in ("https://x.org:99999/", "http://[bad", "https://www.nimh.nih.gov/anxiety/"):
+        run(resources.insert_one({"title": "Legacy", "url": url}))
+
+    run(backfill_derived_fields(resources, {}, {"title": 1, "url": 1}, resource_derived_fields))
+    keys = sorted(str(doc["url_key"]) for doc in resources.docs.values())
+    assert keys == ["None", "None", "https://nimh.nih.gov/anxiety"]
+    assert all(doc["search_ngrams"] for doc in resources.docs.values())
@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime, timedelta
+from backend.app.utils.resource_index import ResourceSearchIndex
+
+BASE_TIME = datetime(2024, 1, 1)
+
+def make_resource(id, title, description, category, age_days=0):
+    stamp = BASE_TIME - timedelta(days=age_days)
+    return {
+        "_id": id,
+        "title": title,
+        "description": description,
+        "category": category,
+        "created_at": stamp,
+        "updated_at": stamp,
+    }
+
+@pytest.fixture
+def index():
+    index = ResourceSearchIndex()
+    index.replace_all([
+        make_resource("a", "Understanding Anxiety", "Guide to anxiety disorders", "articles", 3),
+        make_resource("b", "Sleep Hygiene Basics", "Tips for better sleep", "articles", 2),
+        make_resource("c", "Calm Breathing", "Breathing exercises for anxiety and panic", "videos", 1),
+    ])
+    return index
+
+def ids(results):
+    return [r["_id"] for r in results]
+
+def test_title_match_ranks_first(index):
+    """Title hits are weighted above description hits"""
+    assert ids(index.search("anxiety")) == ["a", "c"]
+
+def test_last_word_matches_as_prefix(index):
+    """Partial words still match while the user is typing"""
+    assert ids(index.search("anx")) == ["a", "c"]
+    assert ids(index.search("sleep hyg")) == ["b"]
+
+def test_category_filter(index):
+    assert ids(index.search("anxiety", category="videos")) == ["c"]
+    assert index.search("anxiety", category="podcasts") == []
+
+def test_no_query_returns_newest_first(index):
+    assert ids(index.search()) == ["c", "b", "a"]
+    assert ids(index.search(category="articles", limit=1)) == ["b"]
+
+def test_incremental_updates(index):
+    index.remove("a")
+    assert ids(index.search("anxiety")) == ["c"]
+    index.upsert(make_resource("c", "Calm Breathing", "Relaxation", "podcasts"))
+    assert index.search("anxiety") == []
+    assert index.categories() == ["articles", "podcasts"]
+
+def test_stale_ids(index):
+    stamps = {"a": BASE_TIME - timedelta(days=3), "b": BASE_TIME, "d": BASE_TIME}
+    changed, removed = index.stale_ids(stamps)
+    assert changed == {"b", "d"}
+    assert removed == {"c"}
+    _, removed = index.stale_ids(stamps, as_of=BASE_TIME - timedelta(days=5))
+    assert removed == set()
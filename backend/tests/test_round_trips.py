@@ -0,0 +1,65 @@
+"""Guard the number of Mongo round trips each write endpoint makes."""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from fastapi import HTTPException
+
+from app.models.therapist_model import UpdateTherapistModel
+from app.models.user_models import UpdateUserModel
+from app.routes.resources import create_new_resource, update_existing_resource, remove_resource
+from app.routes.therapist_routes import create_therapist, edit_therapist
+from app.routes.users import create_user, update_user_route
+from mongo_fakes import RESOURCE, THERAPIST, USER, run
+
+
+VERSION_BUMP = ("collection_versions", "find_one_and_update")
+
+
+def test_resource_writes_take_one_round_trip(counter):
+    # Every write also bumps the collection version backing the list ETag
+    created = run(create_new_resource(RESOURCE, current_user={}))
+    assert counter.total == 2 and counter.calls[-1] == VERSION_BUMP
+
+    counter.reset()
+    run(update_existing_resource(created.id, RESOURCE, current_user={}))
+    assert counter.calls == [("resources", "find_one_and_update"), VERSION_BUMP]
+
+    counter.reset()
+    run(remove_resource(created.id, current_user={}))
+    assert counter.total == 2 and counter.calls[-1] == VERSION_BUMP
+
+
+
+def test_therapist_writes_take_one_round_trip(counter):
+    created = run(create_therapist(THERAPIST))
+    assert counter.total == 2 and counter.calls[-1] == VERSION_BUMP
+
+    counter.reset()
+    update = UpdateTherapistModel(**{**{f: None for f in UpdateTherapistModel.model_fields}, "bio": "Updated"})
+    result = run(edit_therapist(created["id"], update))
+    assert result["bio"] == "Updated"
+    assert counter.calls == [("therapists", "find_one_and_update"), VERSION_BUMP]
+
+
+
+def test_user_writes_take_one_round_trip(counter):
+    created = run(create_user(USER))
+    assert counter.calls == [("users", "insert_one")]
+
+    counter.reset()
+    updated = run(update_user_route(created.id, UpdateUserModel(name="Samuel")))
+    assert updated.name == "Samuel"
+    assert counter.calls == [("users", "find_one_and_update")]
+
+
+def test_duplicate_email_uses_unique_index(counter):
+    run(create_user(USER))
+    counter.reset()
+    with pytest.raises(HTTPException) as exc:
+        run(create_user(USER))
+    assert exc.value.status_code == 400
+    assert counter.total == 1
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from backend.app.middleware.draining import DrainingMiddleware
+from backend.app.utils.shutdown import ShutdownCoordinator
+
+
+def call(app, path="/api/chat"):
+    scope = {"type": "http", "method": "POST", "path": path, "headers": []}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    return scope, receive, send, messages
+
+
+def slow_app(delay):
+    async def app(scope, receive, send):
+        await asyncio.sleep(delay)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+def test_shutdown_drains_then_flushes_then_closes_in_order():
+    coordinator = ShutdownCoordinator(drain_timeout=1, step_timeout=1)
+    events = []
+
+    async def flush_history():
+        events.append(("flush", coordinator.in_flight))
+
+    coordinator.register_buffer("history", flush_history)
+    coordinator.register_closer("executor", lambda: events.append("executor"))
+    coordinator.register_closer("database", lambda: events.append("database"))
+    app = DrainingMiddleware(slow_app(0.05), coordinator)
+
+    async def scenario():
+        scope, receive, send, in_flight = call(app)
+        request = asyncio.create_task(app(scope, receive, send))
+        await asyncio.sleep(0.01)
+        shutdown = asyncio.create_task(coordinator.shutdown())
+        await asyncio.sleep(0.01)
+
+        # Admission is closed while the first request is still running
+        scope, receive, send, refused = call(app)
+        await app(scope, receive, send)
+        await request
+        return in_flight, refused, await shutdown
+
+    in_flight, refused, timings = asyncio.run(scenario())
+    assert in_flight[0]["status"] == 200
+    assert refused[0]["status"] == 503
+    headers = dict(refused[0]["headers"])
+    assert headers[b"connection"] == b"close" and headers[b"retry-after"] == b"1"
+    assert json.loads(refused[1]["body"])["detail"]
+    assert events == [("flush", 0), "executor", "database"]
+    assert set(timings) == {"drain", "flush", "close"} and timings["drain"] >= 0.02
+
+
+def test_stuck_requests_and_steps_do_not_block_shutdown():
+    coordinator = ShutdownCoordinator(drain_timeout=0.05, step_timeout=0.05)
+    closed = []
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    def fail():
+        raise RuntimeError("pool already gone")
+
+    coordinator.register_buffer("metrics", hang)
+    coordinator.register_closer("pool", fail)
+    coordinator.register_closer("database", lambda: closed.append("database"))
+    app = DrainingMiddleware(slow_app(10), coordinator)
+
+    async def scenario():
+        scope, receive, send, _ = call(app)
+        request = asyncio.create_task(app(scope, receive, send))
+        await asyncio.sleep(0.01)
+        await coordinator.shutdown()
+        request.cancel()
+
+    started = time.perf_counter()
+    asyncio.run(scenario())
+    assert time.perf_counter() - started < 1
+    assert closed == ["database"]
+    assert coordinator.in_flight == 0
+
+
+def test_shutdown_signal_stops_admission_before_the_server_handles_it():
+    coordinator = ShutdownCoordinator()
+    seen = []
+
+    def server_handler(signum, frame):
+        seen.append(coordinator.accepting)
+
+    previous = signal.signal(signal.SIGUSR1, server_handler)
+    try:
+        coordinator.hook_signals((signal.SIGUSR1,))
+        coordinator.hook_signals((signal.SIGUSR1,))  # a second startup does not wrap twice
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert seen == [False]
+    assert not coordinator.accepting
@@ -0,0 +1,34 @@
+import asyncio
+import io
+import json
+import pytest
+from backend.app.utils.streaming import iter_json_array, spool_body
+
+
+def test_json_array_items_are_decoded_across_chunk_boundaries():
+    items = [{"title": f"Guide {n}", "tags": ["a,]", "b"]} for n in range(50)] + [12345, "x", None, [1, [2]]]
+    text = json.dumps(items)
+    for read_chars in (1, 3, 7, 4096):
+        assert list(iter_json_array(io.StringIO(text), read_chars=read_chars)) == items
+    assert list(iter_json_array(io.StringIO(" [ ] "), read_chars=1)) == []
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1 2]", "[1,]", "[1, 2", "[1] trailing", ""])
+def test_malformed_json_arrays_raise_value_error(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), read_chars=2))
+
+
+def test_json_array_items_are_bounded_in_size():
+    text = json.dumps(["x" * 500, "never reached"])
+    with pytest.raises(ValueError, match="longer than 100"):
+        list(iter_json_array(io.StringIO(text), read_chars=16, max_item_chars=100))
+
+
+def test_large_bodies_spool_to_disk():
+    async def chunks():
+        for _ in range(8):
+            yield b"x" * 64
+
+    spooled = asyncio.run(spool_body(chunks(), max_memory=100))
+    assert spooled._rolled and spooled.read() == b"x" * 512
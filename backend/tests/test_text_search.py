@@ -0,0 +1,24 @@
+from backend.app.utils.text_search import build_search_ngrams, build_text_search, edge_ngrams, tokenize
+
+
+def test_search_input_is_reduced_to_plain_words():
+    # Quotes and "-" would become phrase and negation operators in $text
+    assert build_text_search('"Panic" -attacks, SLEEP!') == "panic attacks sleep"
+    assert build_text_search("  ") == ""
+    assert tokenize("Self-care 101") == ["self", "care", "101"]
+
+
+def test_fuzzy_search_widens_words_to_their_prefixes():
+    terms = build_text_search("anxeity ok", fuzzy=True).split()
+    # A transposition after the third letter still shares "anx" with "anxiety"
+    assert "anx" in terms and "anxe" in terms and "anxeity" in terms
+    assert "ok" in terms  # shorter than an n-gram: kept whole
+    assert terms == sorted(set(terms))
+
+
+def test_stored_ngrams_match_fuzzy_query_terms():
+    stored = set(build_search_ngrams(["Understanding Anxiety"]))
+    assert {"und", "anx", "anxiety"} <= stored
+    assert "an" not in stored
+    assert edge_ngrams("a" * 40)[-1] == "a" * 15
+    assert stored & set(build_text_search("anxeity", fuzzy=True).split())
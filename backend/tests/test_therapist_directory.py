@@ -0,0 +1,68 @@
+import pytest
+from backend.app.utils.therapist_directory import TherapistDirectoryIndex, iter_bits
+
+FACET_KEYS = {
+    "specialties": "specialty_keys",
+    "languages": "language_keys",
+    "insurance": "insurance_keys",
+}
+
+def make_therapist(id, name, specialties, languages, insurance, telehealth, location):
+    return {
+        "id": id,
+        "name": name,
+        "specialties": specialties,
+        "languages": languages,
+        "insurance": insurance,
+        "telehealth": telehealth,
+        "location": location,
+    }
+
+@pytest.fixture
+def directory():
+    directory = TherapistDirectoryIndex(FACET_KEYS)
+    directory.build([
+        make_therapist("1", "Ada", ["Anxiety", "Trauma"], ["English", "Spanish"], ["Aetna"], True, "Boston, MA 02115"),
+        make_therapist("2", "Ben", ["Depression"], ["English"], ["Aetna", "Cigna"], False, "Austin, TX"),
+        make_therapist("3", "Cal", ["Trauma"], ["Spanish"], ["Cigna"], True, "Boston, MA"),
+    ])
+    return directory
+
+def names(result):
+    return [t["name"] for t in result["therapists"]]
+
+def test_iter_bits():
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+
+def test_or_within_and_across_facets(directory):
+    result = directory.search({
+        "specialty_keys": ["anxiety", "trauma"],
+        "language_keys": ["spanish"],
+        "telehealth": [True],
+    })
+    assert names(result) == ["Ada", "Cal"]
+    assert result["total"] == 2
+
+def test_location_prefix_and_zip(directory):
+    assert names(directory.search({}, location="bos")) == ["Ada", "Cal"]
+    assert names(directory.search({}, location="02115")) == ["Ada"]
+
+def test_facet_counts(directory):
+    result = directory.search({"insurance_keys": ["cigna"]})
+    assert result["facets"]["language_keys"] == {"english": 1, "spanish": 1}
+    assert result["facets"]["telehealth"] == {"false": 1, "true": 1}
+
+def test_pagination_after_key(directory):
+    first = directory.search({}, limit=2)
+    assert names(first) == ["Ada", "Ben"]
+    last = first["therapists"][-1]
+    assert names(directory.search({}, limit=2, after=(last["name"], last["id"]))) == ["Cal"]
+
+def test_incremental_updates(directory):
+    directory.remove("1")
+    assert names(directory.search({"specialty_keys": ["anxiety"]})) == []
+    directory.upsert(make_therapist("2", "Ben", ["Anxiety"], ["English"], [], True, "Austin, TX"))
+    assert names(directory.search({"specialty_keys": ["anxiety"]})) == ["Ben"]
+    assert "depression" not in directory.search({})["facets"]["specialty_keys"]
+    directory.upsert(make_therapist("4", "Dee", ["Grief"], ["French"], [], False, "Denver, CO"))
+    assert len(directory) == 3
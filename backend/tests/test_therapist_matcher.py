@@ -0,0 +1,53 @@
+from backend.app.utils.therapist_matcher import TherapistMatcher
+from backend.app.utils.response_generator import AIResponseGenerator
+
+def make_therapist(id, name, specialties, languages=("English",), telehealth=False, years=0):
+    return {
+        "id": id,
+        "name": name,
+        "credentials": "LCSW",
+        "specialties": list(specialties),
+        "languages": list(languages),
+        "telehealth": telehealth,
+        "years_of_experience": years,
+        "location": "Boston, MA",
+    }
+
+def build():
+    matcher = TherapistMatcher()
+    matcher.build([
+        make_therapist("1", "Ada", ["Anxiety", "Panic Disorders"], telehealth=True),
+        make_therapist("2", "Ben", ["Anxiety"], ["English", "Spanish"], telehealth=True, years=12),
+        make_therapist("3", "Cal", ["Anxiety"], years=20),
+        make_therapist("4", "Dee", ["Trauma", "PTSD"], ["Spanish"]),
+    ])
+    return matcher
+
+def names(matches):
+    return [t["name"] for t in matches]
+
+def test_ranking():
+    matcher = build()
+    # Specialty fit first, then telehealth, then experience
+    assert names(matcher.match("anxiety", limit=3)) == ["Ada", "Ben", "Cal"]
+    assert names(matcher.match("trauma")) == ["Dee"]
+    assert matcher.match("greeting") == []
+    assert matcher.match(None) == []
+
+def test_language_rankings():
+    matcher = build()
+    assert names(matcher.match("anxiety", language="Spanish")) == ["Ben"]
+    assert matcher.match("depression", language="spanish") == []
+
+def test_updates_rerank():
+    matcher = build()
+    matcher.upsert(make_therapist("3", "Cal", ["Anxiety", "Stress"], telehealth=True, years=20))
+    assert names(matcher.match("anxiety", limit=1)) == ["Cal"]
+    matcher.remove("3")
+    assert names(matcher.match("anxiety")) == ["Ada", "Ben"]
+
+def test_response_generator_suggestions():
+    generator = AIResponseGenerator(therapist_matcher=build())
+    suggestions = generator._get_therapist_suggestions("anxiety")
+    assert "Ada, LCSW (Anxiety, Panic Disorders) - offers telehealth" in suggestions
+    assert AIResponseGenerator()._get_therapist_suggestions("anxiety") == ""
@@ -0,0 +1,96 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("jose")
+pytest.importorskip("bcrypt")
+
+from app.crud import therapist_crud
+from app.crud.therapist_crud import build_therapist_filter, search_therapists
+from app.database import report_ungeocoded_therapists
+from app.routes.therapist_routes import create_therapist
+from mongo_fakes import THERAPIST, run
+
+
+def add_therapists(*therapists):
+    for name, specialties, languages, telehealth, location in therapists:
+        run(create_therapist(THERAPIST.model_copy(update={
+            "name": name, "specialties": specialties, "languages": languages,
+            "telehealth": telehealth, "location": location,
+        })))
+
+
+def names(result):
+    return [therapist["name"] for therapist in result["therapists"]]
+
+
+def test_filters_or_values_within_a_facet_and_and_facets_together():
+    query = build_therapist_filter(
+        location="New Bos", specialties=["Anxiety, trauma", "anxiety"], languages=["Spanish"], telehealth=False
+    )
+    assert query["specialty_keys"] == {"$in": ["anxiety", "trauma"]}
+    assert query["language_keys"] == {"$in": ["spanish"]}
+    assert query["telehealth"] is False
+    assert [pattern.pattern for pattern in query["location_terms"]["$all"]] == ["^new", "^bos"]
+    assert "insurance_keys" not in query
+    assert build_therapist_filter(location="  ", specialties=[" , "]) == {}
+
+
+def test_search_pages_through_matches_by_name(counter, monkeypatch):
+    monkeypatch.setattr(therapist_crud, "THERAPIST_DIRECTORY_ENABLED", False)
+    add_therapists(
+        ("Ada", ["Anxiety", "Trauma"], ["English", "Spanish"], True, "Boston, MA"),
+        ("Ben", ["Depression"], ["English"], False, "Austin, TX"),
+        ("Cal", ["Trauma"], ["Spanish"], True, "Boston, MA"),
+        ("Dee", ["anxiety"], ["spanish"], True, "Boston, MA"),
+        ("Eve", ["Anxiety"], ["English"], True, "New York, NY"),
+    )
+
+    def search(**params):
+        return run(search_therapists(with_facets=False, **params))
+
+    # Any listed specialty, but only Spanish speakers in Boston offering telehealth
+    filters = {"specialties": ["anxiety,trauma"], "languages": ["Spanish"], "location": "bos", "telehealth": True}
+    first = search(limit=2, **filters)
+    assert names(first) == ["Ada", "Cal"] and first["next_cursor"]
+    second = search(limit=2, cursor=first["next_cursor"], **filters)
+    assert names(second) == ["Dee"] and second["next_cursor"] is None
+
+    assert names(search(specialties=["depression"])) == ["Ben"]
+    assert names(search(languages=["english"], telehealth=True)) == ["Ada", "Eve"]
+
+
+def test_facet_counts_cover_the_whole_filtered_set(counter, monkeypatch):
+    monkeypatch.setattr(therapist_crud, "THERAPIST_DIRECTORY_ENABLED", False)
+    add_therapists(("Ada", ["Anxiety"], ["English"], True, "Boston, MA"))
+    pipelines = []
+
+    class Aggregation:
+        async def to_list(self, length):
+            return [{
+                "total": [{"count": 3}],
+                "specialty_keys": [{"_id": "anxiety", "count": 3}],
+                "telehealth": [{"_id": True, "count": 2}, {"_id": False, "count": 1}],
+            }]
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        return Aggregation()
+    monkeypatch.setattr(counter.db.get_therapists_collection(), "aggregate", aggregate, raising=False)
+
+    result = run(search_therapists(specialties=["Anxiety"], limit=1))
+    # Counted over the filters alone, not the page's keyset bounds
+    assert pipelines[0][0] == {"$match": {"specialty_keys": {"$in": ["anxiety"]}}}
+    assert result["total"] == 3
+    assert result["facets"]["telehealth"] == {"true": 2, "false": 1}
+    assert result["facets"]["specialty_keys"] == {"anxiety": 3}
+
+
+def test_reports_therapists_the_geocoder_could_not_place(counter, caplog):
+    add_therapists(
+        ("Ana", ["Anxiety"], ["English"], True, "Boston, MA"),
+        ("Ben", ["Anxiety"], ["English"], True, "Smalltown, ZZ"),
+    )
+    with caplog.at_level("WARNING", logger="app.database"):
+        assert run(report_ungeocoded_therapists(counter.db.get_therapists_collection())) == 1
+    assert "1 therapists have no coordinates" in caplog.text
@@ -0,0 +1,70 @@
+import asyncio
+from backend.app.utils.ttl_cache import AsyncTTLCache
+
+def test_single_flight_and_hits():
+    cache = AsyncTTLCache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"_id": "1", "email": "a@example.com"}
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_load("a", loader) for _ in range(10)))
+        await cache.get_or_load("a", loader)
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(loads) == 1
+    assert all(r is results[0] for r in results)
+    assert cache.misses == 1 and cache.hits == 10
+
+def test_none_not_cached_and_errors_shared():
+    cache = AsyncTTLCache()
+    calls = []
+
+    async def missing():
+        calls.append(1)
+        return None
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("down")
+
+    async def scenario():
+        assert await cache.get_or_load("x", missing) is None
+        assert await cache.get_or_load("x", missing) is None
+        return await asyncio.gather(*(cache.get_or_load("y", failing) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert len(cache) == 0
+
+def test_expiry_and_bound(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.app.utils.ttl_cache.time.monotonic", lambda: now[0])
+    cache = AsyncTTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
+
+def test_invalidation_discards_inflight_load():
+    cache = AsyncTTLCache()
+
+    async def scenario():
+        async def stale():
+            await asyncio.sleep(0.01)
+            return "stale"
+        load = asyncio.create_task(cache.get_or_load("a", stale))
+        await asyncio.sleep(0)
+        cache.invalidate_where(lambda key, value: True)
+        assert await load == "stale"
+        assert cache.get("a") is None
+
+    asyncio.run(scenario())
@@ -334,6 +334,8 @@ function Chatbox() {
   const [toastVisible, setToastVisible] = useState(false);
   const [toastMessage, setToastMessage] = useState("");
   const messageEndRef = useRef(null);
+  // Lets the server keep this conversation's context between messages
+  const [sessionId] = useState(() => crypto.randomUUID());
 
   // Speech to text hook
   const { transcript, listening, start, stop } = useSpeechToText();
@@ -399,6 +401,7 @@ function Chatbox() {
     try {
       const response = await axios.post("http://localhost:8000/api/chat", {
         text: userMessage,
+        user_id: sessionId,
       });
       const botReply =
         response.data.message || "Sorry, I didn't understand that.";
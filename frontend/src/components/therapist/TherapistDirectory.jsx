@@ -24,6 +24,22 @@ const TherapistsList = styled.div`
   margin-top: 20px;
 `;
 
+const LoadMoreButton = styled.button`
+  display: block;
+  margin: 20px auto;
+  padding: 10px 24px;
+  border: none;
+  border-radius: 6px;
+  background: #4a90e2;
+  color: white;
+  cursor: pointer;
+
+  &:disabled {
+    background: #a0c4ee;
+    cursor: default;
+  }
+`;
+
 const NoResults = styled.div`
   text-align: center;
   padding: 40px;
@@ -42,33 +58,45 @@ const TherapistDirectory = () => {
   });
 
   const [therapists, setTherapists] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
 
-  const fetchTherapists = useCallback(async () => {
-    setLoading(true);
-    setError("");
-    try {
-      const query = buildQueryParams(filters);
-      const res = await axios.get(
-        `http://localhost:8000/api/therapists?${query}`
-      );
-      setTherapists(res.data);
-    } catch (err) {
-      console.error(err);
-      setError(err.response?.data?.message || "Failed to fetch therapists.");
-    } finally {
-      setLoading(false);
-    }
-  }, [filters]);
-
-  const buildQueryParams = (filters) => {
+  // The search endpoint returns one page at a time; next_cursor fetches the page after it
+  const fetchTherapists = useCallback(
+    async (cursor = null) => {
+      const setBusy = cursor ? setLoadingMore : setLoading;
+      setBusy(true);
+      setError("");
+      try {
+        const query = buildQueryParams(filters, cursor);
+        const res = await axios.get(
+          `http://localhost:8000/api/therapists/search?${query}`
+        );
+        setTherapists((prev) =>
+          cursor ? [...prev, ...res.data.therapists] : res.data.therapists
+        );
+        setNextCursor(res.data.next_cursor || null);
+      } catch (err) {
+        console.error(err);
+        setError(err.response?.data?.message || "Failed to fetch therapists.");
+      } finally {
+        setBusy(false);
+      }
+    },
+    [filters]
+  );
+
+  const buildQueryParams = (filters, cursor) => {
     const params = new URLSearchParams();
     if (filters.location) params.append("location", filters.location);
     if (filters.specialty) params.append("specialty", filters.specialty);
     if (filters.insurance) params.append("insurance", filters.insurance);
     if (filters.language) params.append("language", filters.language);
     if (filters.telehealth) params.append("telehealth", true);
+    params.append("limit", 100);
+    if (cursor) params.append("cursor", cursor);
     return params.toString();
   };
 
@@ -87,17 +115,27 @@ const TherapistDirectory = () => {
       ) : error ? (
         <p style={{ color: "red" }}>{error}</p>
       ) : therapists.length > 0 ? (
-        <TherapistsList>
-          {therapists.map((therapist) => {
-            console.log("Therapist info:", therapist);
-            return (
-              <TherapistCard
-                key={therapist.id} // Ensure the key is set to therapist.id
-                therapist={therapist}
-              />
-            );
-          })}
-        </TherapistsList>
+        <>
+          <TherapistsList>
+            {therapists.map((therapist) => {
+              console.log("Therapist info:", therapist);
+              return (
+                <TherapistCard
+                  key={therapist.id} // Ensure the key is set to therapist.id
+                  therapist={therapist}
+                />
+              );
+            })}
+          </TherapistsList>
+          {nextCursor && (
+            <LoadMoreButton
+              onClick={() => fetchTherapists(nextCursor)}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : "Load more therapists"}
+            </LoadMoreButton>
+          )}
+        </>
       ) : (
         <NoResults>
           <h3>No therapists match your current filters</h3>